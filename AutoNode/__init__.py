@@ -27,6 +27,12 @@ from .common import (
     load_validator_config,
     load_node_config
 )
+from .instrument import (
+    install as install_instrumentation
+)
+from .rpc import (
+    install as install_rpc_transport
+)
 
 if sys.version_info.major < 3:
     warnings.simplefilter("always", DeprecationWarning)
@@ -66,6 +72,9 @@ def _init():
     logging.getLogger('AutoNode').addHandler(log_handler)
     logging.getLogger('AutoNode').setLevel(logging.DEBUG)
 
+    install_rpc_transport()  # All RPCs share pooled keep-alive connections.
+    install_instrumentation()  # Time all RPC & CLI calls.
+
     try:
         # TODO: implement logic to check for latest version of CLI and download if out of date.
         cli.environment.update(cli.download(cli_bin_path, replace=False, verbose=False))
@@ -0,0 +1,135 @@
+"""
+Library for waiting on block & epoch conditions of a node or endpoint.
+
+A condition is re-checked on every new block, pushed by a websocket `newHeads` subscription if the
+optional `websocket-client` package is installed and the endpoint has a known websocket endpoint.
+Otherwise (or if the subscription fails) the condition is polled.
+"""
+
+import json
+import time
+from urllib.parse import urlparse
+
+from pyhmy import Typgpy
+
+from .common import (
+    log,
+    check_interval
+)
+
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+min_check_interval = 2  # seconds between checks, even if blocks come faster (i.e: while syncing)
+max_head_wait = 60  # seconds without a new block before the condition is checked anyway
+connect_timeout = 5
+
+
+def get_ws_endpoint(endpoint):
+    """
+    Returns the websocket endpoint of the HTTP `endpoint`, or None if it is not known.
+    """
+    parsed = urlparse(endpoint)
+    hostname = parsed.hostname or ''
+    if hostname in {'localhost', '127.0.0.1'} and parsed.port == 9500:
+        return f"ws://{hostname}:9800"
+    if hostname.startswith('api.'):
+        return f"wss://ws.{hostname[len('api.'):]}"
+    return None
+
+
+class _HeadSubscription:
+    """
+    A `newHeads` subscription on the `ws_endpoint`.
+    """
+
+    def __init__(self, ws_endpoint):
+        self._ws = websocket.create_connection(ws_endpoint, timeout=connect_timeout)
+        try:
+            self._ws.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "hmy_subscribe", "params": ["newHeads"]}))
+            reply = json.loads(self._ws.recv())
+            if 'error' in reply or 'result' not in reply:
+                raise ValueError(f"Could not subscribe to new heads: {reply.get('error', reply)}")
+        except Exception:
+            self.close()
+            raise
+
+    def wait_for_head(self, timeout):
+        """
+        Returns True once a new block is received (also reading any other queued blocks),
+        False if no block was received within `timeout` seconds.
+        """
+        self._ws.settimeout(max(timeout, 0.01))
+        try:
+            self._ws.recv()
+        except websocket.WebSocketTimeoutException:
+            return False
+        self._ws.settimeout(0.01)
+        try:
+            while True:
+                self._ws.recv()
+        except websocket.WebSocketTimeoutException:
+            return True
+
+    def close(self):
+        try:
+            self._ws.close()
+        except Exception:  # Nothing to do if the connection is already broken.
+            pass
+
+
+def _subscribe(endpoint):
+    """
+    Returns a new heads subscription of the `endpoint`, or None if the endpoint is to be polled.
+    """
+    ws_endpoint = get_ws_endpoint(endpoint)
+    if websocket is None or ws_endpoint is None:
+        return None
+    try:
+        return _HeadSubscription(ws_endpoint)
+    except (websocket.WebSocketException, OSError, ValueError) as e:
+        log(f"{Typgpy.WARNING}Could not subscribe to new blocks of {ws_endpoint}, polling {endpoint} instead. "
+            f"Error: {e}{Typgpy.ENDC}")
+        return None
+
+
+def wait_until(get_state, condition, endpoint, timeout=float('inf'), poll_interval=check_interval, on_state=None,
+               min_interval=min_check_interval):
+    """
+    Wait until `condition(state)` is True, where `state = get_state()`.
+
+    The state is fetched again on each new block of the `endpoint` (at most every `min_interval`
+    seconds), or every `poll_interval` seconds if the endpoint has no new heads subscription.
+    `on_state(state)` is called with each state that does not meet the condition.
+
+    Returns the state that met the condition. Raises a TimeoutError after `timeout` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    subscription = _subscribe(endpoint)
+    try:
+        while True:
+            last_check_time = time.monotonic()
+            state = get_state()
+            if condition(state):
+                return state
+            if on_state is not None:
+                on_state(state)
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Condition was not met within {timeout} seconds")
+            if subscription is not None:
+                try:
+                    subscription.wait_for_head(min(max_head_wait, deadline - time.monotonic()))
+                except (websocket.WebSocketException, OSError) as e:
+                    log(f"{Typgpy.WARNING}New block subscription of {endpoint} failed, polling instead. "
+                        f"Error: {e}{Typgpy.ENDC}")
+                    subscription.close()
+                    subscription = None
+                next_check_time = last_check_time + min_interval
+            else:
+                next_check_time = last_check_time + poll_interval
+            time.sleep(max(0.0, min(next_check_time, deadline) - time.monotonic()))
+    finally:
+        if subscription is not None:
+            subscription.close()
@@ -0,0 +1,175 @@
+"""
+Library of caches for chain data used by AutoNode.
+"""
+
+import json
+import os
+import threading
+import time
+
+from pyhmy import (
+    blockchain,
+    staking,
+    Typgpy
+)
+from pyhmy.rpc.exceptions import (
+    RPCError,
+    RequestsError,
+    RequestsTimeoutError
+)
+
+from .common import (
+    log,
+    harmony_dir,
+    node_config
+)
+
+network_cache_path = f"{harmony_dir}/.network_cache.json"
+epoch_check_interval = 60  # seconds between epoch checks of an endpoint, the validator set is reused until then
+network_retry_interval = 60  # seconds before a network value that could not be fetched is fetched again
+
+_network_cache = None  # network -> data of the network, lazy loaded from `network_cache_path`.
+_network_cache_lock = threading.RLock()
+_network_fetches = {}  # (network, key) -> (True if fetched by this process, monotonic time of the last fetch)
+
+_validator_addresses = {}  # (endpoint, epoch) -> frozenset of validator addresses
+_validator_addresses_lock = threading.Lock()
+_latest_epochs = {}  # endpoint -> (last seen epoch, monotonic time it was checked)
+
+
+def get_all_validator_addresses(endpoint=None, timeout=30):
+    """
+    Get the set of all validator addresses on the `endpoint` (default is the configured endpoint).
+
+    The (thousands of) addresses are only fetched once per epoch, otherwise a cached set is returned.
+    The epoch itself is only checked every `epoch_check_interval` seconds.
+    """
+    endpoint = node_config['endpoint'] if endpoint is None else endpoint
+    with _validator_addresses_lock:
+        epoch, check_time = _latest_epochs.get(endpoint, (None, None))
+    if check_time is None or time.monotonic() - check_time >= epoch_check_interval:
+        epoch = blockchain.get_current_epoch(endpoint=endpoint, timeout=timeout)
+        with _validator_addresses_lock:
+            _latest_epochs[endpoint] = (epoch, time.monotonic())
+    with _validator_addresses_lock:
+        addresses = _validator_addresses.get((endpoint, epoch), None)
+    if addresses is None:
+        addresses = frozenset(staking.get_all_validator_addresses(endpoint=endpoint, timeout=timeout))
+        with _validator_addresses_lock:
+            for key in [k for k in _validator_addresses.keys() if k[0] == endpoint]:
+                del _validator_addresses[key]  # Only keep the latest epoch.
+            _validator_addresses[(endpoint, epoch)] = addresses
+    return addresses
+
+
+def get_latest_epoch(endpoint=None):
+    """
+    The last epoch seen on the `endpoint` (default is the configured endpoint) when
+    checking validator addresses (at most `epoch_check_interval` seconds ago), or None if it was never checked.
+    """
+    endpoint = node_config['endpoint'] if endpoint is None else endpoint
+    with _validator_addresses_lock:
+        return _latest_epochs.get(endpoint, (None, None))[0]
+
+
+def is_validator(address, endpoint=None, timeout=30):
+    """
+    Check if the `address` is a validator on the `endpoint` (default is the configured endpoint).
+    """
+    return address in get_all_validator_addresses(endpoint=endpoint, timeout=timeout)
+
+
+def invalidate_validator_addresses(endpoint=None):
+    """
+    Drop the cached validator addresses for the `endpoint` (default is all endpoints).
+
+    Should be called once the set is known to be stale mid-epoch, i.e: a validator was created,
+    a validator lookup failed or a validator that is not in the set was found.
+    """
+    with _validator_addresses_lock:
+        for key in [k for k in _validator_addresses.keys() if endpoint is None or k[0] == endpoint]:
+            del _validator_addresses[key]
+
+
+def _get_network_entry(network=None):
+    """
+    Get the (mutable) cache entry of the `network` (default is the configured network).
+    """
+    global _network_cache
+    network = node_config['network'] if network is None else network
+    with _network_cache_lock:
+        if _network_cache is None:
+            try:
+                with open(network_cache_path, 'r', encoding='utf8') as f:
+                    _network_cache = json.load(f)
+            except (IOError, ValueError):
+                _network_cache = {}
+        return _network_cache.setdefault(network, {})
+
+
+def _save_network_cache():
+    with _network_cache_lock:
+        tmp_path = f"{network_cache_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf8') as f:
+                json.dump(_network_cache, f)
+            os.replace(tmp_path, network_cache_path)
+        except IOError:
+            pass  # Cache is only an optimization, will be re-fetched on next process.
+
+
+def _get_network_value(key, fetch, refresh):
+    """
+    Get the `key` value of the configured network, fetched with `fetch()` once per process (or if `refresh`).
+
+    The value saved by an earlier process is only used if it can not be fetched,
+    it is then fetched again after `network_retry_interval` seconds.
+    """
+    network = node_config['network']
+    with _network_cache_lock:
+        entry = _get_network_entry(network)
+        fetched, fetch_time = _network_fetches.get((network, key), (False, None))
+        retry = fetch_time is None or time.monotonic() - fetch_time >= network_retry_interval
+        if refresh or key not in entry or (not fetched and retry):
+            try:
+                entry[key] = fetch()
+            except (RequestsError, RequestsTimeoutError, RPCError) as e:
+                if key not in entry:
+                    raise
+                _network_fetches[(network, key)] = (False, time.monotonic())
+                log(f"{Typgpy.WARNING}Could not fetch {key} of {network}, using saved value. Error: {e}{Typgpy.ENDC}")
+            else:
+                _network_fetches[(network, key)] = (True, time.monotonic())
+                _save_network_cache()
+        return entry[key]
+
+
+def invalidate_network_cache(network=None):
+    """
+    Fetch the values of the `network` (default is all networks) again on next use.
+
+    Should be called once the network is known to have changed, i.e: on a hard reset.
+    """
+    with _network_cache_lock:
+        for key in [k for k in _network_fetches.keys() if network is None or k[0] == network]:
+            del _network_fetches[key]
+
+
+def get_sharding_structure(endpoint=None, refresh=False):
+    """
+    Get the sharding structure of the configured network from the `endpoint` (default is the configured endpoint).
+    It is fetched once per process or if `refresh`, see `_get_network_value`.
+    """
+    endpoint = node_config['endpoint'] if endpoint is None else endpoint
+    return _get_network_value('sharding-structure',
+                              lambda: blockchain.get_sharding_structure(endpoint=endpoint), refresh)
+
+
+def get_blocks_per_epoch(endpoint=None, refresh=False):
+    """
+    Get the number of blocks per epoch of the configured network from the `endpoint`
+    (default is the configured endpoint). It is fetched once per process or if `refresh`, see `_get_network_value`.
+    """
+    endpoint = node_config['endpoint'] if endpoint is None else endpoint
+    return _get_network_value('blocks-per-epoch',
+                              lambda: blockchain.get_node_metadata(endpoint=endpoint)['blocks-per-epoch'], refresh)
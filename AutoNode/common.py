@@ -57,6 +57,7 @@ validator_config = _validator_config_default.copy()
 # Invariant: 'public-bls-keys' does not change after node is started.
 _node_config_default = {
     "endpoint": "https://api.s0.b.hmny.io/",
+    "backup-endpoints": [],  # Other beacon chain endpoints, used for hedged reads & failover.
     "network": "testnet",
     "clean": False,
     "shard": None,
@@ -67,6 +68,11 @@ _node_config_default = {
     "no-download": False,
     "fast-sync": False,
     "expose-rpc": False,
+    "metrics-port": 9910,  # Monitor's Prometheus `/metrics` port, None to disable.
+    "expose-metrics": False,  # Serve metrics on all interfaces, otherwise only on localhost.
+    "log-compression": "gzip",  # Codec of rotated AutoNode logs: 'gzip', 'bz2', 'xz' or 'none'.
+    "log-compression-level": 6,
+    "compact-monitor-log": False,  # Log monitor cycles as 1 JSON line of changed fields.
     "public-bls-keys": [],
     "encrypted-wallet-passphrase": b'',
     "_is_recovering": False  # Only used for auto hard-reset
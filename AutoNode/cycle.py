@@ -0,0 +1,91 @@
+"""
+Library for running the independent RPC queries of a monitor cycle concurrently.
+
+pyhmy is a blocking library, so each query is run in a worker thread and awaited
+with its own deadline, counted from when the query starts running (not while it waits for a worker).
+A cycle then takes as long as its slowest query instead of the sum of all of its queries.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import (
+    check_interval
+)
+
+call_deadline = check_interval - 2  # Leave room to log & act within a block time.
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="autonode-cycle")
+
+
+class CallResult:
+    """
+    Outcome of a single query: the returned `value` or the raised `error`,
+    along with how long it took (in seconds).
+    """
+
+    def __init__(self, value=None, error=None, duration=0.0):
+        self.value = value
+        self.error = error
+        self.duration = duration
+
+    def get(self):
+        """
+        Return the value of the query, re-raising its error if it failed.
+        """
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+async def _timed_call(fn, deadline, executor):
+    loop = asyncio.get_event_loop()
+    started = loop.create_future()
+
+    def set_started():
+        if not started.done():
+            started.set_result(time.monotonic())
+
+    def run():
+        try:
+            loop.call_soon_threadsafe(set_started)
+        except RuntimeError:  # The loop is closed, the query is no longer awaited.
+            pass
+        return fn()
+
+    future = loop.run_in_executor(executor, run)
+    start_time = time.monotonic()
+    try:
+        try:
+            start_time = await asyncio.wait_for(started, deadline)
+        except asyncio.TimeoutError:
+            future.cancel()
+            error = TimeoutError(f"Query did not start within {deadline} seconds, all workers are busy")
+            return CallResult(error=error, duration=time.monotonic() - start_time)
+        value = await asyncio.wait_for(future, max(deadline - (time.monotonic() - start_time), 0))
+        return CallResult(value=value, duration=time.monotonic() - start_time)
+    except asyncio.TimeoutError:
+        error = TimeoutError(f"Query did not finish within {deadline} seconds")
+        return CallResult(error=error, duration=time.monotonic() - start_time)
+    except Exception as e:  # Surfaced to the caller through `CallResult.get`
+        return CallResult(error=e, duration=time.monotonic() - start_time)
+
+
+async def gather_calls(calls, deadline=call_deadline, executor=None):
+    """
+    Concurrently run `calls`, a dict of name to zero-argument callable, on the `executor`
+    (default is the shared executor of the monitor).
+
+    Returns a dict of name to CallResult. Never raises for a failed query.
+    """
+    executor = _executor if executor is None else executor
+    names = list(calls.keys())
+    results = await asyncio.gather(*(_timed_call(calls[n], deadline, executor) for n in names))
+    return dict(zip(names, results))
+
+
+def run_calls(loop, calls, deadline=call_deadline, executor=None):
+    """
+    Blocking wrapper of `gather_calls` on the given event `loop`.
+    """
+    return loop.run_until_complete(gather_calls(calls, deadline=deadline, executor=executor))
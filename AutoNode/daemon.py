@@ -3,9 +3,14 @@ Library of tools to be used by the AutoNode Daemon.
 """
 
 import os
+import signal
 import subprocess
 import time
 
+from . import process
+from .cache import (
+    invalidate_network_cache
+)
 from .common import (
     saved_node_config_path,
     save_node_config,
@@ -16,6 +21,9 @@ from .common import (
 from .exceptions import (
     InvalidWalletPassphrase
 )
+from .instrument import (
+    install_dump_handlers
+)
 from .initialize import (
     save_wallet_passphrase
 )
@@ -33,6 +41,9 @@ from .validator import (
     setup as setup_validator,
     assert_node_started
 )
+from .watch import (
+    install_reload_handler
+)
 
 name = f"autonoded"
 services = [
@@ -73,6 +84,7 @@ def run_node(hard_reset_recovery=False, duration=float('inf')):
     Will block for the `duration`.
     """
     print(f"Running node for {duration} seconds. Hard reset: {hard_reset_recovery}")
+    install_dump_handlers()  # Call timings on SIGUSR1 & exit
     _validate_config(for_node=True)
     pid = None
     try:
@@ -86,7 +98,7 @@ def run_node(hard_reset_recovery=False, duration=float('inf')):
     finally:
         if pid is not None:
             print(f"Killing harmony process, pid: {pid}")
-            subprocess.check_call(["kill", "-2", str(pid)], env=os.environ)
+            os.kill(pid, signal.SIGINT)
 
 
 def _reset_node(recover_service_name, error):
@@ -102,6 +114,7 @@ def _reset_node(recover_service_name, error):
         return
 
     passphrase = get_wallet_passphrase()
+    invalidate_network_cache()  # The reset network can have a different sharding structure.
 
     # Set flags to indicate that node is in hard-reset recovery mode.
     node_config['_is_recovering'] = True
@@ -117,8 +130,8 @@ def _reset_node(recover_service_name, error):
             print(f"Unable to stop service '{daemon_name}'")
             raise e
 
-    subprocess.call(["killall", "harmony"], env=os.environ)  # OK if this fails, so use subprocess.call
-    time.sleep(5)  # wait for node shutdown
+    process.signal_processes("^harmony$", signal.SIGTERM)  # OK if there is no harmony process
+    process.wait_for_processes_exit("^harmony$", timeout=5)  # wait for node shutdown
 
     daemon_name = f"{name}@{recover_service_name}.service"
     command = ["systemctl", "--user", "start", daemon_name]
@@ -146,6 +159,8 @@ def run_monitor(duration=float('inf')):
     Main function to run the monitor.
     """
     print(f"Running monitor for {duration} seconds.")
+    install_dump_handlers()  # Call timings on SIGUSR1 & exit
+    install_reload_handler()  # Reload config on SIGHUP
     _validate_config(for_node=False)
     while True:
         try:
@@ -6,7 +6,6 @@ import getpass
 import json
 import os
 import shutil
-import subprocess
 import time
 
 from pyhmy import (
@@ -14,10 +13,13 @@ from pyhmy import (
     exceptions,
     json_load,
     Typgpy,
-    validator,
-    staking
+    validator
 )
 
+from . import process
+from .cache import (
+    is_validator
+)
 from .common import (
     log,
     validator_config,
@@ -190,8 +192,7 @@ def _import_bls(passphrase):
                 key = json_load(
                     cli.single_call(['hmy', 'keys', 'generate-bls-key', '--passphrase-file', tmp_bls_pass_path]))
                 public_bls_key, bls_file_path = key['public-key'], key['encrypted-private-key-path']
-                shard_id = json_load(cli.single_call(['hmy', '--node', f'{node_config["endpoint"]}', 'utility',
-                                                      'shard-for-bls', public_bls_key]))['shard-id']
+                shard_id = shard_for_bls(public_bls_key)
                 if int(shard_id) != node_config['shard']:
                     os.remove(bls_file_path)
                 else:
@@ -205,8 +206,7 @@ def _import_bls(passphrase):
             key = json_load(cli.single_call(['hmy', 'keys', 'generate-bls-key', '--passphrase-file', tmp_bls_pass_path]))
             public_bls_key = key['public-key']
             bls_file_path = key['encrypted-private-key-path']
-            shard_id = json_load(cli.single_call(['hmy', '--node', f'{node_config["endpoint"]}', 'utility',
-                                                  'shard-for-bls', public_bls_key]))['shard-id']
+            shard_id = shard_for_bls(public_bls_key)
             log(f"{Typgpy.OKGREEN}Generated BLS key for shard {shard_id}: {Typgpy.OKBLUE}{public_bls_key}{Typgpy.ENDC}")
             shutil.move(bls_file_path, bls_key_dir)
             _save_protected_file(passphrase, f"{bls_key_dir}/{key['public-key'].replace('0x', '')}.pass")
@@ -259,8 +259,7 @@ def setup_validator_config():
 
     make_directories()
     interactive_setup_validator()
-    shard_id = json_load(cli.single_call(['hmy', '--node', f'{node_config["endpoint"]}', 'utility',
-                                          'shard-for-bls', node_config['public-bls-keys'][0]]))['shard-id']
+    shard_id = shard_for_bls(node_config['public-bls-keys'][0])
     log("~" * 110)
     log(f"Shard ID: {shard_id}")
     log(f"Saved Validator Information: {json.dumps(validator_config, indent=4)}")
@@ -288,7 +287,7 @@ def interactive_setup_validator():
         _input_validator_address()
 
     v = validator.Validator(validator_config['validator-addr'])
-    if validator_config['validator-addr'] in staking.get_all_validator_addresses(endpoint=node_config['endpoint']):
+    if is_validator(validator_config['validator-addr']):
         v.load_from_blockchain(node_config['endpoint'])
         # Can immediately load validator config since information is from on-chain data.
         for key, value in v.export().items():
@@ -347,8 +346,7 @@ def save_wallet_passphrase(passphrase):
     """
     Encrypt and save wallet passphrase in node config.
     """
-    is_node_running = subprocess.call(["pgrep", "harmony"], env=os.environ, stdout=subprocess.DEVNULL) == 0
-    assert is_node_running, "Harmony process is not running, cannot save wallet passphrase"
+    assert process.is_running("harmony"), "Harmony process is not running, cannot save wallet passphrase"
     addr = validator_config["validator-addr"]
     assert addr, "Validator was not setup, cannot save passphrase"
     assert is_valid_passphrase(passphrase, addr), f"Invalid passphrase for {addr}"
@@ -0,0 +1,192 @@
+"""
+Library for timing every RPC and CLI invocation made by AutoNode.
+
+Installed when AutoNode is imported: each RPC (by method) and CLI call (by sub-command)
+is timed with a monotonic clock, and its count, failures & latency histogram are recorded.
+The latencies are also exported as metrics, and daemons dump a summary on SIGUSR1 and on exit (including SIGTERM).
+"""
+
+import atexit
+import contextlib
+import json
+import re
+import signal
+import sys
+import threading
+import time
+
+from pyhmy import cli
+from pyhmy.rpc import request as pyhmy_request
+
+from . import metrics
+
+_cli_word_pattern = re.compile(r"^[a-z][a-z-]*$")
+
+_stats = {}  # (kind, name) -> _CallStats
+_stats_lock = threading.Lock()
+_installed = False
+_dump_installed = False
+
+_call_latency_histogram = metrics.Histogram("autonode_call_latency_seconds",
+                                            "Latency of each RPC or CLI invocation", ("kind", "name"))
+_call_failure_counter = metrics.Counter("autonode_call_failures", "Failed RPC or CLI invocations", ("kind", "name"))
+
+
+class _CallStats:
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, duration, failed):
+        self.count += 1
+        self.failures += int(failed)
+        self.total += duration
+        self.max = max(self.max, duration)
+
+
+def record(kind, name, duration, failed=False):
+    """
+    Record a `kind` ('rpc' or 'cli') call of `name` that took `duration` seconds.
+    """
+    with _stats_lock:
+        stats = _stats.get((kind, name), None)
+        if stats is None:
+            stats = _CallStats()
+            _stats[(kind, name)] = stats
+        stats.record(duration, failed)
+    _call_latency_histogram.observe(duration, kind, name)
+    if failed:
+        _call_failure_counter.inc(kind, name)
+
+
+def cli_call_name(command):
+    """
+    Name of a CLI `command` (string or list of args) by its sub-command, i.e: 'staking edit-validator'.
+    """
+    tokens = command.split() if isinstance(command, str) else list(command)
+    if tokens and tokens[0] == 'hmy':
+        tokens = tokens[1:]
+    words, skip_next = [], False
+    for token in tokens:
+        if token.startswith('-'):
+            skip_next = '=' not in token and token in ('--node', '-n', '--passphrase-file', '--chain-id')
+            continue
+        if skip_next:
+            skip_next = False
+            continue
+        if not _cli_word_pattern.match(token) or len(words) == 2:
+            break
+        words.append(token)
+    return ' '.join(words) or 'unknown'
+
+
+def _timed_base_request(base_request):
+    def timed_base_request(method, params=None, endpoint=pyhmy_request._default_endpoint,
+                           timeout=pyhmy_request._default_timeout):
+        start_time, failed = time.monotonic(), True
+        try:
+            response = base_request(method, params, endpoint, timeout)
+            failed = False
+            return response
+        finally:
+            record('rpc', method, time.monotonic() - start_time, failed=failed)
+
+    timed_base_request.__wrapped__ = base_request
+    return timed_base_request
+
+
+def _timed_single_call(single_call):
+    def timed_single_call(command, timeout=60, error_ok=False):
+        start_time, failed = time.monotonic(), True
+        try:
+            response = single_call(command, timeout=timeout, error_ok=error_ok)
+            failed = False
+            return response
+        finally:
+            record('cli', cli_call_name(command), time.monotonic() - start_time, failed=failed)
+
+    timed_single_call.__wrapped__ = single_call
+    return timed_single_call
+
+
+@contextlib.contextmanager
+def timed_cli(command):
+    """
+    Time the interactive (pexpect) run of the CLI `command` in the `with` block, as a failure if the block raises.
+
+    Used around `cli.expect_call` and the expects of its child up to EOF, as only the caller knows when it is done.
+    """
+    start_time, failed = time.monotonic(), True
+    try:
+        yield
+        failed = False
+    finally:
+        record('cli', cli_call_name(command), time.monotonic() - start_time, failed=failed)
+
+
+def install():
+    """
+    Time all RPC (pyhmy) and CLI calls. Must be installed after the RPC transport.
+    """
+    global _installed
+    if _installed:
+        return
+    pyhmy_request.base_request = _timed_base_request(pyhmy_request.base_request)
+    cli.single_call = _timed_single_call(cli.single_call)
+    _installed = True
+
+
+def get_summary():
+    """
+    Returns a dict of 'rpc' & 'cli' to a dict of call name to its 'count', 'failures', 'total',
+    'mean' & 'max' latency (in seconds), sorted by total time spent (most first).
+    """
+    summary = {'rpc': {}, 'cli': {}}
+    with _stats_lock:
+        ordered = sorted(_stats.items(), key=lambda e: e[1].total, reverse=True)
+        for (kind, name), stats in ordered:
+            summary[kind][name] = {
+                'count': stats.count,
+                'failures': stats.failures,
+                'total': round(stats.total, 6),
+                'mean': round(stats.total / stats.count, 6),
+                'max': round(stats.max, 6),
+            }
+    return summary
+
+
+def dump_summary(file=sys.stdout):
+    print(f"AutoNode call timings: {json.dumps(get_summary(), indent=4)}", file=file, flush=True)
+
+
+def _install_exit_on_sigterm():
+    """
+    Exit (so that `atexit` functions run) on SIGTERM, i.e: when systemd stops a daemon.
+    A previously installed SIGTERM handler is called first, an ignored SIGTERM is left as is.
+    """
+    previous_handler = signal.getsignal(signal.SIGTERM)
+    if previous_handler == signal.SIG_IGN:
+        return
+
+    def exit_on_sigterm(signum, frame):
+        if callable(previous_handler):
+            previous_handler(signum, frame)
+        raise SystemExit(0)  # A requested stop, so a clean exit.
+
+    signal.signal(signal.SIGTERM, exit_on_sigterm)
+
+
+def install_dump_handlers():
+    """
+    Dump the call timing summary on SIGUSR1 and on exit (including SIGTERM). Only for the main thread of the daemons.
+    """
+    global _dump_installed
+    if _dump_installed:
+        return
+    signal.signal(signal.SIGUSR1, lambda signum, frame: dump_summary())
+    atexit.register(dump_summary)
+    _install_exit_on_sigterm()
+    _dump_installed = True
@@ -0,0 +1,219 @@
+"""
+Library for reading the CLI's (Web3 secret storage v3) account keystore in-process.
+"""
+
+import glob
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+
+import bech32
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers import (
+    Cipher,
+    algorithms,
+    modes
+)
+from pyhmy import cli
+
+verification_ttl = 300  # seconds a verified passphrase is remembered
+
+_verified = {}  # (address, passphrase digest) -> (keystore path, keystore mtime, verification time)
+_verified_lock = threading.Lock()
+_digest_key = os.urandom(32)  # Passphrases are only remembered as a keyed digest.
+
+_keccak_round_constants = (
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+)
+_keccak_rotations = (
+    (0, 36, 3, 41, 18),
+    (1, 44, 10, 45, 2),
+    (62, 6, 43, 15, 61),
+    (28, 55, 25, 21, 56),
+    (27, 20, 39, 8, 14),
+)
+_mask_64 = (1 << 64) - 1
+
+
+class KeystoreError(Exception):
+    """
+    The keystore could not be found or is not in a supported format.
+    """
+
+
+def _rotate(value, shift):
+    return ((value << shift) | (value >> (64 - shift))) & _mask_64 if shift else value
+
+
+def _keccak_f(state):
+    for round_constant in _keccak_round_constants:
+        c = [state[x][0] ^ state[x][1] ^ state[x][2] ^ state[x][3] ^ state[x][4] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ _rotate(c[(x + 1) % 5], 1) for x in range(5)]
+        state = [[state[x][y] ^ d[x] for y in range(5)] for x in range(5)]
+        b = [[0] * 5 for _ in range(5)]
+        for x in range(5):
+            for y in range(5):
+                b[y][(2 * x + 3 * y) % 5] = _rotate(state[x][y], _keccak_rotations[x][y])
+        state = [[b[x][y] ^ ((~b[(x + 1) % 5][y]) & b[(x + 2) % 5][y]) for y in range(5)] for x in range(5)]
+        state[0][0] ^= round_constant
+    return state
+
+
+def keccak256(data):
+    """
+    Keccak-256 (the original Keccak padding used by Ethereum & Harmony, not NIST SHA3-256) of `data` bytes.
+    """
+    rate = 136
+    padded = bytearray(data) + b'\x01' + b'\x00' * ((rate - (len(data) + 1) % rate) % rate)
+    padded[-1] |= 0x80
+    state = [[0] * 5 for _ in range(5)]
+    for block_start in range(0, len(padded), rate):
+        block = padded[block_start:block_start + rate]
+        for i in range(rate // 8):
+            state[i % 5][i // 5] ^= int.from_bytes(block[8 * i:8 * i + 8], 'little')
+        state = _keccak_f(state)
+    return b''.join(state[i % 5][i // 5].to_bytes(8, 'little') for i in range(4))
+
+
+def _address_hex(address):
+    hrp, data = bech32.bech32_decode(address)
+    if hrp != 'one' or data is None:
+        raise KeystoreError(f"Invalid address {address}")
+    return bytes(bech32.convertbits(data, 5, 8, False)).hex()
+
+
+def _is_keystore_of(path, address_hex):
+    """
+    Returns True if the keystore file at `path` is for the hex address `address_hex`,
+    matched by the file name (UTC--<time>--<address>) or else by its `address` field.
+    """
+    if os.path.basename(path).lower().endswith(address_hex):
+        return True
+    try:
+        with open(path, 'r', encoding='utf8') as f:
+            keystore_address = json.load(f).get('address', '')
+    except (OSError, ValueError, AttributeError):  # Not a keystore.
+        return False
+    if not isinstance(keystore_address, str):
+        return False
+    return keystore_address.lower().replace('0x', '') == address_hex
+
+
+def get_keystore_files(address):
+    """
+    Returns the paths of the CLI's keystore files for the 'one1...' `address`.
+
+    The CLI's keystore directory (1 sub-directory per account name) is scanned directly,
+    so no CLI process is started.
+    """
+    address_hex = _address_hex(address)
+    return [p for p in sorted(glob.glob(f"{cli.get_account_keystore_path()}/*/*"))
+            if os.path.isfile(p) and _is_keystore_of(p, address_hex)]
+
+
+def _derive_key(passphrase, crypto):
+    kdf, params = crypto['kdf'], crypto['kdfparams']
+    salt = bytes.fromhex(params['salt'])
+    if kdf == 'scrypt':
+        n, r, p = params['n'], params['r'], params['p']
+        try:
+            return hashlib.scrypt(passphrase, salt=salt, n=n, r=r, p=p, dklen=params['dklen'],
+                                  maxmem=128 * r * (n + p + 2) + 2 ** 24)
+        except ValueError as e:  # Parameters not supported by OpenSSL
+            raise KeystoreError(f"Unsupported scrypt parameters: {e}") from e
+    if kdf == 'pbkdf2':
+        if params.get('prf', 'hmac-sha256') != 'hmac-sha256':
+            raise KeystoreError(f"Unsupported pbkdf2 prf: {params['prf']}")
+        return hashlib.pbkdf2_hmac('sha256', passphrase, salt, params['c'], params['dklen'])
+    raise KeystoreError(f"Unsupported keystore kdf: {kdf}")
+
+
+def decrypt_keystore(keystore, passphrase):
+    """
+    Decrypt the (parsed JSON) v3 `keystore` with the `passphrase` and return the private key bytes.
+
+    Raises ValueError if the passphrase is wrong, KeystoreError if the keystore is not supported.
+    """
+    try:
+        crypto = keystore.get('crypto', None) or keystore['Crypto']
+        if crypto['cipher'] != 'aes-128-ctr':
+            raise KeystoreError(f"Unsupported keystore cipher: {crypto['cipher']}")
+        derived_key = _derive_key(passphrase.encode(), crypto)
+        ciphertext = bytes.fromhex(crypto['ciphertext'])
+        mac = bytes.fromhex(crypto['mac'])
+        iv = bytes.fromhex(crypto['cipherparams']['iv'])
+    except (KeyError, TypeError) as e:
+        raise KeystoreError(f"Invalid keystore: {e}") from e
+    if not hmac.compare_digest(keccak256(derived_key[16:32] + ciphertext), mac):
+        raise ValueError("Invalid passphrase")
+    decryptor = Cipher(algorithms.AES(derived_key[:16]), modes.CTR(iv), backend=default_backend()).decryptor()
+    return decryptor.update(ciphertext) + decryptor.finalize()
+
+
+def load_private_key(address, passphrase):
+    """
+    Returns the private key bytes of the 'one1...' `address` from the CLI's keystore.
+
+    Raises ValueError if the passphrase is wrong, KeystoreError if there is no (supported) keystore.
+    """
+    paths = get_keystore_files(address)
+    if not paths:
+        raise KeystoreError(f"No keystore found for {address}")
+    with open(paths[0], 'r', encoding='utf8') as f:
+        try:
+            keystore = json.load(f)
+        except ValueError as e:
+            raise KeystoreError(f"Invalid keystore {paths[0]}: {e}") from e
+    return decrypt_keystore(keystore, passphrase)
+
+
+def _get_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def check_passphrase(address, passphrase):
+    """
+    Returns True if the `passphrase` decrypts the CLI's keystore for the 'one1...' `address`.
+
+    A verified passphrase is remembered for `verification_ttl` seconds (or until the keystore
+    changes), so repeated checks do not re-run the (intentionally slow) key derivation.
+
+    Raises KeystoreError if there is no (supported) keystore for the address.
+    """
+    digest = hmac.new(_digest_key, passphrase.encode(), hashlib.sha256).digest()
+    cache_key, now = (address, digest), time.monotonic()
+    with _verified_lock:
+        for key in [k for k, (_, _, t) in _verified.items() if now - t > verification_ttl]:
+            del _verified[key]
+        verified = _verified.get(cache_key, None)
+    if verified is not None and _get_mtime(verified[0]) == verified[1]:
+        return True
+    paths = get_keystore_files(address)
+    if not paths:
+        raise KeystoreError(f"No keystore found for {address}")
+    mtime = _get_mtime(paths[0])
+    if mtime is None:
+        raise KeystoreError(f"Could not read keystore {paths[0]}")
+    try:
+        load_private_key(address, passphrase)
+    except ValueError:
+        return False
+    with _verified_lock:
+        _verified[cache_key] = (paths[0], mtime, now)
+    return True
+
+
+def forget_verified_passphrases():
+    with _verified_lock:
+        _verified.clear()
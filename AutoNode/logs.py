@@ -0,0 +1,315 @@
+"""
+Library for reading the logs of the harmony node.
+
+Logs can be hundreds of MB, so nothing in here re-reads a log from the start
+once it has been read.
+"""
+
+import calendar
+import glob
+import json
+import mmap
+import os
+import re
+import threading
+import time
+
+from .util import (
+    FileLock
+)
+
+invalid_block_marker = b"invalid merkle root"
+signing_markers = (b"BINGO", b"HOORAY")
+view_change_markers = (b"[startViewChange]",)  # Logged once per view change started by the node.
+sync_marker = b"[SYNC]"
+error_marker = b'"level":"error"'
+_time_pattern = re.compile(rb'"time":"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(\.\d+)?(Z|[+-]\d\d:\d\d)"')
+_read_chunk_size = 1024 * 1024  # bytes
+
+
+def latest_log_file(log_dir):
+    """
+    Returns the path of the active (zero*.log) node log in `log_dir` or None if there is no log.
+    """
+    files = sorted(glob.glob(f"{log_dir}/zero*.log"))
+    return files[-1] if files else None
+
+
+def parse_log_time(line):
+    """
+    Returns the unix timestamp of the (RFC3339) `time` field of a zerolog `line` (bytes) or None if there is none.
+    """
+    match = _time_pattern.search(line)
+    if match is None:
+        return None
+    base, fraction, offset = match.groups()
+    timestamp = calendar.timegm(time.strptime(base.decode(), "%Y-%m-%dT%H:%M:%S"))
+    if fraction:
+        timestamp += float(b"0" + fraction)
+    if offset != b"Z":
+        sign = 1 if offset[0:1] == b"+" else -1
+        timestamp -= sign * (int(offset[1:3]) * 3600 + int(offset[4:6]) * 60)
+    return timestamp
+
+
+def last_signing_time(log_path, max_lines=1500):
+    """
+    Returns the unix timestamp of the last signing (BINGO/HOORAY) log within the
+    last `max_lines` lines of the log at `log_path`, or None if there is none.
+
+    The log is memory-mapped and searched backwards from its end, so only the
+    matched line is ever decoded. Falls back to the log's modification time if
+    the matched line has no timestamp.
+    """
+    with open(log_path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        if stat.st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            window_start = size - 1 if mm[size - 1:size] == b"\n" else size
+            for _ in range(max_lines):
+                window_start = mm.rfind(b"\n", 0, window_start)
+                if window_start < 0:
+                    break
+            window_start = max(window_start, 0)
+            pos = max(mm.rfind(marker, window_start, size) for marker in signing_markers)
+            if pos < 0:
+                return None
+            line_end = mm.find(b"\n", pos)
+            line = mm[mm.rfind(b"\n", 0, pos) + 1:size if line_end < 0 else line_end]
+    timestamp = parse_log_time(line)
+    return stat.st_mtime if timestamp is None else timestamp
+
+
+class LogTailer:
+    """
+    Follows a log file by remembering its inode and byte offset,
+    so that each read only returns the bytes appended since the last read.
+
+    Handles rotation (new inode at the path) and truncation (size < offset).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.inode = None
+        self.offset = 0
+        self._file = None
+
+    def _open(self):
+        try:
+            self._file = open(self.path, 'rb')
+        except (FileNotFoundError, PermissionError):
+            self._file = None
+            return False
+        self.inode = os.fstat(self._file.fileno()).st_ino
+        self.offset = 0
+        return True
+
+    def _read_to_end(self):
+        while True:
+            chunk = self._file.read(_read_chunk_size)
+            if not chunk:
+                return
+            self.offset += len(chunk)
+            yield chunk
+
+    def read_chunks(self):
+        """
+        Generator of the bytes appended to the log since the last read.
+
+        Yields None (before any bytes) each time the log is reset (rotated, truncated or first opened),
+        meaning that all following bytes are from the start of a new log.
+        """
+        if self._file is not None:
+            yield from self._read_to_end()  # Drain the old file in case it was rotated.
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                st = None
+            if st is not None and st.st_ino == self.inode and st.st_size >= self.offset:
+                return
+            if st is not None and st.st_ino == self.inode:  # Truncated
+                self._file.seek(0)
+                self.offset = 0
+                yield None
+                yield from self._read_to_end()
+                return
+            self.close()
+        if self._open():
+            yield None
+            yield from self._read_to_end()
+
+    def resume(self, inode, offset):
+        """
+        Continue from a previously recorded `inode` & `offset` of the log.
+        Returns False (and starts from a fresh log on the next read) if the log has since changed.
+        """
+        self.close()
+        if not self._open():
+            return False
+        if self.inode != inode or os.fstat(self._file.fileno()).st_size < offset:
+            self.close()
+            return False
+        self._file.seek(offset)
+        self.offset = offset
+        return True
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ConsensusIndex:
+    """
+    Streaming indexer of the consensus events in the node's (zerolog JSON) logs.
+
+    Each `update` only parses the lines appended since the last update (only lines with a
+    known marker are JSON decoded), tracking:
+        * signing (BINGO/HOORAY) commits
+        * view changes
+        * sync progress ([SYNC] logs)
+        * errors & invalid blocks
+
+    The read position and summary are saved at `state_path`, which is shared by all AutoNode processes.
+    Updates are done under a file lock and continue from the latest saved state, so each line is only
+    indexed once and a restarted process resumes where the last one stopped instead of rescanning the log.
+    """
+
+    def __init__(self, log_dir, state_path):
+        self.log_dir = log_dir
+        self.state_path = state_path
+        self._tailer = None
+        self._partial_line = b''
+        self._summary = {}
+        self._state_stat = None  # (inode, mtime, size) of the state file when last loaded or saved.
+        self._lock = threading.Lock()
+        self._reset_summary()
+        self._load_state()
+
+    def _reset_summary(self):
+        self._summary = {
+            "log-path": None,
+            "lines": 0,
+            "last-signing-time": None,
+            "last-signing-line": None,
+            "last-signed-block": None,
+            "latest-block": None,
+            "view-changes": 0,
+            "errors": 0,
+            "last-error": None,
+            "last-sync": None,
+            "invalid-block": False,
+        }
+        self._partial_line = b''
+
+    def _get_state_stat(self):
+        try:
+            st = os.stat(self.state_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load_state(self):
+        """
+        Continue from the saved state, if it was saved (i.e: by another process) since it was last loaded or saved.
+        """
+        state_stat = self._get_state_stat()
+        if state_stat is None or state_stat == self._state_stat:
+            return
+        self._state_stat = state_stat
+        if self._tailer is not None:
+            self._tailer.close()
+        try:
+            with open(self.state_path, 'r', encoding='utf8') as f:
+                state = json.load(f)
+            self._reset_summary()
+            self._summary.update(state['summary'])
+            self._tailer = LogTailer(self._summary['log-path'])
+            if not self._tailer.resume(state['inode'], state['offset']):
+                raise ValueError("Log changed since the index was saved")
+        except (IOError, ValueError, KeyError, TypeError):
+            self._reset_summary()
+            self._tailer = None
+
+    def _save_state(self):
+        state = {
+            "inode": self._tailer.inode,
+            "offset": self._tailer.offset - len(self._partial_line),
+            "summary": self._summary
+        }
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+        self._state_stat = self._get_state_stat()
+
+    def _index_line(self, line):
+        summary = self._summary
+        summary['lines'] += 1
+        is_signing = any(m in line for m in signing_markers)
+        is_view_change = any(m in line for m in view_change_markers)
+        is_sync, is_error = sync_marker in line, error_marker in line
+        is_invalid_block = invalid_block_marker in line
+        if not (is_signing or is_view_change or is_sync or is_error or is_invalid_block):
+            return
+        try:
+            entry = json.loads(line.decode('utf8', errors='replace'))
+            entry = entry if isinstance(entry, dict) else {}
+        except ValueError:
+            entry = {}
+        timestamp = parse_log_time(line)
+        block = entry.get('blockNum', entry.get('myBlock', None))
+        block = block if isinstance(block, int) else None
+        if block is not None:
+            summary['latest-block'] = max(block, summary['latest-block'] or 0)
+        if is_signing:
+            summary['last-signing-time'] = timestamp
+            summary['last-signing-line'] = summary['lines']
+            summary['last-signed-block'] = block
+        if is_view_change:
+            summary['view-changes'] += 1
+        if is_sync:
+            summary['last-sync'] = {"time": timestamp, "block": block, "message": entry.get('message', None)}
+        if is_error:
+            summary['errors'] += 1
+            summary['last-error'] = {"time": timestamp, "message": entry.get('message', None)}
+        if is_invalid_block:
+            summary['invalid-block'] = True
+
+    def update(self, path=None):
+        """
+        Index the lines appended to the log at `path` (default is the latest log) and return the summary.
+
+        Raises IOError if the index could not be saved.
+        """
+        with self._lock, FileLock(self.state_path):
+            path = latest_log_file(self.log_dir) if path is None else path
+            if path is None:
+                return self._summary.copy()
+            self._load_state()
+            if self._tailer is None or self._tailer.path != path:
+                if self._tailer is not None:
+                    self._tailer.close()
+                self._tailer = LogTailer(path)
+            start_offset = self._tailer.offset
+            for chunk in self._tailer.read_chunks():
+                if chunk is None:
+                    self._reset_summary()
+                    self._summary['log-path'] = path
+                    continue
+                lines = (self._partial_line + chunk).split(b'\n')
+                self._partial_line = lines.pop()
+                for line in lines:
+                    self._index_line(line)
+            if self._tailer.offset != start_offset:
+                self._save_state()
+            return self._summary.copy()
+
+    def summary(self):
+        """
+        Summary of the indexed log as of the last `update`.
+        """
+        with self._lock:
+            return self._summary.copy()
@@ -0,0 +1,160 @@
+"""
+Library for the Prometheus-compatible metrics served by the AutoNode monitor.
+
+Metrics are kept in memory and rendered in the Prometheus text exposition format
+on `GET /metrics`, so no parsing of the monitor log is needed to scrape node health.
+"""
+
+import threading
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer
+)
+
+default_latency_buckets = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_registry = []
+_server = None
+_server_lock = threading.Lock()
+
+
+def _escape(value, quotes=True):
+    """
+    Escape a label value (or help text, without `quotes`) as required by the exposition format.
+    """
+    value = str(value).replace('\\', '\\\\').replace('\n', '\\n')
+    return value.replace('"', '\\"') if quotes else value
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return f'{{{pairs}}}'
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, doc, labels=()):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        assert len(labels) == len(self.labels), f"{self.name} expects labels {self.labels}"
+        return tuple(labels)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {_escape(self.doc, quotes=False)}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labels, k)} {v}" for k, v in self._values.items()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            key = self._key(labels)
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        return [f"{self.name}_total{_format_labels(self.labels, k)} {v}" for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, doc, labels=(), buckets=default_latency_buckets):
+        super(Histogram, self).__init__(name, doc, labels=labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        with self._lock:
+            key = self._key(labels)
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def _samples(self):
+        samples = []
+        label_names = self.labels + ('le',)
+        for key, (counts, total, count) in self._values.items():
+            for bound, bucket_count in zip(self.buckets, counts):
+                samples.append(f"{self.name}_bucket{_format_labels(label_names, key + (bound,))} {bucket_count}")
+            samples.append(f"{self.name}_bucket{_format_labels(label_names, key + ('+Inf',))} {count}")
+            samples.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            samples.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return samples
+
+
+def render():
+    """
+    Render all metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # Do not spam the monitor log with scrapes.
+
+
+def serve(port, host="127.0.0.1"):
+    """
+    Serve `/metrics` on the given `port` in a background thread.
+    Only 1 server is started per process, later calls are no-ops.
+
+    Metrics include validator data, so by default they are only served locally.
+    Use a `host` of "0.0.0.0" to serve them on all interfaces.
+
+    Raises OSError if the port can not be bound.
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="autonode-metrics", daemon=True).start()
+        return _server
@@ -2,22 +2,33 @@
 Library for all things related to running the monitor for AutoNode.
 """
 
+import asyncio
 import datetime
+import functools
 import json
 import logging
 import os
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 from pyhmy import (
     blockchain,
-    cli,
-    json_load,
     staking,
     Typgpy,
     exceptions
 )
 
+from . import (
+    metrics,
+    receipts
+)
+from .cache import (
+    get_all_validator_addresses,
+    get_latest_epoch,
+    get_sharding_structure,
+    invalidate_validator_addresses
+)
 from .common import (
     log,
     harmony_dir,
@@ -27,110 +38,460 @@ from .common import (
     load_node_config,
     saved_node_config_path
 )
+from .cycle import (
+    CallResult,
+    call_deadline,
+    run_calls
+)
 from .exceptions import (
     ResetNode
 )
+from .rpc import (
+    get_connection_stats
+)
 from .node import (
     wait_for_node_response,
     assert_no_invalid_blocks,
+    get_consensus_summary
 )
 from .util import (
-    get_simple_rotating_log_handler
+    get_simple_rotating_log_handler,
+    shard_for_bls
 )
 from .validator import (
-    check_and_activate,
-    get_validator_information
+    check_and_activate
+)
+from .watch import (
+    FileWatcher
 )
 
 log_path = f"{harmony_dir}/autonode_monitor.log"
+fleet_log_path = f"{harmony_dir}/autonode_fleet_monitor.log"
+local_endpoint = 'http://localhost:9500/'
 progress_check_interval = 300  # Must account for view-change
 node_epoch_slack = 100  # Account for recovery time
+compact_log_snapshot_interval = 100  # cycles
+block_one_check_interval = 10  # cycles between block 1 hash checks
+
+_last_consensus_summary = None  # Last logged consensus summary
+
+_block_height_gauge = metrics.Gauge("autonode_block_height", "Latest block number of the node", ("chain",))
+_epoch_lag_gauge = metrics.Gauge("autonode_epoch_lag", "Epochs the node is behind the beacon endpoint", ("chain",))
+_epos_status_gauge = metrics.Gauge("autonode_validator_epos_status", "1 for the current EPOS status", ("status",))
+_active_gauge = metrics.Gauge("autonode_validator_active", "1 if the validator is active, otherwise 0")
+_signing_rate_gauge = metrics.Gauge("autonode_validator_signing_rate", "Signed over to-sign blocks this epoch")
+_connections_gauge = metrics.Gauge("autonode_rpc_connections", "Connections opened or reused per endpoint",
+                                   ("endpoint", "state"))
+_query_latency_histogram = metrics.Histogram("autonode_monitor_query_latency_seconds",
+                                             "Latency of each monitor cycle query", ("query",))
+_query_failure_counter = metrics.Counter("autonode_monitor_query_failures", "Failed monitor cycle queries",
+                                         ("query",))
+_cycle_duration_histogram = metrics.Histogram("autonode_monitor_cycle_duration_seconds",
+                                              "Duration of a monitor cycle (excluding the sleep between cycles)")
+
+
+def _serve_metrics():
+    """
+    Serve the metrics on the configured port (if any), only on localhost unless 'expose-metrics'.
+    """
+    if not node_config['metrics-port']:
+        return
+    host = "0.0.0.0" if node_config['expose-metrics'] else "127.0.0.1"
+    try:
+        metrics.serve(node_config['metrics-port'], host=host)
+    except OSError as e:
+        log(f"{Typgpy.WARNING}Could not serve metrics on {host}:{node_config['metrics-port']}, "
+            f"error: {e}{Typgpy.ENDC}")
+
+
+def _get_block_one_hash(endpoint):
+    """
+    Returns the hash of block 1 on the `endpoint`, or None if the endpoint does not have block 1 yet.
+    """
+    block = blockchain.get_block_by_number(1, endpoint=endpoint, timeout=call_deadline)
+    return block['hash'] if block is not None else None
+
+
+def _get_cycle_calls(shard_endpoint, check_block_one=True):
+    """
+    All independent queries of a monitor cycle, keyed by name.
+    The block 1 hashes are only queried if `check_block_one`.
+    """
+    calls = {
+        'metadata': functools.partial(blockchain.get_node_metadata, local_endpoint, timeout=call_deadline),
+        'headers': functools.partial(blockchain.get_latest_headers, local_endpoint, timeout=call_deadline),
+        'all-validators': functools.partial(get_all_validator_addresses,
+                                            endpoint=node_config['endpoint'], timeout=call_deadline),
+        'consensus': get_consensus_summary,
+    }
+    if validator_config['validator-addr'] and not node_config['no-validator']:
+        calls['validator-info'] = functools.partial(staking.get_validator_information,
+                                                    validator_config['validator-addr'],
+                                                    endpoint=node_config['endpoint'], timeout=call_deadline)
+    if node_config['auto-reset'] and node_config['network'] != "mainnet":
+        calls.update({
+            'network-epoch': functools.partial(blockchain.get_current_epoch,
+                                               endpoint=shard_endpoint, timeout=call_deadline),
+            'node-epoch': functools.partial(blockchain.get_current_epoch,
+                                            endpoint=local_endpoint, timeout=call_deadline),
+        })
+        if check_block_one:
+            calls.update({
+                'ref-block-1': functools.partial(_get_block_one_hash, shard_endpoint),
+                'node-block-1': functools.partial(_get_block_one_hash, local_endpoint),
+            })
+    return calls
+
+
+def _update_metrics(results, is_validator):
+    """
+    Feed the metrics with the results of the current monitor cycle.
+    """
+    for name, result in results.items():
+        _query_latency_histogram.observe(result.duration, name)
+        if result.error is not None:
+            _query_failure_counter.inc(name)
+    if results['headers'].error is None:
+        beacon_epoch = get_latest_epoch(node_config['endpoint'])
+        for chain in ('shard', 'beacon'):
+            header = results['headers'].value.get(f'{chain}-chain-header', None) or {}
+            if 'blockNumber' in header:
+                _block_height_gauge.set(header['blockNumber'], chain)
+            if beacon_epoch is not None and 'epoch' in header:
+                _epoch_lag_gauge.set(beacon_epoch - header['epoch'], chain)
+    if is_validator and 'validator-info' in results and results['validator-info'].error is None:
+        val_chain_info = results['validator-info'].value
+        _epos_status_gauge.clear()
+        if val_chain_info.get('epos-status', None) is not None:
+            _epos_status_gauge.set(1, val_chain_info['epos-status'])
+        _active_gauge.set(int(val_chain_info.get('active-status', None) == 'active'))
+        try:
+            performance = val_chain_info['current-epoch-performance']['current-epoch-signing-percent']
+            _signing_rate_gauge.set(float(performance['current-epoch-signing-percentage']))
+        except (KeyError, TypeError, ValueError):
+            pass  # Not elected, so no performance for the epoch.
+    for endpoint, stats in get_connection_stats().items():
+        _connections_gauge.set(stats['opened'], endpoint, 'opened')
+        _connections_gauge.set(stats['reused'], endpoint, 'reused')
+
+
+class _EpochProgressCheck:
+    """
+    Timer driven state machine for the 'node epoch is ahead of network epoch' hard-reset trigger.
+
+    IDLE -> SUSPECT: node epoch is ahead of the network epoch, record the network epoch.
+    SUSPECT -> reset: `progress_check_interval` seconds later, the network made progress but is still behind the node.
+    SUSPECT -> SUSPECT: `progress_check_interval` seconds later, the network made no progress (re-record the epoch).
+    SUSPECT -> IDLE: node epoch is no longer ahead of the network epoch.
 
+    Nothing blocks, so the monitor keeps reporting (and activating) while a reset is suspected.
+    """
+
+    def __init__(self):
+        self.suspect_network_epoch = None
+        self.suspect_time = None
+
+    def is_suspect(self):
+        return self.suspect_time is not None
+
+    def clear(self):
+        self.suspect_network_epoch, self.suspect_time = None, None
+
+    def _suspect(self, network_epoch):
+        self.suspect_network_epoch, self.suspect_time = network_epoch, time.monotonic()
+
+    def update(self, network_epoch, node_epoch, shard_endpoint):
+        """
+        Raises a ResetNode exception if the network made progress since
+        the node's epoch was first seen ahead of the network's epoch.
+        """
+        if node_epoch <= network_epoch:
+            if self.is_suspect():
+                log(f"{Typgpy.OKGREEN}Epoch of node is no longer higher than endpoint epoch.{Typgpy.ENDC}")
+            self.clear()
+            return
+        if not self.is_suspect():
+            log(f"{Typgpy.WARNING}Epoch of node higher than endpoint epoch, checking endpoint progress in "
+                f"{progress_check_interval} seconds for hard-reset trigger.{Typgpy.ENDC}")
+            self._suspect(network_epoch)
+            return
+        if time.monotonic() - self.suspect_time < progress_check_interval:
+            return
+        if self.suspect_network_epoch < network_epoch < node_epoch:  # made progress so reset
+            self.clear()
+            raise ResetNode(f"Blockchains don't match! Network "
+                            f"epoch {network_epoch} < Node epoch {node_epoch + node_epoch_slack}", clean=True)
+        log(f"{Typgpy.WARNING} Shard endpoint ({shard_endpoint}) is not making progress, "
+            f"possible endpoint issue, or hard-reset.{Typgpy.ENDC}")
+        self._suspect(network_epoch)
+
+
+_epoch_progress_check = _EpochProgressCheck()
+
+
+class _BlockOneCheck:
+    """
+    Schedule of the 'block 1 hashes don't match' hard-reset trigger.
+
+    Block 1 of the network only changes on a hard reset, so its hash is only checked every
+    `block_one_check_interval` cycles. Nothing is cached, the network's and node's hashes are
+    always fetched together so that a reset of either one is seen.
+    """
+
+    def __init__(self):
+        self.cycle = 0
 
-def _check_for_hard_reset(shard_endpoint, error_ok=False):
+    def clear(self):
+        self.cycle = 0
+
+    def next_cycle(self):
+        """
+        Returns True if the block 1 hashes are to be checked in the next cycle.
+        """
+        is_due = self.cycle % block_one_check_interval == 0
+        self.cycle += 1
+        return is_due
+
+
+_block_one_check = _BlockOneCheck()
+
+
+def _check_for_hard_reset(shard_endpoint, results, error_ok=False):
     """
     Raises a ResetNodeError if blockchain does not match.
+    `results` are the CallResults of the current monitor cycle.
 
     Only used on testnets.
     """
     if node_config['network'] == "mainnet":
         return
-    network_epoch = blockchain.get_current_epoch(endpoint=shard_endpoint)
-    node_epoch = blockchain.get_current_epoch(endpoint='http://localhost:9500')
+    network_epoch = results['network-epoch'].get()
+    node_epoch = results['node-epoch'].get()
     if network_epoch == 0 or node_epoch == 0:
         return  # Don't hard reset on epoch 0, network could still be initing & resetting many times.
     else:
         node_epoch -= node_epoch_slack  # Slack to account for ops related hiccups on testnets.
-    if node_epoch > network_epoch:
-        log(f"{Typgpy.WARNING}Epoch of node higher than endpoint epoch, sleeping {progress_check_interval} seconds "
-            f"before checking endpoint progress for hard-reset trigger.{Typgpy.ENDC}")
-        time.sleep(progress_check_interval)  # check that network is not making progress
-        new_network_epoch = blockchain.get_latest_header(endpoint=shard_endpoint)['epoch']
-        if network_epoch < new_network_epoch < node_epoch:  # made progress so reset
-            raise ResetNode(f"Blockchains don't match! Network "
-                            f"epoch {new_network_epoch} < Node epoch {node_epoch + node_epoch_slack}", clean=True)
-        else:
-            log(f"{Typgpy.WARNING} Shard endpoint ({shard_endpoint}) is not making progress, "
-                f"possible endpoint issue, or hard-reset.{Typgpy.ENDC}")
+    _epoch_progress_check.update(network_epoch, node_epoch, shard_endpoint)
     try:
         assert_no_invalid_blocks()
     except AssertionError as e:
         raise ResetNode("INVALID BLOCK", clean=True) from e
-    fb_ref_hash = blockchain.get_block_by_number(1, endpoint=shard_endpoint)['hash']
-    fb_hash = blockchain.get_block_by_number(1)['hash']
+    if 'ref-block-1' not in results:
+        return True  # Block 1 hashes are not checked in this cycle.
+    fb_ref_hash = results['ref-block-1'].get()
+    fb_hash = results['node-block-1'].get()
     if not error_ok and fb_hash is not None and fb_ref_hash is not None and fb_hash != fb_ref_hash:
         raise ResetNode(f"Blockchains don't match! "
                         f"Block 1 hash of chain: {fb_ref_hash} != Block 1 hash of node {fb_hash}", clean=True)
     return True
 
 
+def _refresh_validator_set(results):
+    """
+    Re-read the validator set of the cycle `results` if it is missing the validator, even though its
+    validator info was found, i.e: the validator was created mid-epoch by another process (setup or the CLI).
+    """
+    all_val, val_info = results['all-validators'], results.get('validator-info', None)
+    if all_val.error is not None or val_info is None or val_info.error is not None \
+            or validator_config['validator-addr'] in all_val.value:
+        return
+    invalidate_validator_addresses(node_config['endpoint'])
+    start_time = time.monotonic()
+    try:
+        value = get_all_validator_addresses(endpoint=node_config['endpoint'], timeout=call_deadline)
+        results['all-validators'] = CallResult(value=value, duration=time.monotonic() - start_time)
+    except Exception as e:  # Surfaced to the caller through `CallResult.get`
+        results['all-validators'] = CallResult(error=e, duration=time.monotonic() - start_time)
+
+
+def _run_cycle(loop, shard_endpoint):
+    """
+    Run the queries & checks of a single monitor cycle on the event `loop`.
+
+    Returns the dict of CallResults of the cycle's queries.
+    Raises a ResetNode exception if a hard reset is needed.
+    """
+    results = run_calls(loop, _get_cycle_calls(shard_endpoint, check_block_one=_block_one_check.next_cycle()))
+    _refresh_validator_set(results)
+    _update_metrics(results, results['all-validators'].error is None
+                    and validator_config["validator-addr"] in results['all-validators'].value)
+    if node_config["auto-reset"]:
+        _check_for_hard_reset(shard_endpoint, results)
+    return results
+
+
+def _log_cycle(meta_data, results, val_chain_info, activate_count):
+    """
+    Log the results of a monitor cycle in full.
+    """
+    log(f"{Typgpy.HEADER}Validator address: {Typgpy.OKGREEN}{validator_config['validator-addr']}"
+        f"{Typgpy.ENDC}")
+    log(f"{Typgpy.HEADER}Node BLS keys: {Typgpy.OKGREEN}{meta_data['blskey']}{Typgpy.ENDC}")
+    log(f"{Typgpy.HEADER}Node version: {Typgpy.OKGREEN}{meta_data['version']}{Typgpy.ENDC}")
+    log(f"{Typgpy.HEADER}Node network: {Typgpy.OKGREEN}{meta_data['network']}{Typgpy.ENDC}")
+    log(f"{Typgpy.HEADER}Node is leader: {Typgpy.OKGREEN}{meta_data['is-leader']}{Typgpy.ENDC}")
+    log(f"{Typgpy.HEADER}Node is archival: {Typgpy.OKGREEN}{meta_data['is-archival']}{Typgpy.ENDC}")
+    log(f"{Typgpy.HEADER}Node shard: {Typgpy.OKGREEN}{meta_data['shard-id']}{Typgpy.ENDC}")
+    log(f"{Typgpy.HEADER}Node role: {Typgpy.OKGREEN}{meta_data['role']}{Typgpy.ENDC}")
+    if val_chain_info is not None:
+        log(f"{Typgpy.HEADER}EPOS status: {Typgpy.OKGREEN}{val_chain_info['epos-status']}{Typgpy.ENDC}")
+        log(f"{Typgpy.HEADER}Active status: {Typgpy.OKGREEN}{val_chain_info['active-status']}"
+            f"{Typgpy.ENDC}")
+        log(f"{Typgpy.HEADER}Booted status: {Typgpy.OKGREEN}{val_chain_info['booted-status']}"
+            f"{Typgpy.ENDC}")
+        log(f"{Typgpy.HEADER}Current epoch performance: {Typgpy.OKGREEN}"
+            f"{json.dumps(val_chain_info['current-epoch-performance'], indent=4)}{Typgpy.ENDC}")
+        if node_config["auto-active"]:
+            log(f"{Typgpy.HEADER}Auto activation count: {Typgpy.OKGREEN}{activate_count}{Typgpy.ENDC}")
+        pending_txs = receipts.get_transactions(status='pending')
+        if pending_txs:
+            log(f"{Typgpy.HEADER}Pending staking transactions: {Typgpy.OKGREEN}"
+                f"{json.dumps({e['tx-hash']: e['kind'] for e in pending_txs}, indent=4)}{Typgpy.ENDC}")
+    elif not node_config["no-validator"]:
+        log(f"{Typgpy.WARNING}{validator_config['validator-addr']} is not a validator.{Typgpy.ENDC}")
+    log(f"{Typgpy.HEADER}This node's latest header at {datetime.datetime.utcnow()}: "
+        f"{Typgpy.OKGREEN}{json.dumps(results['headers'].get(), indent=4)}"
+        f"{Typgpy.ENDC}")
+    if results['consensus'].error is None and results['consensus'].value['log-path'] is not None:
+        _log_consensus_summary(results['consensus'].value)
+
+
+def _log_consensus_summary(summary):
+    """
+    Log the consensus `summary` only if it changed since it was last logged, ignoring the (ever growing) line count.
+    """
+    global _last_consensus_summary
+    summary = {k: v for k, v in summary.items() if k not in {'lines', 'last-signing-line'}}
+    if summary == _last_consensus_summary:
+        return
+    _last_consensus_summary = summary
+    log(f"{Typgpy.HEADER}Node consensus summary (from logs): "
+        f"{Typgpy.OKGREEN}{json.dumps(summary, indent=4)}{Typgpy.ENDC}")
+
+
+def _get_cycle_state(results, val_chain_info, activate_count):
+    """
+    Everything that is logged for a monitor cycle, as a (JSON serializable) dict.
+    """
+    state = {
+        "validator-addr": validator_config['validator-addr'],
+        "node": results['metadata'].get(),
+        "headers": results['headers'].get(),
+    }
+    if val_chain_info is not None:
+        state["validator"] = {
+            "epos-status": val_chain_info['epos-status'],
+            "active-status": val_chain_info['active-status'],
+            "booted-status": val_chain_info['booted-status'],
+            "current-epoch-performance": val_chain_info['current-epoch-performance'],
+        }
+        if node_config["auto-active"]:
+            state["activate-count"] = activate_count
+        state["pending-transactions"] = {e['tx-hash']: e['kind'] for e in receipts.get_transactions(status='pending')}
+    elif not node_config["no-validator"]:
+        state["validator"] = None
+    if results['consensus'].error is None and results['consensus'].value['log-path'] is not None:
+        state["consensus"] = results['consensus'].value
+    return state
+
+
+def _flatten(value, prefix=""):
+    """
+    Flatten nested dicts of `value` to a dict of dotted key paths to values.
+    """
+    if not isinstance(value, dict) or not value:
+        return {prefix: value}
+    flat = {}
+    for key, sub_value in value.items():
+        flat.update(_flatten(sub_value, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+
+class _CompactCycleLog:
+    """
+    Logs each monitor cycle as 1 JSON line of only the (flattened) fields that changed
+    since the previous cycle, with a full snapshot every `compact_log_snapshot_interval` cycles.
+    Removed fields are logged with a null value.
+    """
+
+    def __init__(self):
+        self.cycle = 0
+        self.last_state = None
+
+    def _write(self, entry):
+        entry = {"time": datetime.datetime.utcnow().isoformat() + "Z", **entry}
+        log(json.dumps(entry, separators=(',', ':'), default=str))
+
+    def log_cycle(self, state):
+        state = _flatten(state)
+        if self.last_state is None or self.cycle % compact_log_snapshot_interval == 0:
+            self._write({"cycle": self.cycle, "type": "snapshot", "fields": state})
+        else:
+            changes = {k: v for k, v in state.items() if k not in self.last_state or self.last_state[k] != v}
+            changes.update({k: None for k in self.last_state.keys() if k not in state})
+            self._write({"cycle": self.cycle, "type": "delta", "fields": changes})
+        self.last_state = state
+        self.cycle += 1
+
+    def log_error(self, error):
+        self._write({"cycle": self.cycle, "type": "error", "error": f"{error.__class__.__name__}: {error}"})
+        self.cycle += 1
+
+
 def _run_monitor(shard_endpoint, duration=50):
     """
     Internal function that monitors the node for `duration` seconds.
 
+    All independent queries of a cycle are sent concurrently (each with its own deadline),
+    so a slow endpoint only delays a cycle by its own latency.
+
     Hard reset (clean node.sh reset) triggers:
     1) See invalid block in logs
     2) Node's epoch is greater than network's epoch
     3) Block 1 hashes dont match (on shard)
     """
     activate_count, start_time = 0, time.time()
-    while time.time() - start_time < duration:
-        try:
-            if node_config["auto-reset"]:
-                _check_for_hard_reset(shard_endpoint)
-            log(f"{Typgpy.HEADER}Validator address: {Typgpy.OKGREEN}{validator_config['validator-addr']}{Typgpy.ENDC}")
-            meta_data = blockchain.get_node_metadata('http://localhost:9500/')
-            log(f"{Typgpy.HEADER}Node BLS keys: {Typgpy.OKGREEN}{meta_data['blskey']}{Typgpy.ENDC}")
-            log(f"{Typgpy.HEADER}Node version: {Typgpy.OKGREEN}{meta_data['version']}{Typgpy.ENDC}")
-            log(f"{Typgpy.HEADER}Node network: {Typgpy.OKGREEN}{meta_data['network']}{Typgpy.ENDC}")
-            log(f"{Typgpy.HEADER}Node is leader: {Typgpy.OKGREEN}{meta_data['is-leader']}{Typgpy.ENDC}")
-            log(f"{Typgpy.HEADER}Node is archival: {Typgpy.OKGREEN}{meta_data['is-archival']}{Typgpy.ENDC}")
-            log(f"{Typgpy.HEADER}Node shard: {Typgpy.OKGREEN}{meta_data['shard-id']}{Typgpy.ENDC}")
-            log(f"{Typgpy.HEADER}Node role: {Typgpy.OKGREEN}{meta_data['role']}{Typgpy.ENDC}")
-            all_val = staking.get_all_validator_addresses(endpoint=node_config['endpoint'])
-            if validator_config["validator-addr"] in all_val:
-                val_chain_info = get_validator_information()
-                log(f"{Typgpy.HEADER}EPOS status: {Typgpy.OKGREEN}{val_chain_info['epos-status']}{Typgpy.ENDC}")
-                log(f"{Typgpy.HEADER}Active status: {Typgpy.OKGREEN}{val_chain_info['active-status']}{Typgpy.ENDC}")
-                log(f"{Typgpy.HEADER}Booted status: {Typgpy.OKGREEN}{val_chain_info['booted-status']}{Typgpy.ENDC}")
-                log(f"{Typgpy.HEADER}Current epoch performance: {Typgpy.OKGREEN}"
-                    f"{json.dumps(val_chain_info['current-epoch-performance'], indent=4)}{Typgpy.ENDC}")
-                if node_config["auto-active"]:
-                    if check_and_activate():
+    _epoch_progress_check.clear()
+    _block_one_check.clear()
+    compact_log = _CompactCycleLog()
+    config_watcher = FileWatcher(saved_node_config_path)
+    loop = asyncio.new_event_loop()
+    try:
+        while time.time() - start_time < duration:
+            cycle_start_time = time.monotonic()
+            try:
+                results = _run_cycle(loop, shard_endpoint)
+                meta_data = results['metadata'].get()
+                all_val = results['all-validators'].get()
+                val_chain_info = None
+                # Validator info is not queried without a validator address or with 'no-validator'.
+                if 'validator-info' in results and validator_config["validator-addr"] in all_val:
+                    try:
+                        val_chain_info = results['validator-info'].get()
+                    except exceptions.RPCError:
+                        invalidate_validator_addresses(node_config['endpoint'])  # Validator set might be stale.
+                        raise
+                    if node_config["auto-active"] and check_and_activate():
                         activate_count += 1
-                    log(f"{Typgpy.HEADER}Auto activation count: {Typgpy.OKGREEN}{activate_count}{Typgpy.ENDC}")
-            elif not node_config["no-validator"]:
-                log(f"{Typgpy.WARNING}{validator_config['validator-addr']} is not a validator.{Typgpy.ENDC}")
-            log(f"{Typgpy.HEADER}This node's latest header at {datetime.datetime.utcnow()}: "
-                f"{Typgpy.OKGREEN}{json.dumps(blockchain.get_latest_headers(), indent=4)}"
-                f"{Typgpy.ENDC}")
-        except (exceptions.RPCError, exceptions.RequestsError, exceptions.RequestsTimeoutError) as e:
-            log(f"{Typgpy.WARNING}RPC exception {e}{Typgpy.ENDC}")
-            log(f"{Typgpy.WARNING}Continuing...{Typgpy.ENDC}")
-        finally:
-            if os.path.isfile(saved_node_config_path):
-                load_node_config()
-            time.sleep(check_interval)
+                if node_config["compact-monitor-log"]:
+                    compact_log.log_cycle(_get_cycle_state(results, val_chain_info, activate_count))
+                else:
+                    _log_cycle(meta_data, results, val_chain_info, activate_count)
+            except (exceptions.RPCError, exceptions.RequestsError, exceptions.RequestsTimeoutError,
+                    TimeoutError) as e:
+                if node_config["compact-monitor-log"]:
+                    compact_log.log_error(e)
+                else:
+                    log(f"{Typgpy.WARNING}RPC exception {e}{Typgpy.ENDC}")
+                    log(f"{Typgpy.WARNING}Continuing...{Typgpy.ENDC}")
+            finally:
+                _cycle_duration_histogram.observe(time.monotonic() - cycle_start_time)
+                if config_watcher.changed() and os.path.isfile(saved_node_config_path):
+                    load_node_config()
+                time.sleep(check_interval)
+    finally:
+        config_watcher.close()
+        loop.close()
 
 
 def start(duration=float('inf')):
@@ -142,11 +503,15 @@ def start(duration=float('inf')):
     """
     old_logging_handlers = logging.getLogger('AutoNode').handlers.copy()
     logging.getLogger('AutoNode').addHandler(get_simple_rotating_log_handler(log_path))
+    _serve_metrics()
     try:
         bls_keys = node_config['public-bls-keys']
-        shard = json_load(cli.single_call(['hmy', 'utility', 'shard-for-bls', bls_keys[0],
-                                           '--node', f'{node_config["endpoint"]}']))['shard-id']
-        shard_endpoint = blockchain.get_sharding_structure(endpoint=node_config['endpoint'])[shard]['http']
+        shard = shard_for_bls(bls_keys[0])
+        try:
+            shard_endpoint = get_sharding_structure()[shard]['http']
+        except (IndexError, KeyError):  # Cached structure is outdated.
+            shard_endpoint = get_sharding_structure(refresh=True)[shard]['http']
+        receipts.start_polling()
         _run_monitor(shard_endpoint, duration=duration)
     except Exception as err:  # Catch all to handle recover options
         log(traceback.format_exc())
@@ -159,3 +524,135 @@ def start(duration=float('inf')):
             logging.getLogger('AutoNode').handlers = old_logging_handlers
             raise err
     logging.getLogger('AutoNode').handlers = old_logging_handlers
+
+
+_fleet_up_gauge = metrics.Gauge("autonode_fleet_node_up", "1 if the fleet node answered this cycle", ("node",))
+_fleet_block_height_gauge = metrics.Gauge("autonode_fleet_block_height", "Latest block number of a fleet node",
+                                          ("node", "chain"))
+_fleet_block_lag_gauge = metrics.Gauge("autonode_fleet_block_lag", "Blocks a fleet node is behind its shard",
+                                       ("node",))
+_fleet_active_gauge = metrics.Gauge("autonode_fleet_validator_active",
+                                    "1 if the validator of a fleet node is active, otherwise 0", ("validator",))
+_fleet_cycle_duration_histogram = metrics.Histogram("autonode_fleet_cycle_duration_seconds",
+                                                    "Duration of a fleet monitor cycle")
+
+
+def _get_fleet_cycle_calls(nodes, node_shards):
+    """
+    All independent queries of a fleet monitor cycle, keyed by (node endpoint or None for shared, name).
+
+    Beacon lookups (validator set, validator info & shard heights) are only sent once
+    per cycle for the whole fleet, no matter how many nodes share them.
+    """
+    calls = {
+        (None, 'all-validators'): functools.partial(get_all_validator_addresses,
+                                                    endpoint=node_config['endpoint'], timeout=call_deadline),
+    }
+    for endpoint, validator_addr in nodes:
+        calls[(endpoint, 'metadata')] = functools.partial(blockchain.get_node_metadata, endpoint,
+                                                          timeout=call_deadline)
+        calls[(endpoint, 'headers')] = functools.partial(blockchain.get_latest_headers, endpoint,
+                                                         timeout=call_deadline)
+        if validator_addr:
+            calls[(None, f'validator-info:{validator_addr}')] = functools.partial(
+                staking.get_validator_information, validator_addr, endpoint=node_config['endpoint'],
+                timeout=call_deadline)
+    for shard in set(node_shards.values()):
+        try:
+            shard_endpoint = get_sharding_structure()[shard]['http']
+        except (IndexError, KeyError, TypeError):
+            continue
+        calls[(None, f'shard-height:{shard}')] = functools.partial(blockchain.get_block_number,
+                                                                   endpoint=shard_endpoint, timeout=call_deadline)
+    return calls
+
+
+def _log_fleet_cycle(nodes, node_shards, results):
+    """
+    Log (and feed the metrics with) one summary line per node of the fleet.
+    """
+    all_val = results[(None, 'all-validators')]
+    all_val = all_val.value if all_val.error is None else frozenset()
+    for endpoint, validator_addr in nodes:
+        meta_data, headers = results[(endpoint, 'metadata')], results[(endpoint, 'headers')]
+        if meta_data.error is not None or headers.error is not None:
+            _fleet_up_gauge.set(0, endpoint)
+            log(f"{Typgpy.WARNING}[{endpoint}] node is not responding: "
+                f"{meta_data.error or headers.error}{Typgpy.ENDC}")
+            continue
+        _fleet_up_gauge.set(1, endpoint)
+        node_shards[endpoint] = meta_data.value['shard-id']
+        shard_header = headers.value.get('shard-chain-header', None) or {}
+        beacon_header = headers.value.get('beacon-chain-header', None) or {}
+        for chain, header in (('shard', shard_header), ('beacon', beacon_header)):
+            if 'blockNumber' in header:
+                _fleet_block_height_gauge.set(header['blockNumber'], endpoint, chain)
+        lag = None
+        shard_height = results.get((None, f"shard-height:{node_shards[endpoint]}"), None)
+        if shard_height is not None and shard_height.error is None and 'blockNumber' in shard_header:
+            lag = max(shard_height.value - shard_header['blockNumber'], 0)
+            _fleet_block_lag_gauge.set(lag, endpoint)
+        status = ""
+        if validator_addr and validator_addr not in all_val:
+            status = f", {validator_addr} is not a validator"
+        elif validator_addr:
+            val_info = results[(None, f'validator-info:{validator_addr}')]
+            if val_info.error is None:
+                _fleet_active_gauge.set(int(val_info.value['active-status'] == 'active'), validator_addr)
+                status = f", EPOS status: {val_info.value['epos-status']}, " \
+                         f"active status: {val_info.value['active-status']}"
+        log(f"{Typgpy.HEADER}[{endpoint}] shard {meta_data.value['shard-id']}, "
+            f"block {shard_header.get('blockNumber', None)}, lag {lag}, "
+            f"epoch {shard_header.get('epoch', None)}, version {meta_data.value['version']}"
+            f"{status}{Typgpy.ENDC}")
+
+
+def _run_fleet_monitor(nodes, duration=50):
+    """
+    Internal function that monitors the fleet of `nodes` for `duration` seconds.
+
+    The fleet has its own executor with a worker for every query of a cycle (at most 4 per node: metadata,
+    headers, validator info & shard height, plus the validator set), so no query waits on another node's.
+    """
+    start_time, node_shards = time.time(), {}
+    loop = asyncio.new_event_loop()
+    executor = ThreadPoolExecutor(max_workers=4 * len(nodes) + 1, thread_name_prefix="autonode-fleet")
+    try:
+        while time.time() - start_time < duration:
+            cycle_start_time = time.monotonic()
+            try:
+                results = run_calls(loop, _get_fleet_cycle_calls(nodes, node_shards), executor=executor)
+                _log_fleet_cycle(nodes, node_shards, results)
+                for name, result in results.items():
+                    _query_latency_histogram.observe(result.duration, name[1].split(':')[0])
+                    if result.error is not None:
+                        _query_failure_counter.inc(name[1].split(':')[0])
+            except (exceptions.RPCError, exceptions.RequestsError, exceptions.RequestsTimeoutError,
+                    TimeoutError) as e:
+                log(f"{Typgpy.WARNING}RPC exception {e}{Typgpy.ENDC}")
+                log(f"{Typgpy.WARNING}Continuing...{Typgpy.ENDC}")
+            finally:
+                _fleet_cycle_duration_histogram.observe(time.monotonic() - cycle_start_time)
+                time.sleep(check_interval)
+    finally:
+        loop.close()
+        executor.shutdown(wait=False)
+
+
+def start_fleet(nodes, duration=float('inf')):
+    """
+    Start a (read-only) monitor of a fleet of nodes for duration seconds, all from this process.
+
+    `nodes` is a list of (node RPC endpoint, validator address or None) tuples.
+    Nothing is activated or reset, as that needs the wallet & node of each host.
+    """
+    old_logging_handlers = logging.getLogger('AutoNode').handlers.copy()
+    logging.getLogger('AutoNode').addHandler(get_simple_rotating_log_handler(fleet_log_path))
+    _serve_metrics()
+    try:
+        _run_fleet_monitor(nodes, duration=duration)
+    except Exception as err:
+        log(traceback.format_exc())
+        log(f"{Typgpy.FAIL}Fleet monitor failed with error: {err}{Typgpy.ENDC}")
+    finally:
+        logging.getLogger('AutoNode').handlers = old_logging_handlers
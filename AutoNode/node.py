@@ -2,6 +2,7 @@
 Library for all things related to running a Harmony node with AutoNode.
 """
 
+import functools
 import glob
 import json
 import logging
@@ -15,10 +16,13 @@ import pyhmy.rpc.exceptions as rpc_exception
 import requests
 from pyhmy import (
     blockchain,
-    cli,
     Typgpy
 )
 
+from . import (
+    process,
+    retry
+)
 from .common import (
     log,
     node_script_source,
@@ -28,10 +32,20 @@ from .common import (
     bls_key_dir,
     harmony_dir
 )
+from .logs import (
+    ConsensusIndex,
+    last_signing_time,
+    latest_log_file
+)
+from .retry import (
+    RetryPolicy,
+    endpoint_max_delay
+)
 from .util import (
     input_with_print,
     get_simple_rotating_log_handler,
     is_bls_file,
+    shard_for_bls
 )
 
 node_sh_out_path = f"{node_sh_log_dir}/out.log"
@@ -42,6 +56,9 @@ log_path = f"{harmony_dir}/autonode_node.log"
 rclone_space_buffer = 5 * 2 ** 30  # 5GB in bytes
 rclone_config = "harmony"
 
+consensus_index_path = f"{harmony_dir}/consensus_index.json"
+_consensus_index = ConsensusIndex(f"{node_dir}/latest", consensus_index_path)
+
 
 def _node_clean(verbose=True):
     log_dir = f"{node_dir}/latest"
@@ -166,9 +183,8 @@ def _get_node_shard():
         log(f"{Typgpy.WARNING}No saved BLS keys for node!{Typgpy.ENDC}")
     for bls_key in node_config['public-bls-keys']:
         try:
-            key_shards.append(json.loads(cli.single_call(['hmy', 'utility', 'shard-for-bls', bls_key,
-                                                          '--node', f'{node_config["endpoint"]}']))['shard-id'])
-        except json.decoder.JSONDecodeError:
+            key_shards.append(shard_for_bls(bls_key))
+        except (json.decoder.JSONDecodeError, RuntimeError, AssertionError, ValueError):
             log(f'{Typgpy.WARNING}[!] Failed to get shard for bls key {bls_key}!{Typgpy.ENDC}')
     if not key_shards:
         return None
@@ -181,9 +197,9 @@ def start(auto=False, verbose=True):
     """
     Start the harmony process and return the PID.
 
-    Note that process is running after function return.
+    Note that process is running after function return and is tracked for `assert_started`.
     """
-    if subprocess.call(["pgrep", "harmony"], env=os.environ) == 0:
+    if process.is_running("harmony"):
         raise RuntimeError("Harmony process is already running, can only start 1 node on machine with AutoNode.")
     old_logging_handlers = logging.getLogger('AutoNode').handlers.copy()
     logging.getLogger('AutoNode').addHandler(get_simple_rotating_log_handler(log_path))
@@ -250,66 +266,101 @@ def start(auto=False, verbose=True):
             if verbose:
                 log(f"{Typgpy.HEADER}Starting node!{Typgpy.ENDC}")
             logging.getLogger('AutoNode').handlers = old_logging_handlers  # Reset logger to old handlers
-            return subprocess.Popen(node_args, env=os.environ, stdout=fo, stderr=fe).pid
+            pid = subprocess.Popen(node_args, env=os.environ, stdout=fo, stderr=fe).pid
+            process.track(pid)
+            return pid
 
 
 # TODO (low prio): create stream load printer for multiple waits_for_node_response
 def wait_for_node_response(endpoint, verbose=True, tries=float("inf"), sleep=0.5):
-    count = 0
-    while True:
+    """
+    Wait for the `endpoint` to respond, for about `tries` * `sleep` seconds.
+
+    An endpoint that answers with an error (i.e: a node that is starting) is checked every `sleep` seconds,
+    an unreachable endpoint is checked with an exponential backoff from `sleep` seconds.
+    """
+    max_elapsed, count, start_time = tries * sleep, 0, time.monotonic()
+
+    def on_retry(error, attempt, delay):
+        nonlocal count
         count += 1
-        try:
-            blockchain.get_latest_header(endpoint=endpoint)
-            break
-        except (rpc_exception.RequestsError, rpc_exception.RequestsTimeoutError,
-                rpc_exception.RPCError):
-            if count > tries:
-                raise TimeoutError(f"{endpoint} did not respond in {count} attempts (~{sleep * count} seconds)")
-            if verbose and count % 10 == 0:
-                log(f"{Typgpy.WARNING}Waiting for {endpoint} to respond, tried {count} times "
-                    f"(~{sleep * count} seconds waited so far){Typgpy.ENDC}")
-            time.sleep(sleep)
+        if verbose and count % 10 == 0:
+            log(f"{Typgpy.WARNING}Waiting for {endpoint} to respond, tried {count} times "
+                f"(~{time.monotonic() - start_time:.0f} seconds waited so far){Typgpy.ENDC}")
+
+    policies = [
+        ((rpc_exception.RequestsError, rpc_exception.RequestsTimeoutError),
+         RetryPolicy(initial_delay=sleep, max_delay=max(sleep, endpoint_max_delay), max_elapsed=max_elapsed)),
+        (rpc_exception.RPCError, RetryPolicy(initial_delay=sleep, max_delay=sleep, jitter=0, max_elapsed=max_elapsed)),
+    ]
+    try:
+        retry.call(functools.partial(blockchain.get_latest_header, endpoint=endpoint), policies, on_retry=on_retry)
+    except (rpc_exception.RequestsError, rpc_exception.RequestsTimeoutError, rpc_exception.RPCError) as e:
+        raise TimeoutError(f"{endpoint} did not respond in {count + 1} attempts "
+                           f"(~{time.monotonic() - start_time:.0f} seconds)") from e
     if verbose:
         log(f"{Typgpy.HEADER}[!] {endpoint} is alive!{Typgpy.ENDC}")
 
 
 def assert_no_invalid_blocks():
     if os.path.isdir(f"{node_dir}/latest"):
-        files = glob.glob(f"{node_dir}/latest/zero*.log")
-        if files:
-            log_path = files[-1]
+        log_path = latest_log_file(f"{node_dir}/latest")
+        if log_path is not None:
             assert not has_invalid_block(
                 log_path), f"`invalid merkle root` present in {log_path}, restart AutoNode with clean option"
 
 
-def is_signing(count=1500):
+def get_consensus_summary():
     """
-    Read the last `count` lines and check for signing logs.
+    Returns the summary of consensus events (signing, view changes, sync, errors)
+    from the node's latest log, indexed since the last call.
+    """
+    try:
+        return _consensus_index.update()
+    except IOError as e:
+        log(f"{Typgpy.WARNING}WARNING: failed to save consensus index, error: {e}{Typgpy.ENDC}")
+        return _consensus_index.summary()
+
+
+def get_last_signing_time(count=1500):
+    """
+    Returns the unix timestamp of the last signing log within the last `count` lines
+    of the node log, or None if there is none.
     """
     if os.path.isdir(f"{node_dir}/latest"):
-        files = glob.glob(f"{node_dir}/latest/zero*.log")
-        if files:
-            log_path = files[-1]
-            content = subprocess.check_output(["tail", "-n", str(count), str(log_path)], env=os.environ).decode().split(
-                "\n")
-            for line in content:
-                line = line.rstrip()
-                if "BINGO" in line or "HOORAY" in line:
-                    return True
-    return False
+        log_path = latest_log_file(f"{node_dir}/latest")
+        if log_path is not None:
+            try:
+                summary = _consensus_index.update(log_path)
+            except IOError:  # Index can not be saved, search the log directly.
+                return last_signing_time(log_path, max_lines=count)
+            if summary['last-signing-line'] is not None and summary['lines'] - summary['last-signing-line'] < count:
+                return summary['last-signing-time'] or os.path.getmtime(log_path)
+    return None
+
+
+def is_signing(count=1500, within=None):
+    """
+    Check the last `count` lines for signing logs.
+    If `within` is given, the last signing log must also be at most `within` seconds old.
+    """
+    signed_at = get_last_signing_time(count=count)
+    if signed_at is None:
+        return False
+    return within is None or time.time() - signed_at <= within
 
 
 def has_invalid_block(log_file_path):
+    """
+    Only the lines appended to the log since the last call are indexed,
+    the (persistent) consensus index is shared by the monitor and validator setup.
+    """
     assert os.path.isfile(log_file_path), f"{log_file_path} is not a file"
     try:
-        with open(log_file_path, 'r', encoding='utf8') as f:
-            for line in f:
-                line = line.rstrip()
-                if "invalid merkle root" in line:
-                    return True
-    except (UnicodeDecodeError, IOError):
-        log(f"{Typgpy.WARNING}WARNING: failed to read `{log_file_path}` to check for invalid block{Typgpy.ENDC}")
-    return False
+        return _consensus_index.update(log_file_path)['invalid-block']
+    except IOError:
+        log(f"{Typgpy.WARNING}WARNING: failed to index `{log_file_path}` to check for invalid block{Typgpy.ENDC}")
+    return _consensus_index.summary()['invalid-block']
 
 
 def assert_valid_bls_key_directory():
@@ -346,19 +397,25 @@ def assert_started(timeout=60, do_log=False):
     """
     Assert the node has started within the given timeout.
     Node that rclone does NOT count towards timeout.
+
+    Processes are checked with 1 scan of /proc per second. If the node was started (and tracked) by
+    this process and it exits without a harmony process running, the node failed to start without waiting.
     """
     has_informed_rclone = False
     start_time = time.time()
     while time.time() - start_time < timeout:
-        if subprocess.call(["pgrep", "rclone"], env=os.environ, stdout=subprocess.DEVNULL) == 0:
+        processes = process.snapshot()
+        if process.find_processes("rclone", processes):
             timeout += 1
             if not has_informed_rclone and do_log:
                 log(f"{Typgpy.WARNING}Fast-sync (rclone) is in progress...{Typgpy.ENDC}")
                 has_informed_rclone = True
-        elif subprocess.call(["pgrep", "harmony"], env=os.environ, stdout=subprocess.DEVNULL) == 0:
+        elif process.find_processes("harmony", processes):
             if do_log:
                 log(f"{Typgpy.OKGREEN}Harmony node is running...{Typgpy.ENDC}")
             return
+        elif process.has_tracked_exited() and not process.is_running("harmony"):
+            break
         time.sleep(1)
     if do_log:
         log(f"{Typgpy.FAIL}Harmony node is NOT running!{Typgpy.ENDC}")
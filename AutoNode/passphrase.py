@@ -5,6 +5,7 @@ Library to take care of all passphrase encryption used by AutoNode.
 import base64
 import os
 import subprocess
+import threading
 
 import pexpect
 from cryptography.fernet import Fernet
@@ -17,6 +18,7 @@ from pyhmy import (
     Typgpy
 )
 
+from . import process
 from .common import (
     validator_config,
     node_config,
@@ -25,6 +27,40 @@ from .common import (
 from .exceptions import (
     InvalidWalletPassphrase
 )
+from .instrument import (
+    timed_cli
+)
+from .keystore import (
+    KeystoreError,
+    check_passphrase
+)
+
+
+_derived_keys = {}  # (pid, start time, salt) -> wallet encryption key, only the latest is kept
+_derived_keys_lock = threading.Lock()
+
+
+def _get_harmony_process_from_proc():
+    """
+    Same as `pgrep harmony` but read from /proc. Returns the (pid, start time) of the harmony process,
+    where the pid (bytes) is as `pgrep` would output it and the start time is None if there is not exactly 1 process.
+
+    Raises OSError if /proc can not be read.
+    """
+    harmony_process = process.get_process("harmony")
+    if harmony_process is None:
+        return b'\n'.join(str(p).encode() for p, _ in process.find_processes("harmony")) or b'0', None
+    return str(harmony_process[0]).encode(), harmony_process[1]
+
+
+def _get_process_info_from_proc(pid, start_time):
+    """
+    Same as `ps -p <pid> -o lstart=` + ' ' + `ps -p <pid> -o command=` but read from /proc.
+    """
+    command = process.get_command(pid)
+    if command is None:
+        return b'0'
+    return process.get_start_time_string(pid, start_time).encode() + b' ' + command
 
 
 def _get_harmony_pid():
@@ -59,10 +95,22 @@ def _derive_wallet_encryption_key():
         PBKDF2HMAC(PID(harmony) + ProcessInfo(harmony), salt=HMAC(node_bls_public_keys, Validator_Addr, Validator_ID))
 
     This means that the encryption key is only valid for when AutoNode has a harmony node process running.
+
+    The harmony process is read from /proc (falling back to pgrep & ps) and the derived key is
+    kept in memory for the (pid, start time, salt) of the key, so it is only derived once per harmony process.
     """
-    pid = _get_harmony_pid().strip()
-    proc_info = _get_process_info(pid).strip()
     salt = _get_node_based_salt().strip()
+    try:
+        pid, start_time = _get_harmony_process_from_proc()
+    except OSError:
+        pid, start_time = _get_harmony_pid().strip(), None
+        proc_info = _get_process_info(pid).strip()
+    else:
+        key_id = (pid, start_time, salt)
+        with _derived_keys_lock:
+            if start_time is not None and key_id in _derived_keys:
+                return _derived_keys[key_id]
+        proc_info = _get_process_info_from_proc(pid, start_time).strip() if start_time is not None else b'0'
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
         length=32,
@@ -71,7 +119,12 @@ def _derive_wallet_encryption_key():
         backend=default_backend()
     )
     data = pid + b' ' + proc_info
-    return base64.urlsafe_b64encode(kdf.derive(data))
+    key = base64.urlsafe_b64encode(kdf.derive(data))
+    if start_time is not None:
+        with _derived_keys_lock:
+            _derived_keys.clear()
+            _derived_keys[(pid, start_time, salt)] = key
+    return key
 
 
 def encrypt_wallet_passphrase(passphrase):
@@ -98,14 +151,22 @@ def decrypt_wallet_passphrase(encrypted_wallet_passphrase):
 def is_valid_passphrase(passphrase, validator_address):
     """
     Validate the given passphrase, can be an expensive call.
+
+    The CLI's keystore is decrypted in-process (a verified passphrase is remembered for a few minutes),
+    the CLI is only used if the keystore can not be read.
     """
+    try:
+        return check_passphrase(validator_address, passphrase)
+    except (KeystoreError, OSError, RuntimeError, ValueError) as e:
+        log(f"{Typgpy.WARNING}Could not check passphrase with keystore, using CLI. Error: {e}{Typgpy.ENDC}")
     cmd = ["hmy", "keys", "check-passphrase", validator_address]
     try:
-        proc = cli.expect_call(cmd)
-        proc.expect("Enter wallet keystore passphrase:\r\n")
-        proc.sendline(passphrase)
-        proc.expect("Valid passphrase\r\n")
-        proc.expect(pexpect.EOF)
+        with timed_cli(cmd):
+            proc = cli.expect_call(cmd)
+            proc.expect("Enter wallet keystore passphrase:\r\n")
+            proc.sendline(passphrase)
+            proc.expect("Valid passphrase\r\n")
+            proc.expect(pexpect.EOF)
         return True
     except RuntimeError as e:
         log(f"{Typgpy.FAIL}Failed to verify passphrase due to: {e}{Typgpy.ENDC}")
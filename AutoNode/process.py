@@ -0,0 +1,233 @@
+"""
+Library for inspecting processes (i.e: the harmony node & rclone) through /proc, without fork/exec.
+
+Process names are matched like `pgrep` does (a regex search of the process name).
+Waiting for a process to exit uses a pidfd where available (Python 3.9+ & Linux 5.3+), otherwise /proc is polled.
+"""
+
+import os
+import re
+import select
+import threading
+import time
+
+_clock_ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+_boot_time = None
+_last_seen = {}  # name pattern -> (pid, start time) of the last seen matching process
+_tracked = None  # (pid, start time) of the process launched by `node.start`
+_lock = threading.Lock()
+
+poll_interval = 0.1  # seconds between /proc checks when a pidfd can not be used
+
+
+def read_stat(pid):
+    """
+    Returns the (name, state, start time in clock ticks since boot) of the process `pid` from /proc.
+    The name is bytes, as shown by `ps -o comm`. Returns None if there is no such process.
+    """
+    try:
+        with open(f"/proc/{int(pid)}/stat", 'rb') as f:
+            stat = f.read()
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    name = stat[stat.index(b'(') + 1:stat.rindex(b')')]
+    fields = stat[stat.rindex(b')') + 2:].split()
+    return name, fields[0].decode(), int(fields[19])
+
+
+def get_boot_time():
+    """
+    Returns the system boot time in seconds since the epoch.
+    """
+    global _boot_time
+    if _boot_time is None:
+        with open("/proc/stat", 'rb') as f:
+            for line in f:
+                if line.startswith(b"btime "):
+                    _boot_time = int(line.split()[1])
+                    break
+    return _boot_time
+
+
+def snapshot():
+    """
+    Scan /proc once. Returns a list of (pid, name, start time) of all live processes, except this one.
+
+    Raises OSError if /proc can not be read.
+    """
+    processes, own_pid = [], os.getpid()
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit() or int(entry) == own_pid:
+            continue
+        stat = read_stat(entry)
+        if stat is not None and stat[1] != 'Z':
+            processes.append((int(entry), stat[0], stat[2]))
+    return processes
+
+
+def find_processes(name, processes=None):
+    """
+    Same as `pgrep <name>`. Returns a sorted list of (pid, start time) of the processes whose name
+    matches the regex `name`, from the given `processes` snapshot or from a new scan of /proc.
+
+    Raises OSError if /proc can not be read.
+    """
+    pattern = re.compile(name.encode())
+    if processes is None:
+        processes = snapshot()
+    return sorted((pid, start_time) for pid, proc_name, start_time in processes if pattern.search(proc_name))
+
+
+def _is_same_process(pid, start_time, name=None):
+    stat = read_stat(pid)
+    return stat is not None and stat[1] != 'Z' and stat[2] == start_time \
+        and (name is None or re.search(name.encode(), stat[0]) is not None)
+
+
+def get_process(name):
+    """
+    Returns the (pid, start time) of the only process whose name matches the regex `name`,
+    or None if there is not exactly 1 such process.
+
+    The last seen matching process is checked first, so /proc is only scanned when it is gone.
+
+    Raises OSError if /proc can not be read.
+    """
+    with _lock:
+        last_seen = _last_seen.get(name, None)
+    if last_seen is not None and _is_same_process(*last_seen, name=name):
+        return last_seen
+    processes = find_processes(name)
+    with _lock:
+        if len(processes) != 1:
+            _last_seen.pop(name, None)
+            return None
+        _last_seen[name] = processes[0]
+    return processes[0]
+
+
+def is_running(name):
+    """
+    Returns True if a process whose name matches the regex `name` is running.
+
+    Raises OSError if /proc can not be read.
+    """
+    with _lock:
+        last_seen = _last_seen.get(name, None)
+    if last_seen is not None and _is_same_process(*last_seen, name=name):
+        return True
+    return bool(find_processes(name))
+
+
+def get_start_time_string(pid, start_time):
+    """
+    Same as `ps -p <pid> -o lstart=` for the process `pid` that started at `start_time` (clock ticks since boot).
+    """
+    return time.strftime("%a %b %e %H:%M:%S %Y", time.localtime(get_boot_time() + start_time // _clock_ticks))
+
+
+def get_command(pid):
+    """
+    Same as `ps -p <pid> -o command=` (as bytes). Returns None if there is no such process.
+    """
+    try:
+        with open(f"/proc/{int(pid)}/cmdline", 'rb') as f:
+            command = f.read().rstrip(b'\0').replace(b'\0', b' ')
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    if not command:
+        stat = read_stat(pid)
+        if stat is None:
+            return None
+        command = b'[' + stat[0] + b']'
+    return command
+
+
+def track(pid):
+    """
+    Track the process `pid`, i.e: the node launched by `node.start`. Returns its (pid, start time).
+    """
+    global _tracked
+    stat = read_stat(pid)
+    with _lock:
+        _tracked = (pid, stat[2]) if stat is not None else None
+        return _tracked
+
+
+def has_tracked_exited():
+    """
+    Returns True if a process was tracked and it is no longer running.
+    """
+    with _lock:
+        tracked = _tracked
+    return tracked is not None and not _is_same_process(*tracked)
+
+
+def _open_pidfd(pid):
+    if not hasattr(os, 'pidfd_open'):
+        return None
+    try:
+        return os.pidfd_open(pid)
+    except ProcessLookupError:
+        raise
+    except OSError:  # Kernel without pidfd support
+        return None
+
+
+def wait_for_exit(pid, timeout=None, start_time=None):
+    """
+    Wait for the process `pid` (optionally only if it started at `start_time`) to exit.
+    Returns True if the process exited, False if it is still running after `timeout` seconds.
+    """
+    if start_time is None:
+        stat = read_stat(pid)
+        if stat is None or stat[1] == 'Z':
+            return True
+        start_time = stat[2]
+    try:
+        pidfd = _open_pidfd(pid)
+    except ProcessLookupError:
+        return True
+    if pidfd is not None:
+        try:
+            if not _is_same_process(pid, start_time):  # The pid was reused before the pidfd was opened.
+                return True
+            poller = select.poll()
+            poller.register(pidfd, select.POLLIN)
+            return bool(poller.poll(None if timeout is None else max(0, int(timeout * 1000))))
+        finally:
+            os.close(pidfd)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while _is_same_process(pid, start_time):
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        time.sleep(poll_interval)
+    return True
+
+
+def wait_for_processes_exit(name, timeout=None):
+    """
+    Wait for all processes whose name matches the regex `name` to exit.
+    Returns True if they all exited, False if any is still running after `timeout` seconds.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for pid, start_time in find_processes(name):
+        remaining = None if deadline is None else max(0, deadline - time.monotonic())
+        if not wait_for_exit(pid, remaining, start_time=start_time):
+            return False
+    return True
+
+
+def signal_processes(name, signum):
+    """
+    Same as `killall -<signum> <name>` but with regex process name matching.
+    Returns the pids that were signaled.
+    """
+    signaled = []
+    for pid, _ in find_processes(name):
+        try:
+            os.kill(pid, signum)
+            signaled.append(pid)
+        except ProcessLookupError:
+            pass
+    return signaled
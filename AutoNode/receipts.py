@@ -0,0 +1,171 @@
+"""
+Library for tracking the receipts of the staking transactions sent by AutoNode.
+
+Sent transactions are recorded in a small journal file, so every AutoNode process (i.e: the monitor)
+sees them, and their receipts are polled in the background until they are confirmed, failed or expired.
+"""
+
+import json
+import os
+import threading
+import time
+
+from . import metrics
+from .common import (
+    harmony_dir,
+    log
+)
+from .rpc import (
+    get_beacon_endpoint
+)
+from .transaction import (
+    check_receipts
+)
+from .util import (
+    FileLock
+)
+from .watch import (
+    FileWatcher
+)
+
+journal_path = f"{harmony_dir}/.tx_journal.json"
+poll_interval = 5  # seconds between receipt checks of pending transactions
+pending_timeout = 600  # seconds before a pending transaction is failed, so it can be sent again
+max_journal_entries = 100  # only the latest finished transactions are kept
+
+_journal = []  # entries (dicts) of the tracked transactions, oldest first
+_journal_lock = threading.Lock()
+_journal_watcher = None
+_poller = None
+
+_pending_gauge = metrics.Gauge("autonode_pending_transactions", "Staking transactions waiting for a receipt",
+                               ("kind",))
+
+
+def _read_journal():
+    try:
+        with open(journal_path, 'r', encoding='utf8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+    except ValueError as e:
+        log(f"Ignoring invalid transaction journal {journal_path}, error: {e}")
+        return []
+
+
+def _write_journal(journal):
+    finished = [e for e in journal if e['status'] != 'pending']
+    drop = set(id(e) for e in finished[:max(len(finished) - max_journal_entries, 0)])
+    journal = [e for e in journal if id(e) not in drop]
+    tmp_path = f"{journal_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf8') as f:
+        json.dump(journal, f, indent=2)
+    os.replace(tmp_path, journal_path)
+    return journal
+
+
+def _update_journal(update):
+    """
+    Apply `update` (a function of the journal entries) to the journal on disk and save it.
+    """
+    global _journal
+    with _journal_lock, FileLock(journal_path):
+        journal = _read_journal()
+        update(journal)
+        _journal = _write_journal(journal)
+    _update_metrics()
+
+
+def _get_journal():
+    """
+    The journal entries, only re-read when the journal file changed.
+    """
+    global _journal, _journal_watcher
+    with _journal_lock:
+        if _journal_watcher is None:
+            _journal_watcher = FileWatcher(journal_path)
+        if _journal_watcher.changed():
+            _journal = _read_journal()
+        return [dict(e) for e in _journal]
+
+
+def _update_metrics():
+    counts = {}
+    for entry in _get_journal():
+        counts.setdefault(entry['kind'], 0)
+        counts[entry['kind']] += int(entry['status'] == 'pending')
+    _pending_gauge.clear()  # Kinds pruned from the journal are no longer reported.
+    for kind, count in counts.items():
+        _pending_gauge.set(count, kind)
+
+
+def track(tx_hash, kind):
+    """
+    Record the sent transaction `tx_hash` as pending. The `kind` is what it does, i.e: 'activate'.
+    """
+    entry = {"tx-hash": tx_hash, "kind": kind, "sent": time.time(), "status": "pending", "error": None}
+    _update_journal(lambda journal: journal.append(entry))
+    start_polling()
+
+
+def get_transactions(kind=None, status=None):
+    """
+    Returns the tracked transactions (oldest first), optionally only those of the `kind` and/or `status`.
+    Each transaction is a dict of its 'tx-hash', 'kind', 'sent' (time), 'status' and 'error'.
+    """
+    return [e for e in _get_journal() if (kind is None or e['kind'] == kind)
+            and (status is None or e['status'] == status)]
+
+
+def get_pending(kind):
+    """
+    Returns the latest pending transaction of the `kind`, or None if there is none.
+    """
+    pending = [e for e in get_transactions(kind, 'pending') if time.time() - e['sent'] < pending_timeout]
+    return pending[-1] if pending else None
+
+
+def check_pending(endpoint=None):
+    """
+    Check the receipts of all pending transactions once. Returns the number of transactions still pending.
+    """
+    pending = [e['tx-hash'] for e in get_transactions(status='pending')]
+    if not pending:
+        return 0
+    results = check_receipts(pending, endpoint or get_beacon_endpoint())
+
+    def update(journal):
+        for entry in journal:
+            if entry['status'] != 'pending':
+                continue
+            status, error = results.get(entry['tx-hash'], ('pending', None))
+            if status == 'pending' and time.time() - entry['sent'] >= pending_timeout:
+                status, error = 'failed', f"Not included after {pending_timeout} seconds"
+            if status != 'pending':
+                entry['status'], entry['error'] = status, error
+                log(f"Staking transaction {entry['tx-hash']} ({entry['kind']}) {status}"
+                    + (f", error: {error}" if error else ""))
+
+    _update_journal(update)
+    return len(get_transactions(status='pending'))
+
+
+def _poll():
+    while True:
+        try:
+            check_pending()
+        except Exception as e:  # Keep polling, the endpoint could be down.
+            log(f"Could not check transaction receipts, error: {e}")
+        time.sleep(poll_interval)
+
+
+def start_polling():
+    """
+    Poll the receipts of pending transactions in a background (daemon) thread, if not already polling.
+    """
+    global _poller
+    with _journal_lock:
+        if _poller is not None:
+            return
+        _poller = threading.Thread(target=_poll, name="receipt-poller", daemon=True)
+        _poller.start()
@@ -0,0 +1,74 @@
+"""
+Library for retrying calls with exponential backoff, jitter & deadlines.
+
+Each class of error can have its own `RetryPolicy` (or none, to raise it right away),
+so i.e: an unreachable endpoint is retried quickly at first, then backs off while it stays down.
+"""
+
+import random
+import time
+
+endpoint_max_delay = 30  # seconds between retries of an unreachable endpoint, once backed off
+
+
+class RetryPolicy:
+    """
+    Retry after `initial_delay` seconds, growing by `multiplier` per attempt up to `max_delay` seconds.
+    Each delay is reduced by a random fraction of up to `jitter` (0 to 1), so retries are spread out.
+
+    Gives up after `max_attempts` attempts or once `max_elapsed` seconds passed since the first attempt.
+    """
+
+    def __init__(self, initial_delay=1, max_delay=60, multiplier=2, jitter=0.5,
+                 max_elapsed=float('inf'), max_attempts=float('inf')):
+        assert initial_delay >= 0 and max_delay >= initial_delay and multiplier >= 1 and 0 <= jitter <= 1
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.max_elapsed = max_elapsed
+        self.max_attempts = max_attempts
+
+    def get_delay(self, attempt):
+        """
+        Returns the seconds to wait after the failed `attempt` (starting at 1).
+        """
+        delay = min(self.max_delay, self.initial_delay * self.multiplier ** min(attempt - 1, 64))
+        return delay * (1 - self.jitter * random.random())
+
+    def with_limits(self, max_elapsed=None, max_attempts=None):
+        """
+        Returns a copy of this policy with the given limits.
+        """
+        return RetryPolicy(self.initial_delay, self.max_delay, self.multiplier, self.jitter,
+                           self.max_elapsed if max_elapsed is None else max_elapsed,
+                           self.max_attempts if max_attempts is None else max_attempts)
+
+
+def call(func, policies, on_retry=None):
+    """
+    Call `func` (without arguments) until it returns and return its result.
+
+    `policies` is a sequence of (exception class or tuple of classes, RetryPolicy or None), the first
+    matching entry is the policy of an error. Errors without a policy are raised right away and each policy
+    counts its own attempts. `on_retry(error, attempt, delay)` is called before each retry.
+
+    Raises the last error once its policy gives up.
+    """
+    start_time, attempts = time.monotonic(), {}
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            index, policy = next(((i, p) for i, (errors, p) in enumerate(policies) if isinstance(e, errors)),
+                                 (None, None))
+            if policy is None:
+                raise
+            attempts[index] = attempts.get(index, 0) + 1
+            elapsed = time.monotonic() - start_time
+            if attempts[index] >= policy.max_attempts or elapsed >= policy.max_elapsed:
+                raise
+            delay = min(policy.get_delay(attempts[index]), policy.max_elapsed - elapsed)
+            if on_retry is not None:
+                on_retry(e, attempts[index], delay)
+            time.sleep(delay)
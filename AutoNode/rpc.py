@@ -0,0 +1,296 @@
+"""
+Library for the JSON-RPC transport used by AutoNode.
+
+pyhmy opens a new HTTP connection (and TLS handshake) for every request.
+This transport keeps a pooled keep-alive session per endpoint and is installed
+as pyhmy's request function when AutoNode is imported, so every RPC made by AutoNode
+(directly or through pyhmy) reuses connections.
+
+Requests to the configured beacon endpoint are spread over the beacon endpoint set
+(the configured endpoint and `node_config['backup-endpoints']`): each endpoint is scored by
+its recent latencies, reads are hedged to the next endpoint if the first has not answered
+within its p95 latency, and endpoints that keep failing are skipped for a cool-down (circuit breaker).
+"""
+
+import collections
+import json
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    wait
+)
+
+import requests
+from pyhmy.rpc import request as pyhmy_request
+from pyhmy.rpc.exceptions import (
+    RequestsError,
+    RequestsTimeoutError
+)
+from requests.adapters import HTTPAdapter
+
+from .common import (
+    node_config
+)
+
+pool_size = 16  # Max concurrent connections kept alive per endpoint
+hedge_min_delay, hedge_max_delay = 0.05, 5  # seconds, bounds of the p95 wait before hedging a read
+hedge_default_delay = 1  # seconds to wait before hedging a read of an endpoint without latencies yet
+hedged_timeout_factor, hedged_min_timeout = 4, 5  # A read that can be hedged times out after max(4 * p95, 5) seconds
+breaker_threshold = 3  # Consecutive failures that open the circuit of an endpoint
+breaker_cooldown = 30  # seconds an open circuit skips the endpoint before it is tried again
+write_methods = {  # Never hedged (only failed over on connection errors) so a tx is sent once per attempt.
+    'hmy_sendRawTransaction',
+    'hmyv2_sendRawTransaction',
+    'hmy_sendRawStakingTransaction',
+    'hmyv2_sendRawStakingTransaction',
+}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_scores = {}
+_scores_lock = threading.Lock()
+_hedge_executor = ThreadPoolExecutor(pool_size, thread_name_prefix="autonode-hedge")
+
+
+def _get_session(endpoint):
+    """
+    Get (or create) the pooled keep-alive session for the `endpoint`.
+    """
+    with _sessions_lock:
+        session = _sessions.get(endpoint, None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update({
+                'Content-Type': 'application/json',
+                'Connection': 'keep-alive'
+            })
+            _sessions[endpoint] = session
+        return session
+
+
+class _EndpointScore:
+    """
+    Recent latencies and circuit breaker state of an endpoint.
+    """
+
+    def __init__(self):
+        self.latencies = collections.deque(maxlen=100)
+        self.failures = 0  # Consecutive
+        self.open_until = 0
+
+    def percentile(self, q, default):
+        if not self.latencies:
+            return default
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def is_open(self, now):
+        return self.open_until > now
+
+    def record(self, latency=None):
+        """
+        Record a success with its `latency` or a failure if `latency` is None.
+        """
+        if latency is None:
+            self.failures += 1
+            if self.failures >= breaker_threshold:
+                self.open_until = time.time() + breaker_cooldown
+        else:
+            self.failures = 0
+            self.open_until = 0
+            self.latencies.append(latency)
+
+
+def _get_score(endpoint):
+    with _scores_lock:
+        score = _scores.get(endpoint, None)
+        if score is None:
+            score = _EndpointScore()
+            _scores[endpoint] = score
+        return score
+
+
+def get_beacon_endpoints():
+    """
+    Returns the beacon endpoint set, the configured endpoint first.
+    """
+    endpoints = [node_config['endpoint']]
+    for endpoint in node_config.get('backup-endpoints', None) or []:
+        if endpoint not in endpoints:
+            endpoints.append(endpoint)
+    return endpoints
+
+
+def get_beacon_endpoint():
+    """
+    Returns the best beacon endpoint to use for a single request (i.e: for CLI calls):
+    the fastest (p50) measured endpoint with a closed circuit, or the configured endpoint if all circuits are open.
+    """
+    ranked = _rank_endpoints(get_beacon_endpoints())
+    return ranked[0] if ranked else node_config['endpoint']
+
+
+def _rank_endpoints(endpoints):
+    """
+    Order the `endpoints` by their p50 latency, skipping those with an open circuit.
+    Endpoints without latencies yet are ranked after the measured ones, by their configured order.
+    """
+    now = time.time()
+    with _scores_lock:
+        candidates = [(i, e, _scores.get(e, None)) for i, e in enumerate(endpoints)]
+        candidates = [(s is None or not s.latencies, s.percentile(0.5, 0) if s is not None else 0, i, e)
+                      for i, e, s in candidates if s is None or not s.is_open(now)]
+    return [e for _, _, _, e in sorted(candidates)]
+
+
+def _send(method, params, endpoint, timeout, check_status=False):
+    payload = {
+        "id": "1",
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": params
+    }
+    try:
+        resp = _get_session(endpoint).post(endpoint, data=json.dumps(payload), timeout=timeout, allow_redirects=True)
+        if check_status:
+            resp.raise_for_status()
+        return resp.content
+    except requests.exceptions.Timeout as err:
+        raise RequestsTimeoutError(endpoint) from err
+    except requests.exceptions.RequestException as err:
+        raise RequestsError(endpoint) from err
+
+
+def _scored_send(method, params, endpoint, timeout):
+    start = time.time()
+    try:
+        content = _send(method, params, endpoint, timeout, check_status=True)
+    except (RequestsError, RequestsTimeoutError):
+        _get_score(endpoint).record(None)
+        raise
+    _get_score(endpoint).record(time.time() - start)
+    return content
+
+
+def _beacon_request(method, params, timeout):
+    """
+    Send the request over the beacon endpoint set.
+
+    Reads start on the best endpoint and are hedged to the next one each time the
+    in-flight requests have not answered within the p95 latency of the last endpoint tried.
+    The first successful response is returned and the requests that are not sent yet are cancelled.
+    Reads that can be hedged have a shorter timeout, so abandoned requests do not hold the hedge threads for long.
+    Writes are sent to one endpoint at a time and only failed over on connection errors.
+
+    Raises RequestsTimeoutError, RequestsError of the last failure if no endpoint answered.
+    """
+    endpoints = _rank_endpoints(get_beacon_endpoints()) or get_beacon_endpoints()
+    deadline = time.time() + timeout
+    last_error = RequestsError(endpoints[0])
+    if method in write_methods:
+        for endpoint in endpoints:
+            try:
+                return _scored_send(method, params, endpoint, max(deadline - time.time(), 0.001))
+            except RequestsTimeoutError:
+                raise  # The tx could have been received, do not re-send.
+            except RequestsError as err:
+                last_error = err
+        raise last_error
+    pending, remaining = set(), list(endpoints)
+    try:
+        while remaining or pending:
+            if remaining:
+                endpoint = remaining.pop(0)
+                hedge_delay = _get_score(endpoint).percentile(0.95, hedge_default_delay)
+                request_timeout = max(deadline - time.time(), 0.001)
+                if remaining:
+                    request_timeout = min(request_timeout, max(hedged_timeout_factor * hedge_delay, hedged_min_timeout))
+                pending.add(_hedge_executor.submit(_scored_send, method, params, endpoint, request_timeout))
+                hedge_delay = min(max(hedge_delay, hedge_min_delay), hedge_max_delay)
+            time_left = deadline - time.time()
+            if time_left <= 0:
+                raise RequestsTimeoutError(endpoints[0])
+            done, pending = wait(pending, timeout=min(hedge_delay, time_left) if remaining else time_left,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except (RequestsError, RequestsTimeoutError) as err:
+                    last_error = err
+        raise last_error
+    finally:
+        for future in pending:
+            future.cancel()  # Only cancels the requests that are not sent yet.
+
+
+def base_request(method, params=None, endpoint=pyhmy_request._default_endpoint,
+                 timeout=pyhmy_request._default_timeout):
+    """
+    Drop-in replacement of `pyhmy.rpc.request.base_request` that sends
+    the request over the pooled session of the `endpoint`.
+
+    Requests to the configured beacon endpoint are sent over the beacon endpoint set
+    if backup endpoints are configured.
+
+    Raises TypeError, RequestsTimeoutError, RequestsError (same as pyhmy).
+    """
+    if params is None:
+        params = []
+    elif not isinstance(params, list):
+        raise TypeError(f'invalid type {params.__class__}')
+    if endpoint == node_config['endpoint'] and node_config.get('backup-endpoints', None):
+        return _beacon_request(method, params, timeout)
+    return _send(method, params, endpoint, timeout)
+
+
+def get_connection_stats():
+    """
+    Returns a dict of endpoint to the count of connections 'opened', connections
+    'reused' and total 'requests' sent through the transport.
+    """
+    stats = {}
+    with _sessions_lock:
+        sessions = list(_sessions.items())
+    for endpoint, session in sessions:
+        opened, sent = 0, 0
+        for adapter in set(session.adapters.values()):
+            for key in adapter.poolmanager.pools.keys():
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+                    sent += pool.num_requests
+        stats[endpoint] = {'opened': opened, 'reused': max(sent - opened, 0), 'requests': sent}
+    return stats
+
+
+def get_endpoint_scores():
+    """
+    Returns a dict of endpoint to its 'p50' & 'p95' latency (None if unknown),
+    consecutive 'failures' and if its circuit is 'open'.
+    """
+    now = time.time()
+    with _scores_lock:
+        return {e: {'p50': s.percentile(0.5, None), 'p95': s.percentile(0.95, None),
+                    'failures': s.failures, 'open': s.is_open(now)} for e, s in _scores.items()}
+
+
+def close_sessions():
+    """
+    Close all pooled connections, they will be re-opened on the next request.
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def install():
+    """
+    Route all pyhmy RPC requests through this transport.
+    """
+    pyhmy_request.base_request = base_request
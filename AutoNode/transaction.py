@@ -0,0 +1,391 @@
+"""
+Library for building, signing & sending Harmony staking transactions in-process.
+
+Transactions are RLP encoded and signed (secp256k1 with EIP-155 replay protection) the same way as the CLI does,
+with the key decrypted from the CLI's keystore only for the duration of the call. Signing is done by `cryptography`
+(OpenSSL), the recovery id of a signature is found by recovering its public key.
+
+Staking messages that need a BLS key signature (create-validator & adding a BLS key) are not supported,
+those are still sent with the CLI.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import bech32
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import (
+    ec,
+    utils
+)
+from pyhmy import blockchain
+from pyhmy.rpc.exceptions import (
+    RPCError,
+    RequestsError,
+    RequestsTimeoutError
+)
+from pyhmy.rpc.request import rpc_request
+
+from .keystore import (
+    KeystoreError,
+    keccak256,
+    load_private_key
+)
+
+edit_validator_directive = 1
+collect_rewards_directive = 4
+
+_tx_gas = 21000  # Intrinsic gas of a (non create-validator) staking transaction
+_tx_data_zero_gas = 4
+_tx_data_non_zero_gas = 68  # Pre-Istanbul cost, so the gas limit is never below the intrinsic gas.
+_nano = 10 ** 9
+_atto = 10 ** 18
+_eligibility = {None: 0, True: 1, False: 2}  # Nil (no change), Active, Inactive
+_network_chain_ids = {
+    "mainnet": 1,
+    "testnet": 2,
+    "staking": 3,
+    "partner": 4,
+    "stress": 5,
+}
+
+receipt_timeout = 120  # seconds to wait for a transaction to be included in a block
+receipt_poll_interval = 2  # seconds between receipt checks
+receipt_max_workers = 8  # receipts checked concurrently
+
+_chain_ids = {}  # endpoint -> chain ID
+_chain_ids_lock = threading.Lock()
+
+_p = 2 ** 256 - 2 ** 32 - 977
+_n = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+_g = (0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+      0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
+
+
+class TransactionNotSentError(Exception):
+    """
+    The transaction was not received by the node, so it is safe to send it again.
+    """
+
+
+def rlp_encode(item):
+    """
+    RLP encode `item`: a (non-negative) int, str, bytes or a (nested) list of those.
+    """
+    if isinstance(item, int):
+        if item < 0:
+            raise ValueError(f"Can not RLP encode negative int {item}")
+        item = item.to_bytes((item.bit_length() + 7) // 8, 'big')
+    elif isinstance(item, str):
+        item = item.encode()
+    if isinstance(item, (bytes, bytearray)):
+        if len(item) == 1 and item[0] < 0x80:
+            return bytes(item)
+        return _rlp_length_prefix(len(item), 0x80) + bytes(item)
+    if isinstance(item, (list, tuple)):
+        payload = b''.join(rlp_encode(e) for e in item)
+        return _rlp_length_prefix(len(payload), 0xc0) + payload
+    raise TypeError(f"Can not RLP encode {type(item)}")
+
+
+def _rlp_length_prefix(length, offset):
+    if length < 56:
+        return bytes([offset + length])
+    length_bytes = length.to_bytes((length.bit_length() + 7) // 8, 'big')
+    return bytes([offset + 55 + len(length_bytes)]) + length_bytes
+
+
+def _inverse(value, modulus):
+    return pow(value, modulus - 2, modulus)  # Both moduli are prime.
+
+
+# Point math below is variable-time and only ever used on public values (signature recovery).
+# Anything involving the private key is done by `cryptography` (OpenSSL).
+def _point_add(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a[0] == b[0]:
+        if (a[1] + b[1]) % _p == 0:
+            return None
+        slope = 3 * a[0] * a[0] * _inverse(2 * a[1], _p) % _p
+    else:
+        slope = (b[1] - a[1]) * _inverse(b[0] - a[0], _p) % _p
+    x = (slope * slope - a[0] - b[0]) % _p
+    return x, (slope * (a[0] - x) - a[1]) % _p
+
+
+def _point_mul(scalar, point):
+    result = None
+    while scalar:
+        if scalar & 1:
+            result = _point_add(result, point)
+        point = _point_add(point, point)
+        scalar >>= 1
+    return result
+
+
+def _recover_point(msg_hash, recovery_id, r, s):
+    """
+    Returns the public key point that signed the 32 byte `msg_hash` with the signature (`recovery_id`, r, s),
+    None if there is no such point.
+    """
+    x = r + (_n if recovery_id & 2 else 0)
+    if not 0 < r < _n or not 0 < s < _n or x >= _p:
+        return None
+    alpha = (pow(x, 3, _p) + 7) % _p
+    y = pow(alpha, (_p + 1) // 4, _p)
+    if y * y % _p != alpha:
+        return None
+    if y & 1 != recovery_id & 1:
+        y = _p - y
+    r_inverse = _inverse(r, _n)
+    z = int.from_bytes(msg_hash, 'big') % _n
+    return _point_add(_point_mul(s * r_inverse % _n, (x, y)), _point_mul(-z * r_inverse % _n, _g))
+
+
+def _address_of_point(point):
+    x, y = point
+    return keccak256(x.to_bytes(32, 'big') + y.to_bytes(32, 'big'))[12:]
+
+
+def _load_key(private_key):
+    return ec.derive_private_key(int.from_bytes(private_key, 'big'), ec.SECP256K1(), default_backend())
+
+
+def _public_point(key):
+    numbers = key.public_key().public_numbers()
+    return numbers.x, numbers.y
+
+
+def recover_address(msg_hash, recovery_id, r, s):
+    """
+    Returns the 20 byte address that signed the 32 byte `msg_hash` with the signature (`recovery_id`, r, s).
+    Raises a ValueError if the signature is invalid.
+    """
+    point = _recover_point(msg_hash, recovery_id, r, s)
+    if point is None:
+        raise ValueError("Invalid signature")
+    return _address_of_point(point)
+
+
+def sign_hash(msg_hash, private_key):
+    """
+    Sign the 32 byte `msg_hash` with the `private_key` bytes.
+    Returns the (recovery id, r, s) of the signature, with a low `s` as required by the chain.
+    """
+    key = _load_key(private_key)
+    r, s = utils.decode_dss_signature(key.sign(msg_hash, ec.ECDSA(utils.Prehashed(hashes.SHA256()))))
+    if s > _n // 2:
+        s = _n - s
+    public_point = _public_point(key)
+    del key
+    for recovery_id in range(4):
+        if _recover_point(msg_hash, recovery_id, r, s) == public_point:
+            return recovery_id, r, s
+    raise ValueError("Could not find the recovery id of the signature")
+
+
+def get_address_bytes(private_key):
+    """
+    Returns the 20 byte address of the `private_key` bytes.
+    """
+    return _address_of_point(_public_point(_load_key(private_key)))
+
+
+def decode_address(address):
+    """
+    Returns the 20 byte address of the 'one1...' `address`.
+    """
+    hrp, data = bech32.bech32_decode(address)
+    if hrp != 'one' or data is None:
+        raise ValueError(f"Invalid address {address}")
+    return bytes(bech32.convertbits(data, 5, 8, False))
+
+
+def _to_atto(one):
+    return int(Decimal(str(one)) * _atto)
+
+
+def _to_dec(value):
+    """
+    Encoding of the chain's 18 decimal fixed point numbers (a struct of 1 big int).
+    """
+    return [int(Decimal(str(value)) * _atto)]
+
+
+def edit_validator_message(validator_addr, name=None, identity=None, website=None, security_contact=None,
+                           details=None, rate=None, min_self_delegation=None, max_total_delegation=None,
+                           bls_key_to_remove=None, active=None):
+    """
+    Returns the edit-validator staking message for the 'one1...' `validator_addr`.
+    Fields that are None are not changed. Delegation amounts are in ONE, `active` is a bool.
+    """
+    return [
+        decode_address(validator_addr),
+        [name or '', identity or '', website or '', security_contact or '', details or ''],
+        [] if rate is None else _to_dec(rate),
+        b'' if min_self_delegation is None else _to_atto(min_self_delegation),
+        b'' if max_total_delegation is None else _to_atto(max_total_delegation),
+        b'' if bls_key_to_remove is None else bytes.fromhex(bls_key_to_remove.replace('0x', '')),
+        b'',  # BLS key to add
+        b'',  # BLS key to add signature
+        _eligibility[active],
+    ]
+
+
+def collect_rewards_message(delegator_addr):
+    """
+    Returns the collect-rewards staking message for the 'one1...' `delegator_addr`.
+    """
+    return [decode_address(delegator_addr)]
+
+
+def get_gas_limit(message):
+    """
+    Returns the intrinsic gas of a staking transaction with the (non create-validator) staking `message`.
+    """
+    data = rlp_encode(message)
+    zero_bytes = data.count(0)
+    return _tx_gas + zero_bytes * _tx_data_zero_gas + (len(data) - zero_bytes) * _tx_data_non_zero_gas
+
+
+def get_chain_id(endpoint, network=None):
+    """
+    Returns the chain ID of the `endpoint`, falling back to the ID of the `network` if the node does not report it.
+    """
+    with _chain_ids_lock:
+        if endpoint in _chain_ids:
+            return _chain_ids[endpoint]
+    try:
+        chain_id = int(blockchain.get_node_metadata(endpoint=endpoint)['chain-config']['chain-id'])
+    except (KeyError, TypeError, ValueError):
+        if network not in _network_chain_ids:
+            raise
+        chain_id = _network_chain_ids[network]
+    with _chain_ids_lock:
+        _chain_ids[endpoint] = chain_id
+    return chain_id
+
+
+def sign_staking_transaction(directive, message, nonce, gas_price, gas_limit, chain_id, private_key):
+    """
+    Returns the signed & RLP encoded staking transaction bytes.
+    `gas_price` is in atto ONE and the `private_key` is bytes.
+    """
+    unsigned = [directive, message, nonce, gas_price, gas_limit]
+    recovery_id, r, s = sign_hash(keccak256(rlp_encode(unsigned + [chain_id, 0, 0])), private_key)
+    return rlp_encode(unsigned + [chain_id * 2 + 35 + recovery_id, r, s])
+
+
+def send_staking_transaction(directive, message, address, passphrase, endpoint, nonce=None, gas_price=1,
+                             network=None, timeout=30):
+    """
+    Sign the staking `message` with the key of the 'one1...' `address` and send it to the (beacon chain) `endpoint`.
+    The `gas_price` is in nano ONE (same as the CLI's --gas-price) & the pending nonce is used if `nonce` is None.
+    Returns the transaction hash.
+
+    If the send fails without a reply, the transaction is only reported as not sent if the pending nonce of the
+    address shows that the node did not receive it. If it did, its (locally computed) hash is returned.
+
+    Raises KeystoreError if there is no (supported) keystore for the address, ValueError if the passphrase is wrong,
+    TransactionNotSentError if the transaction was not received, RuntimeError if the transaction is rejected
+    and TimeoutError if it is not known whether the transaction was received.
+    """
+    try:
+        chain_id = get_chain_id(endpoint, network)
+        if nonce is None:
+            nonce = _get_pending_nonce(address, endpoint, timeout)
+    except (RequestsError, RequestsTimeoutError, RPCError, KeyError, TypeError) as e:
+        raise TransactionNotSentError(f"Could not prepare transaction: {e}") from e
+    private_key = load_private_key(address, passphrase)
+    if get_address_bytes(private_key) != decode_address(address):
+        raise KeystoreError(f"Keystore key does not match {address}")
+    raw_tx = sign_staking_transaction(directive, message, nonce, int(Decimal(str(gas_price)) * _nano),
+                                      get_gas_limit(message), chain_id, private_key)
+    del private_key
+    try:
+        return rpc_request('hmyv2_sendRawStakingTransaction', params=[f"0x{raw_tx.hex()}"],
+                           endpoint=endpoint, timeout=timeout)['result']
+    except (RequestsError, RequestsTimeoutError) as e:
+        try:
+            received = _get_pending_nonce(address, endpoint, timeout) > nonce
+        except (RequestsError, RequestsTimeoutError, RPCError, KeyError, TypeError, ValueError):
+            raise TimeoutError(f"Could not tell if the transaction was received by {endpoint}: {e}") from e
+        if not received:
+            raise TransactionNotSentError(f"Transaction was not received by {endpoint}: {e}") from e
+        return f"0x{keccak256(raw_tx).hex()}"
+
+
+def _get_pending_nonce(address, endpoint, timeout):
+    return int(rpc_request('hmy_getTransactionCount', params=[address, 'pending'],
+                           endpoint=endpoint, timeout=timeout)['result'], 16)
+
+
+def get_receipt_status(receipt):
+    """
+    Returns 'confirmed' or 'failed' for a transaction `receipt` (v1 or v2 RPC format), None if there is no receipt.
+    """
+    if not receipt:
+        return None
+    status = receipt.get('status', 1)
+    if isinstance(status, str):
+        status = int(status, 16)
+    return 'confirmed' if status == 1 else 'failed'
+
+
+def check_receipts(tx_hashes, endpoint, timeout=receipt_poll_interval * 5):
+    """
+    Check the receipts of the `tx_hashes` once on the (beacon chain) `endpoint`, concurrently.
+    Staking transactions rejected by the node (reported in its staking error sink) are failed.
+
+    Returns a dict of tx hash to its (status, error) where status is 'confirmed', 'failed' or 'pending'.
+    """
+    results = {h: ('pending', None) for h in tx_hashes}
+    if not tx_hashes:
+        return results
+
+    def fetch(tx_hash):
+        try:
+            return tx_hash, rpc_request('hmy_getTransactionReceipt', params=[tx_hash],
+                                        endpoint=endpoint, timeout=timeout)['result']
+        except Exception:  # Keep checking the other receipts.
+            return tx_hash, None
+
+    with ThreadPoolExecutor(max_workers=min(len(tx_hashes), receipt_max_workers)) as executor:
+        for tx_hash, receipt in executor.map(fetch, tx_hashes):
+            status = get_receipt_status(receipt)
+            if status is not None:
+                results[tx_hash] = (status, None if status == 'confirmed' else "Transaction reverted")
+    pending = {h for h, (status, _) in results.items() if status == 'pending'}
+    if pending:
+        try:
+            error_sink = rpc_request('hmy_getCurrentStakingErrorSink', endpoint=endpoint,
+                                     timeout=timeout)['result'] or []
+        except Exception:  # The error sink is only used to fail early.
+            error_sink = []
+        for error in error_sink:
+            if error.get('tx-hash-id', None) in pending:
+                results[error['tx-hash-id']] = ('failed', error.get('error-message', "Rejected by node"))
+    return results
+
+
+def wait_for_receipts(tx_hashes, endpoint, timeout=receipt_timeout, interval=receipt_poll_interval):
+    """
+    Wait for the receipts of all `tx_hashes` on the (beacon chain) `endpoint`, see `check_receipts`.
+
+    Returns a dict of tx hash to its (status, error) where status is 'confirmed', 'failed'
+    or 'pending' (not included after `timeout` seconds).
+    """
+    results = {h: ('pending', None) for h in tx_hashes}
+    deadline = time.time() + timeout
+    while True:
+        pending = [h for h, (status, _) in results.items() if status == 'pending']
+        results.update(check_receipts(pending, endpoint, timeout=interval * 5))
+        if all(status != 'pending' for status, _ in results.values()) or time.time() >= deadline:
+            return results
+        time.sleep(interval)
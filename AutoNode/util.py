@@ -4,21 +4,32 @@ Library of common utils used by most function libraries of AutoNode.
 To prevent cyclic import minimize the importing of other libraries in AutoNode.
 """
 
+import atexit
+import bz2
+import fcntl
 import gzip
+import lzma
+import queue
+import shutil
 import signal
 import getpass
 import logging
 import logging.handlers
 import os
 import sys
+import threading
 
 import pexpect
 from pyhmy import (
     Typgpy,
+    exceptions,
     json_load
 )
 from pyhmy import cli
 
+from .cache import (
+    get_sharding_structure
+)
 from .common import (
     log,
     node_config,
@@ -33,6 +44,9 @@ from .passphrase import (
     decrypt_wallet_passphrase,
     is_valid_passphrase
 )
+from .rpc import (
+    get_beacon_endpoint
+)
 
 
 class Timeout:
@@ -51,17 +65,89 @@ class Timeout:
         signal.alarm(0)
 
 
-class _GZipRotator:
-    """A simple zip rotator for logging"""
+class FileLock:
+    """
+    Lock the file at `path` against other AutoNode processes (i.e: the monitor & setup),
+    by holding an exclusive lock on `{path}.lock`.
+    """
+
+    def __init__(self, path):
+        self._path = f"{path}.lock"
+        self._file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+        self._file = open(self._path, 'w')
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args):
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+_log_codecs = {  # codec -> (open function, level keyword, file suffix)
+    "gzip": (gzip.open, "compresslevel", ".gz"),
+    "bz2": (bz2.open, "compresslevel", ".bz2"),
+    "xz": (lzma.open, "preset", ".xz"),
+}
+_log_handlers = {}  # log file path -> (queue handler, queue listener)
+_log_handlers_lock = threading.Lock()
+_shard_check = None  # True if the in-process shard matched the CLI's, False if not, None if not checked yet.
+_shard_check_lock = threading.Lock()
+
+
+class _BackgroundRotator:
+    """
+    A rotator for logging that compresses rotated logs in a background thread.
+
+    The rotated log is only renamed when rotating, so the log writer is never blocked by compression.
+    """
+
+    def __init__(self, codec, level):
+        self.open_fn, self.level_kwarg, self.suffix = _log_codecs[codec]
+        self.level = level
+        self._jobs = queue.Queue()
+        threading.Thread(target=self._work, name="autonode-log-compress", daemon=True).start()
+
+    def namer(self, name):
+        return f"{name}{self.suffix}"
+
+    def _compress(self, source, dest):
+        with open(source, 'rb') as f_in, self.open_fn(f"{dest}.tmp", 'wb', **{self.level_kwarg: self.level}) as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.replace(f"{dest}.tmp", dest)
+        os.remove(source)
+
+    def _work(self):
+        while True:
+            source, dest = self._jobs.get()
+            try:
+                self._compress(source, dest)
+            except OSError as e:
+                print(f"{msg_tag} Could not compress rotated log {source}, error: {e}", file=sys.stderr)
+            finally:
+                self._jobs.task_done()
 
     def __call__(self, source, dest):
-        os.rename(source, dest)
-        f_in = open(dest, 'rb')
-        f_out = gzip.open("%s.gz" % dest, 'wb')
-        f_out.writelines(f_in)
-        f_out.close()
-        f_in.close()
-        os.remove(dest)
+        uncompressed = f"{dest}.uncompressed"
+        os.rename(source, uncompressed)
+        self._jobs.put((uncompressed, dest))
+
+    def wait(self):
+        self._jobs.join()
+
+
+class _RotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    A rotating file handler that waits for the compression of the last rotated log before the backups
+    are shifted, otherwise that log is not in place yet and is overwritten by the next rotated log.
+    """
+
+    def doRollover(self):
+        if isinstance(self.rotator, _BackgroundRotator):
+            self.rotator.wait()
+        super().doRollover()
 
 
 def get_wallet_passphrase():
@@ -116,30 +202,94 @@ def check_min_bal_on_s0(address, amount, endpoint=node_config['endpoint'], timeo
             return bal['amount'] >= amount
 
 
-def get_simple_rotating_log_handler(log_file_path, max_size=5 * 1024 * 1024):
+def _stop_log_listeners():
+    with _log_handlers_lock:
+        for _, listener in _log_handlers.values():
+            listener.stop()
+            rotator = getattr(listener.handlers[0], 'rotator', None)
+            if rotator is not None:
+                rotator.wait()
+        _log_handlers.clear()
+
+
+def get_simple_rotating_log_handler(log_file_path, max_size=5 * 1024 * 1024, codec=None, level=None):
     """
     A simple log handler with no level support.
     Used purely for the output rotation.
 
+    Records are queued and written (& rotated) by a background thread, and rotated logs are
+    compressed by another background thread, so logging never blocks the caller.
+    Only 1 handler (& writer thread) is made per `log_file_path`, later calls return the same handler.
+
     `max_size` of log file is in bytes.
+    `codec` is one of 'gzip', 'bz2', 'xz' or 'none', default is node_config's 'log-compression'.
+    `level` is the compression level (1-9), default is node_config's 'log-compression-level'.
     """
-    log_formatter = logging.Formatter(f'{msg_tag} %(message)s')
-    handler = logging.handlers.RotatingFileHandler(log_file_path, mode='a', maxBytes=max_size,
-                                                   backupCount=5, encoding=None, delay=0)
-    handler.setLevel(logging.DEBUG)
-    handler.setFormatter(log_formatter)
-    handler.rotator = _GZipRotator()
-    return handler
+    log_file_path = os.path.abspath(log_file_path)
+    codec = node_config['log-compression'] if codec is None else codec
+    level = node_config['log-compression-level'] if level is None else level
+    assert codec in _log_codecs or codec == 'none', f"Unknown log compression codec: {codec}"
+    with _log_handlers_lock:
+        if log_file_path in _log_handlers:
+            return _log_handlers[log_file_path][0]
+        log_formatter = logging.Formatter(f'{msg_tag} %(message)s')
+        handler = _RotatingFileHandler(log_file_path, mode='a', maxBytes=max_size,
+                                       backupCount=5, encoding=None, delay=0)
+        handler.setLevel(logging.DEBUG)
+        handler.setFormatter(log_formatter)
+        if codec != 'none':
+            handler.rotator = _BackgroundRotator(codec, level)
+            handler.namer = handler.rotator.namer
+        queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        queue_handler.setLevel(logging.DEBUG)
+        listener = logging.handlers.QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+        listener.start()
+        if not _log_handlers:
+            atexit.register(_stop_log_listeners)  # Flush queued records & finish compression on exit.
+        _log_handlers[log_file_path] = (queue_handler, listener)
+        return queue_handler
+
+
+def _cli_shard_for_bls(public_bls_key):
+    return json_load(cli.single_call(['hmy', '--node', get_beacon_endpoint(), 'utility',
+                                      'shard-for-bls', public_bls_key]))['shard-id']
 
 
 def shard_for_bls(public_bls_key):
     """
-    Fetch the shard for the BLS key.
+    Get the shard for the BLS key, computed in-process as:
+        (BLS public key bytes as a big-endian integer) mod (shard count of the network)
+    where the shard count comes from the cached sharding structure.
+
+    Falls back to the CLI if the sharding structure can not be fetched.
+    The first computed shard of the process is checked against the CLI, if they disagree
+    an error is logged and the CLI is used for the rest of the process.
 
     NOTE: Expect to be invalid one we have resharding.
     """
-    return json_load(cli.single_call(['hmy', '--node', f'{node_config["endpoint"]}', 'utility',
-                                      'shard-for-bls', public_bls_key]))['shard-id']
+    global _shard_check
+    try:
+        num_shards = len(get_sharding_structure())
+    except (exceptions.RPCError, exceptions.RequestsError, exceptions.RequestsTimeoutError) as e:
+        log(f"{Typgpy.WARNING}Could not get sharding structure, error: {e}. Using CLI for BLS key shard.{Typgpy.ENDC}")
+        return _cli_shard_for_bls(public_bls_key)
+    key_bytes = bytes.fromhex(public_bls_key.strip().replace('0x', ''))
+    assert len(key_bytes) * 2 == bls_key_len, f"Invalid BLS public key: {public_bls_key}"
+    shard = int.from_bytes(key_bytes, byteorder='big') % num_shards
+    with _shard_check_lock:
+        if _shard_check is None:
+            try:
+                cli_shard = _cli_shard_for_bls(public_bls_key)
+            except (RuntimeError, KeyError, TypeError, ValueError) as e:  # Checked again on the next call.
+                log(f"{Typgpy.WARNING}Could not check BLS key shard with CLI, error: {e}{Typgpy.ENDC}")
+            else:
+                _shard_check = shard == cli_shard
+                if not _shard_check:
+                    log(f"{Typgpy.FAIL}Computed shard {shard} != CLI shard {cli_shard} for BLS key "
+                        f"{public_bls_key}, using CLI for BLS key shards.{Typgpy.ENDC}")
+                    return cli_shard
+        use_cli = _shard_check is False
+    return _cli_shard_for_bls(public_bls_key) if use_cli else shard
 
 
 def is_bls_file(file_name, suffix):
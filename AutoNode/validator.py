@@ -2,11 +2,12 @@
 This library takes care of all validator related commands.
 """
 
+import functools
 import json
 import logging
+import re
 import subprocess
 import sys
-import time
 import traceback
 from decimal import Decimal
 
@@ -21,6 +22,15 @@ from pyhmy import (
     exceptions
 )
 
+from . import (
+    blocks,
+    receipts,
+    retry
+)
+from .cache import (
+    get_all_validator_addresses,
+    invalidate_validator_addresses
+)
 from .common import (
     log,
     bls_key_dir,
@@ -32,6 +42,12 @@ from .initialize import (
     setup_validator_config,
     setup_wallet_passphrase,
 )
+from .instrument import (
+    timed_cli
+)
+from .keystore import (
+    KeystoreError
+)
 from .node import (
     log_path,
     wait_for_node_response,
@@ -39,6 +55,22 @@ from .node import (
     assert_started as assert_node_started,
     is_signing
 )
+from .retry import (
+    RetryPolicy,
+    endpoint_max_delay
+)
+from .rpc import (
+    get_beacon_endpoint
+)
+from .transaction import (
+    edit_validator_directive,
+    collect_rewards_directive,
+    edit_validator_message,
+    collect_rewards_message,
+    send_staking_transaction,
+    wait_for_receipts,
+    TransactionNotSentError
+)
 from .util import (
     check_min_bal_on_s0,
     input_with_print,
@@ -48,8 +80,16 @@ from .util import (
 )
 
 _balance_buffer = Decimal(1)
+_tx_errors = (RuntimeError, TimeoutError, ConnectionError, subprocess.CalledProcessError)
+_endpoint_errors = (exceptions.RequestsError, exceptions.RequestsTimeoutError)
+_tx_retry_policy = RetryPolicy(initial_delay=check_interval, max_delay=10 * check_interval)
+_balance_retry_policy = RetryPolicy(initial_delay=check_interval, max_delay=300)  # Funds are sent by a person.
+_endpoint_retry_policy = RetryPolicy(initial_delay=1, max_delay=endpoint_max_delay)
+_tx_hash_pattern = re.compile(r"0x[0-9a-fA-F]{64}")
 _hard_reset_recovery = False
 
+local_endpoint = 'http://localhost:9500/'
+
 
 def _interaction_preprocessor(hard_reset_recovery):
     """
@@ -65,6 +105,39 @@ def _interaction_preprocessor(hard_reset_recovery):
     return old_logging_handlers
 
 
+def _track_tx(response, kind):
+    """
+    Track the receipt of the transaction in the `response` (tx hash or CLI output), if it has a tx hash.
+    """
+    tx_hash = _tx_hash_pattern.search(response)
+    if tx_hash is not None:
+        receipts.track(tx_hash.group(0), kind)
+
+
+def _send_staking_tx(directive, message, cmd, passphrase, kind):
+    """
+    Sign & send the staking `message` in-process, using the CLI `cmd` if the keystore can not be used
+    or the transaction was not received by the node.
+    The transaction is tracked as `kind` until it has a receipt. Returns the response to log.
+
+    A send that could have been received (or was rejected) is not sent again with the CLI,
+    the error propagates to the caller's retry policy like a failed CLI call.
+    """
+    try:
+        response = send_staking_transaction(directive, message, validator_config["validator-addr"], passphrase,
+                                            get_beacon_endpoint(), gas_price=validator_config["gas-price"] or 1,
+                                            network=node_config["network"])
+    except (KeystoreError, ValueError, TransactionNotSentError) as e:
+        log(f"{Typgpy.WARNING}Could not sign staking transaction in-process, using CLI. Error: {e}{Typgpy.ENDC}")
+        with timed_cli(cmd):
+            proc = cli.expect_call(cmd)
+            pexpect_input_wallet_passphrase(proc, passphrase)
+            proc.expect(pexpect.EOF)
+        response = proc.before.decode()
+    _track_tx(response, kind)
+    return response
+
+
 def _add_bls_key_to_validator():
     """
     Assumes past staking epoch by definition of adding keys to existing validator
@@ -72,40 +145,112 @@ def _add_bls_key_to_validator():
     _verify_account_balance(0.1 * len(node_config["public-bls-keys"]))  # Heuristic amount for balance
     chain_val_info = get_validator_information()
     bls_keys = set(x.replace('0x', '') for x in chain_val_info["validator"]["bls-public-keys"])
+    keys_to_add = []
     for k in (x.replace('0x', '') for x in node_config["public-bls-keys"]):
         if k not in bls_keys:  # Add imported BLS key to existing validator if needed
-            _send_edit_validator_tx(k)
+            keys_to_add.append(k)
         else:
             log(f"{Typgpy.WARNING}Bls key: {Typgpy.OKGREEN}{k}{Typgpy.WARNING} "
                 f"is already present, ignoring...{Typgpy.ENDC}")
+    if keys_to_add:
+        _send_edit_validator_txs(keys_to_add)
+
 
+def _submit_add_bls_key_txs(bls_keys_to_add, passphrase):
+    """
+    Send an edit-validator transaction for each of the `bls_keys_to_add` back-to-back with consecutive nonces
+    (without waiting for each to be confirmed), then wait for all of their receipts.
 
-def _send_edit_validator_tx(bls_key_to_add):
-    log(f"{Typgpy.OKBLUE}Adding bls key: {Typgpy.OKGREEN}{bls_key_to_add}{Typgpy.OKBLUE} "
-        f"to validator: {Typgpy.OKGREEN}{validator_config['validator-addr']}{Typgpy.ENDC}")
+    Returns a dict of BLS key to its (status, detail) where status is 'confirmed', 'failed', 'pending'
+    or 'not-sent' (a previous transaction could not be sent, so its nonce would leave a gap).
+    """
+    beacon_endpoint = get_beacon_endpoint()
+    nonce = account.get_account_nonce(validator_config['validator-addr'], true_nonce=False, endpoint=beacon_endpoint)
+    results, tx_hashes = {}, {}
+    for i, bls_key in enumerate(bls_keys_to_add):
+        log(f"{Typgpy.OKBLUE}Adding bls key: {Typgpy.OKGREEN}{bls_key}{Typgpy.OKBLUE} "
+            f"to validator: {Typgpy.OKGREEN}{validator_config['validator-addr']}{Typgpy.OKBLUE} "
+            f"with nonce {nonce + i}{Typgpy.ENDC}")
+        cmd = ['hmy', '--node', beacon_endpoint, 'staking', 'edit-validator',
+               '--validator-addr', f'{validator_config["validator-addr"]}',
+               '--add-bls-key', bls_key, '--bls-pubkeys-dir', bls_key_dir,
+               '--nonce', f'{nonce + i}', '--timeout', '0', '--passphrase']
+        if validator_config["gas-price"]:
+            cmd.extend(['--gas-price', f'{validator_config["gas-price"]}'])
+        try:
+            with timed_cli(cmd):
+                proc = cli.expect_call(cmd)
+                pexpect_input_wallet_passphrase(proc, passphrase)
+                proc.expect(pexpect.EOF)
+            response = proc.before.decode()
+            tx_hash = _tx_hash_pattern.search(response)
+            if tx_hash is None:
+                raise RuntimeError(f"No transaction hash in response: {response}")
+            tx_hashes[tx_hash.group(0)] = bls_key
+            receipts.track(tx_hash.group(0), 'add-bls-key')
+        except (RuntimeError, pexpect.ExceptionPexpect) as e:
+            results[bls_key] = ('failed', str(e))
+            for k in bls_keys_to_add[i + 1:]:
+                results[k] = ('not-sent', f"nonce {nonce + i} was not sent")
+            break
+    for tx_hash, (status, error) in wait_for_receipts(list(tx_hashes.keys()), beacon_endpoint).items():
+        results[tx_hashes[tx_hash]] = (status, error or tx_hash)
+    return results
+
+
+def _send_edit_validator_txs(bls_keys_to_add):
+    """
+    Add the `bls_keys_to_add` to the validator with 1 passphrase fetch & nonce lookup per attempt.
+
+    Keys that were added stay added if others fail (there is nothing to roll back on-chain),
+    the outcome of every key is reported and only the keys that were not added are retried.
+    """
     passphrase = get_wallet_passphrase()
-    count = 0
-    while True:
+    remaining, count = list(bls_keys_to_add), 0
+
+    def add_bls_keys():
+        nonlocal remaining, count
         count += 1
+        if count > 1:  # Pending transactions from the last attempt could have been included since.
+            chain_val_info = get_validator_information()
+            keys_on_chain = set(x.replace('0x', '') for x in chain_val_info["validator"]["bls-public-keys"])
+            remaining = [k for k in remaining if k not in keys_on_chain]
+            if not remaining:
+                return
         try:
-            cmd = ['hmy', '--node', f'{node_config["endpoint"]}', 'staking', 'edit-validator',
-                   '--validator-addr', f'{validator_config["validator-addr"]}',
-                   '--add-bls-key', bls_key_to_add, '--bls-pubkeys-dir', bls_key_dir, '--passphrase']
-            if validator_config["gas-price"]:
-                cmd.extend(['--gas-price', f'{validator_config["gas-price"]}'])
-            proc = cli.expect_call(cmd)
-            pexpect_input_wallet_passphrase(proc, passphrase)
-            proc.expect(pexpect.EOF)
-            response = proc.before.decode()
-            log(f"{Typgpy.OKBLUE}Edit-validator transaction response: "
-                f"{Typgpy.OKGREEN}{response}{Typgpy.ENDC}")
-            return
-        except (RuntimeError, TimeoutError, ConnectionError, subprocess.CalledProcessError) as e:
-            log(f"{Typgpy.FAIL}Edit-validator transaction failure (attempt {count}). Error: {e}{Typgpy.ENDC}")
-            if not _hard_reset_recovery:
-                raise e
-            log(f"{Typgpy.WARNING}Trying again in {check_interval} seconds.{Typgpy.ENDC}")
-            time.sleep(check_interval)
+            results = _submit_add_bls_key_txs(remaining, passphrase)
+        except _tx_errors as e:
+            results = {k: ('not-sent', str(e)) for k in remaining}
+        for bls_key in remaining:
+            status, detail = results[bls_key]
+            color = Typgpy.OKGREEN if status == 'confirmed' else Typgpy.FAIL
+            log(f"{Typgpy.OKBLUE}Add bls key {Typgpy.OKGREEN}{bls_key}{Typgpy.OKBLUE}: "
+                f"{color}{status}{Typgpy.OKBLUE} ({detail}){Typgpy.ENDC}")
+        remaining = [k for k in remaining if results[k][0] != 'confirmed']
+        if remaining:
+            log(f"{Typgpy.FAIL}Edit-validator transaction failure (attempt {count}) for "
+                f"{len(remaining)} bls key(s): {remaining}{Typgpy.ENDC}")
+            raise RuntimeError(f"Failed to add bls key(s): {remaining}")
+
+    retry.call(add_bls_keys, _get_tx_retry_policies(), on_retry=_log_retry)
+
+
+def _log_retry(error, attempt, delay):
+    log(f"{Typgpy.WARNING}Trying again in {delay:.1f} seconds (attempt {attempt} failed).{Typgpy.ENDC}")
+
+
+def _get_tx_retry_policies():
+    """
+    Transactions are only retried in hard reset recovery, otherwise the error is raised to the user.
+    """
+    if not _hard_reset_recovery:
+        return []
+    return [(_endpoint_errors, _endpoint_retry_policy), (_tx_errors, _tx_retry_policy)]
+
+
+def _get_current_epoch():
+    return retry.call(functools.partial(blockchain.get_current_epoch, endpoint=node_config['endpoint']),
+                      [(_endpoint_errors, _endpoint_retry_policy)], on_retry=_log_retry)
 
 
 def _verify_staking_epoch():
@@ -114,12 +259,14 @@ def _verify_staking_epoch():
     """
     log(f"{Typgpy.OKBLUE}Verifying Staking Epoch...{Typgpy.ENDC}")
     staking_epoch = blockchain.get_staking_epoch(endpoint=node_config['endpoint'])
-    curr_epoch = blockchain.get_current_epoch(endpoint=node_config['endpoint'])
-    while curr_epoch < staking_epoch:  # WARNING: using staking epoch for extra security of configs.
+
+    def write_progress(curr_epoch):
         sys.stdout.write(f"\rWaiting for staking epoch ({staking_epoch}) -- current epoch: {curr_epoch}")
         sys.stdout.flush()
-        time.sleep(check_interval)
-        curr_epoch = blockchain.get_current_epoch(endpoint=node_config['endpoint'])
+
+    # WARNING: using staking epoch for extra security of configs.
+    blocks.wait_until(_get_current_epoch, lambda curr_epoch: curr_epoch >= staking_epoch,
+                      node_config['endpoint'], on_state=write_progress)
     log(f"{Typgpy.OKGREEN}Network is at or past staking epoch{Typgpy.ENDC}")
 
 
@@ -129,40 +276,40 @@ def _verify_prestaking_epoch():
     """
     log(f"{Typgpy.OKBLUE}Verifying Pre Staking Epoch...{Typgpy.ENDC}")
     prestaking_epoch = blockchain.get_prestaking_epoch(endpoint=node_config['endpoint'])
-    curr_epoch = blockchain.get_current_epoch(endpoint=node_config['endpoint'])
-    while curr_epoch < prestaking_epoch:
+
+    def write_progress(curr_epoch):
         sys.stdout.write(f"\rWaiting for pre staking epoch ({prestaking_epoch}) -- current epoch: {curr_epoch}")
         sys.stdout.flush()
-        time.sleep(check_interval)
-        curr_epoch = blockchain.get_current_epoch(endpoint=node_config['endpoint'])
+
+    blocks.wait_until(_get_current_epoch, lambda curr_epoch: curr_epoch >= prestaking_epoch,
+                      node_config['endpoint'], on_state=write_progress)
     log(f"{Typgpy.OKGREEN}Network is at or past pre staking epoch{Typgpy.ENDC}")
 
 
 def _verify_account_balance(amount):
     count = 0
     log(f"{Typgpy.OKBLUE}Verifying Balance...{Typgpy.ENDC}")
-    while True:
+
+    def check_balance():
+        nonlocal count
         count += 1
         if not check_min_bal_on_s0(validator_config['validator-addr'], amount, node_config['endpoint']):
             log(f"{Typgpy.FAIL}Cannot create validator, {validator_config['validator-addr']} "
                 f"does not have sufficient funds (need {amount} ONE). Checked {count} time(s).{Typgpy.ENDC}")
-            if not _hard_reset_recovery:
-                raise RuntimeError("Create Validator Error")
-            log(f"{Typgpy.WARNING}Checking again in {check_interval} seconds.{Typgpy.ENDC}")
-            time.sleep(check_interval)
-        else:
-            log(f"{Typgpy.OKGREEN}Address: {validator_config['validator-addr']} has enough funds{Typgpy.ENDC}")
-            return
+            raise RuntimeError("Create Validator Error")
+
+    policies = [(_endpoint_errors, _endpoint_retry_policy), (RuntimeError, _balance_retry_policy)]
+    retry.call(check_balance, policies if _hard_reset_recovery else [], on_retry=_log_retry)
+    log(f"{Typgpy.OKGREEN}Address: {validator_config['validator-addr']} has enough funds{Typgpy.ENDC}")
 
 
 def _send_create_validator_tx():
     log(f"{Typgpy.OKBLUE}Sending create validator transaction...{Typgpy.ENDC}")
     passphrase = get_wallet_passphrase()
-    count = 0
-    while True:
-        count += 1
+
+    def send_create_validator_tx():
         try:
-            cmd = ['hmy', '--node', f'{node_config["endpoint"]}', 'staking', 'create-validator',
+            cmd = ['hmy', '--node', get_beacon_endpoint(), 'staking', 'create-validator',
                    '--validator-addr', f'{validator_config["validator-addr"]}',
                    '--name', f'{validator_config["name"]}',
                    '--identity', f'{validator_config["identity"]}',
@@ -179,37 +326,48 @@ def _send_create_validator_tx():
                    '--bls-pubkeys-dir', bls_key_dir, "--passphrase"]
             if validator_config["gas-price"]:
                 cmd.extend(['--gas-price', f'{validator_config["gas-price"]}'])
-            proc = cli.expect_call(cmd)
-            pexpect_input_wallet_passphrase(proc, passphrase)
-            proc.expect(pexpect.EOF)
+            with timed_cli(cmd):
+                proc = cli.expect_call(cmd)
+                pexpect_input_wallet_passphrase(proc, passphrase)
+                proc.expect(pexpect.EOF)
             response = proc.before.decode()
+            _track_tx(response, 'create-validator')
             log(f"{Typgpy.OKBLUE}Create-validator transaction response: "
                 f"{Typgpy.OKGREEN}{response}{Typgpy.ENDC}")
-            return
-        except (RuntimeError, TimeoutError, ConnectionError, subprocess.CalledProcessError) as e:
-            log(f"{Typgpy.FAIL}Create-validator transaction failure (attempt {count}). Error: {e}{Typgpy.ENDC}")
-            if not _hard_reset_recovery:
-                raise e
-            log(f"{Typgpy.WARNING}Trying again in {check_interval} seconds.{Typgpy.ENDC}")
-            time.sleep(check_interval)
+        except _tx_errors as e:
+            log(f"{Typgpy.FAIL}Create-validator transaction failure. Error: {e}{Typgpy.ENDC}")
+            raise
+
+    retry.call(send_create_validator_tx, _get_tx_retry_policies(), on_retry=_log_retry)
 
 
 def _create_new_validator():
     _verify_prestaking_epoch()
     _verify_account_balance(Decimal(validator_config['amount']) + _balance_buffer)
     _send_create_validator_tx()
+    invalidate_validator_addresses()  # New validator is added mid-epoch.
+
+
+def _get_sync_epochs():
+    """
+    Returns the (shard chain epoch, beacon chain epoch) of the local node & the current epoch of the network.
+    """
+    curr_headers = blockchain.get_latest_headers(endpoint=local_endpoint)
+    return (curr_headers['shard-chain-header']['epoch'], curr_headers['beacon-chain-header']['epoch'],
+            blockchain.get_current_epoch(endpoint=node_config['endpoint']))
+
+
+def _is_synced(epochs):
+    curr_epoch_shard, curr_epoch_beacon, ref_epoch = epochs
+    return curr_epoch_shard >= ref_epoch and curr_epoch_beacon >= ref_epoch
 
 
 def _verify_node_sync():
     log(f"{Typgpy.OKBLUE}Verifying Node Sync...{Typgpy.ENDC}")
-    wait_for_node_response("http://localhost:9500/", sleep=1, verbose=True)
+    wait_for_node_response(local_endpoint, sleep=1, verbose=True)
     wait_for_node_response(node_config['endpoint'], sleep=1, verbose=True)
-    curr_headers = blockchain.get_latest_headers()
-    curr_epoch_shard = curr_headers['shard-chain-header']['epoch']
-    curr_epoch_beacon = curr_headers['beacon-chain-header']['epoch']
-    ref_epoch = blockchain.get_current_epoch(endpoint=node_config['endpoint'])
     has_looped = False
-    if curr_epoch_shard < ref_epoch or curr_epoch_beacon < ref_epoch:
+    if not _is_synced(_get_sync_epochs()):
         prompt = "Waiting for node to sync. Deactivate validator? [Y]/n \n> "
         auto_interaction = 'Y' if _hard_reset_recovery else None
         if is_active_validator() and can_safe_stop_node() \
@@ -220,17 +378,20 @@ def _verify_node_sync():
             except (TimeoutError, ConnectionError, RuntimeError, subprocess.CalledProcessError) as e:
                 log(f"{Typgpy.FAIL}Unable to deactivate validator {validator_config['validator-addr']}"
                     f"error {e}. Continuing...{Typgpy.ENDC}")
-    while curr_epoch_shard < ref_epoch or curr_epoch_beacon < ref_epoch:
-        sys.stdout.write(f"\rWaiting for node to sync: shard epoch ({curr_epoch_shard}/{ref_epoch}) "
-                         f"& beacon epoch ({curr_epoch_beacon}/{ref_epoch})")
+
+    def write_progress(epochs):
+        nonlocal has_looped
+        sys.stdout.write(f"\rWaiting for node to sync: shard epoch ({epochs[0]}/{epochs[2]}) "
+                         f"& beacon epoch ({epochs[1]}/{epochs[2]})")
         sys.stdout.flush()
         has_looped = True
-        time.sleep(check_interval)
         assert_no_invalid_blocks()
-        curr_headers = blockchain.get_latest_headers()
-        curr_epoch_shard = curr_headers['shard-chain-header']['epoch']
-        curr_epoch_beacon = curr_headers['beacon-chain-header']['epoch']
-        ref_epoch = blockchain.get_current_epoch(endpoint=node_config['endpoint'])
+
+    # Checked on new blocks of the local node, at most once per block time as it syncs blocks much faster.
+    curr_epoch_shard, curr_epoch_beacon, ref_epoch = blocks.wait_until(_get_sync_epochs, _is_synced,
+                                                                       local_endpoint,
+                                                                       on_state=write_progress,
+                                                                       min_interval=check_interval)
     if curr_epoch_shard > ref_epoch + 1 or curr_epoch_beacon > ref_epoch + 1:  # +1 for some slack on epoch change.
         log(f"{Typgpy.FAIL}Node epoch (shard: {curr_epoch_shard} beacon: {curr_epoch_beacon}) is greater than network "
             f"epoch ({ref_epoch}) which is not possible, is config correct?{Typgpy.ENDC}")
@@ -281,7 +442,11 @@ def get_validator_information():
     """
     Get the current validator information from the configured endpoint.
     """
-    return staking.get_validator_information(validator_config['validator-addr'], endpoint=node_config['endpoint'])
+    try:
+        return staking.get_validator_information(validator_config['validator-addr'], endpoint=node_config['endpoint'])
+    except exceptions.RPCError as e:
+        invalidate_validator_addresses(node_config['endpoint'])  # Validator set might be stale.
+        raise e
 
 
 def get_balances():
@@ -308,20 +473,18 @@ def is_active_validator():
 
 def deactivate_validator():
     try:
-        all_val = staking.get_all_validator_addresses(endpoint=node_config['endpoint'])
+        all_val = get_all_validator_addresses()
         if validator_config["validator-addr"] in all_val:
             log(f"{Typgpy.OKBLUE}Deactivating validator{Typgpy.ENDC}")
             passphrase = get_wallet_passphrase()
             cmd = ['hmy', 'staking', 'edit-validator',
                    '--validator-addr', f'{validator_config["validator-addr"]}',
-                   '--active', 'false', '--node', f'{node_config["endpoint"]}',
+                   '--active', 'false', '--node', get_beacon_endpoint(),
                    '--passphrase']
             if validator_config["gas-price"]:
                 cmd.extend(['--gas-price', f'{validator_config["gas-price"]}'])
-            proc = cli.expect_call(cmd)
-            pexpect_input_wallet_passphrase(proc, passphrase)
-            proc.expect(pexpect.EOF)
-            response = proc.before.decode()
+            message = edit_validator_message(validator_config["validator-addr"], active=False)
+            response = _send_staking_tx(edit_validator_directive, message, cmd, passphrase, 'deactivate')
             log(f"{Typgpy.OKGREEN}Edit-validator response: {response}{Typgpy.ENDC}")
         else:
             log(f"{Typgpy.FAIL}Address {validator_config['validator-addr']} is not a validator!{Typgpy.ENDC}")
@@ -335,19 +498,17 @@ def deactivate_validator():
 
 def activate_validator():
     try:
-        all_val = staking.get_all_validator_addresses(endpoint=node_config['endpoint'])
+        all_val = get_all_validator_addresses()
         if validator_config["validator-addr"] in all_val:
             log(f"{Typgpy.OKBLUE}Activating validator{Typgpy.ENDC}")
             passphrase = get_wallet_passphrase()
             cmd = ['hmy', 'staking', 'edit-validator', '--validator-addr', f'{validator_config["validator-addr"]}',
-                   '--active', 'true', '--node', f'{node_config["endpoint"]}',
+                   '--active', 'true', '--node', get_beacon_endpoint(),
                    '--passphrase']
             if validator_config["gas-price"]:
                 cmd.extend(['--gas-price', f'{validator_config["gas-price"]}'])
-            proc = cli.expect_call(cmd)
-            pexpect_input_wallet_passphrase(proc, passphrase)
-            proc.expect(pexpect.EOF)
-            response = proc.before.decode()
+            message = edit_validator_message(validator_config["validator-addr"], active=True)
+            response = _send_staking_tx(edit_validator_directive, message, cmd, passphrase, 'activate')
             log(f"{Typgpy.OKGREEN}Edit-validator response: {response}{Typgpy.ENDC}")
         else:
             log(f"{Typgpy.FAIL}Address {validator_config['validator-addr']} is not a validator!{Typgpy.ENDC}")
@@ -361,18 +522,16 @@ def activate_validator():
 
 def collect_reward():
     try:
-        all_val = staking.get_all_validator_addresses(endpoint=node_config['endpoint'])
+        all_val = get_all_validator_addresses()
         if validator_config["validator-addr"] in all_val:
             log(f"{Typgpy.OKBLUE}Collecting rewards{Typgpy.ENDC}")
             passphrase = get_wallet_passphrase()
             cmd = ['hmy', 'staking', 'collect-rewards', '--delegator-addr', validator_config['validator-addr'],
-                   '--node', f'{node_config["endpoint"]}', '--passphrase']
+                   '--node', get_beacon_endpoint(), '--passphrase']
             if validator_config["gas-price"]:
                 cmd.extend(['--gas-price', f'{validator_config["gas-price"]}'])
-            proc = cli.expect_call(cmd)
-            pexpect_input_wallet_passphrase(proc, passphrase)
-            proc.expect(pexpect.EOF)
-            response = proc.before.decode()
+            message = collect_rewards_message(validator_config["validator-addr"])
+            response = _send_staking_tx(collect_rewards_directive, message, cmd, passphrase, 'collect-rewards')
             log(f"{Typgpy.OKGREEN}Collect rewards response: {response}{Typgpy.ENDC}")
         else:
             log(f"{Typgpy.FAIL}Address {validator_config['validator-addr']} is not a validator!{Typgpy.ENDC}")
@@ -387,11 +546,18 @@ def collect_reward():
 def check_and_activate():
     """
     Return True when attempted to activate, otherwise return False.
+
+    Nothing is sent while a previous activation transaction is waiting for its receipt.
     """
     try:
+        pending_activation = receipts.get_pending('activate')
+        if pending_activation is not None:
+            log(f"{Typgpy.WARNING}Activation transaction {pending_activation['tx-hash']} is pending, "
+                f"not reactivating.{Typgpy.ENDC}")
+            return False
         if not is_active_validator():
             log(f"{Typgpy.FAIL}Node not active, reactivating...{Typgpy.ENDC}")
-            curr_headers = blockchain.get_latest_headers()
+            curr_headers = blockchain.get_latest_headers(endpoint=local_endpoint)
             curr_epoch_shard = curr_headers['shard-chain-header']['epoch']
             curr_epoch_beacon = curr_headers['beacon-chain-header']['epoch']
             wait_for_node_response(node_config['endpoint'], tries=900, sleep=1, verbose=False)  # Try for 15 min
@@ -419,7 +585,7 @@ def setup(hard_reset_recovery=False):
         if not hard_reset_recovery:
             _first_setup()
         wait_for_node_response(node_config['endpoint'], verbose=True, tries=120, sleep=1)  # Try for 2 min
-        all_val_address = staking.get_all_validator_addresses(endpoint=node_config['endpoint'])
+        all_val_address = get_all_validator_addresses()
         if validator_config['validator-addr'] in all_val_address:
             log(f"{Typgpy.WARNING}{validator_config['validator-addr']} already in list of validators!{Typgpy.ENDC}")
             validator_info = get_validator_information()
@@ -455,7 +621,7 @@ def update_info(hard_reset_recovery=False):
     old_logging_handlers = _interaction_preprocessor(hard_reset_recovery)
     address = validator_config['validator-addr']
     try:
-        all_val_address = staking.get_all_validator_addresses(endpoint=node_config['endpoint'])
+        all_val_address = get_all_validator_addresses()
         if address not in all_val_address:
             log(f"{Typgpy.WARNING}Cannot edit validator information, validator "
                 f"{Typgpy.OKGREEN}{address}{Typgpy.WARNING} is not a validator!{Typgpy.ENDC}")
@@ -467,14 +633,12 @@ def update_info(hard_reset_recovery=False):
             log(f"{Typgpy.OKBLUE}Updating validator information for {address}: "
                 f"{Typgpy.OKGREEN}{json.dumps(fields, indent=2)}{Typgpy.ENDC}")
             passphrase = get_wallet_passphrase()
-            cmd = ['hmy', '--node', f'{node_config["endpoint"]}', 'staking', 'edit-validator',
+            cmd = ['hmy', '--node', get_beacon_endpoint(), 'staking', 'edit-validator',
                    '--validator-addr', f'{address}', '--passphrase']
             for key, value in fields.items():
                 cmd.extend([f'--{key}', f'{value}'])
-            proc = cli.expect_call(cmd)
-            pexpect_input_wallet_passphrase(proc, passphrase)
-            proc.expect(pexpect.EOF)
-            response = proc.before.decode()
+            message = edit_validator_message(address, **{k.replace('-', '_'): v for k, v in fields.items()})
+            response = _send_staking_tx(edit_validator_directive, message, cmd, passphrase, 'edit-validator')
             log(f"{Typgpy.OKBLUE}Edit-validator transaction response: {Typgpy.OKGREEN}{response}{Typgpy.ENDC}")
         logging.getLogger('AutoNode').handlers = old_logging_handlers
     except Exception as e:
@@ -499,12 +663,10 @@ def remove_bls_key(key):
         return
     passphrase = get_wallet_passphrase()
     log(f"{Typgpy.OKBLUE}Removing BLS key {Typgpy.OKGREEN}{key}{Typgpy.ENDC}")
-    proc = cli.expect_call(['hmy', '--node', node_config['endpoint'], 'staking', 'edit-validator',
-                            '--validator-addr', validator_config['validator-addr'],
-                            '--remove-bls-key', key, '--passphrase'])
-    pexpect_input_wallet_passphrase(proc, passphrase)
-    proc.expect(pexpect.EOF)
-    response = proc.before.decode()
+    cmd = ['hmy', '--node', get_beacon_endpoint(), 'staking', 'edit-validator',
+           '--validator-addr', validator_config['validator-addr'], '--remove-bls-key', key, '--passphrase']
+    message = edit_validator_message(validator_config['validator-addr'], bls_key_to_remove=key)
+    response = _send_staking_tx(edit_validator_directive, message, cmd, passphrase, 'remove-bls-key')
     log(f"{Typgpy.OKGREEN}Edit-validator transaction response: {response}{Typgpy.ENDC}")
 
 
@@ -519,7 +681,7 @@ def can_safe_stop_node(safe=False):
         if node_config['no-validator']:
             return True
         addr = validator_config['validator-addr']
-        all_val_address = staking.get_all_validator_addresses(endpoint=node_config['endpoint'])
+        all_val_address = get_all_validator_addresses()
         if addr in all_val_address and not get_validator_information()['currently-in-committee']:
             return True
         return not is_signing()
@@ -0,0 +1,118 @@
+"""
+Library for watching files (i.e: saved configs) for changes without re-reading them.
+
+Uses inotify (through libc) where available, otherwise falls back to comparing
+the file's inode, size & modification time. A reload can also be requested with a signal.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import signal
+import struct
+import threading
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_Q_OVERFLOW = 0x00004000
+_event_header = struct.Struct('iIII')  # wd, mask, cookie, len (of name)
+
+_reload_requested = threading.Event()
+_libc = None
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        try:
+            _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            _libc.inotify_init1  # Check that inotify is available.
+        except (OSError, AttributeError):
+            _libc = False
+    return _libc
+
+
+def request_reload():
+    """
+    Make the next `FileWatcher.changed` call report a change, even if the file did not change.
+    """
+    _reload_requested.set()
+
+
+def install_reload_handler(signum=signal.SIGHUP):
+    """
+    Request a reload on the signal `signum` (default is SIGHUP). Only for the main thread of the daemons.
+    """
+    signal.signal(signum, lambda s, frame: request_reload())
+
+
+class FileWatcher:
+    """
+    Watches the file at `path` for changes that are done writing (closed or moved into place).
+
+    The first `changed` call always reports a change, so the file is loaded once.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self._name = os.path.basename(self.path).encode()
+        self._fd = None
+        self._signature = None
+        self._first = True
+        libc = _get_libc()
+        if libc:
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                mask = _IN_CLOSE_WRITE | _IN_MOVED_TO
+                if libc.inotify_add_watch(fd, os.path.dirname(self.path).encode(), mask) >= 0:
+                    self._fd = fd
+                else:
+                    os.close(fd)
+        if self._fd is None:
+            self._signature = self._stat_signature()
+
+    @property
+    def uses_inotify(self):
+        return self._fd is not None
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _read_events(self):
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset + _event_header.size <= len(data):
+                _, mask, _, name_len = _event_header.unpack_from(data, offset)
+                name = data[offset + _event_header.size:offset + _event_header.size + name_len].rstrip(b'\0')
+                offset += _event_header.size + name_len
+                if mask & _IN_Q_OVERFLOW or name == self._name:
+                    changed = True
+
+    def changed(self):
+        """
+        Returns True if the file changed (or a reload was requested) since the last call.
+        """
+        changed = self._first or _reload_requested.is_set()
+        self._first = False
+        _reload_requested.clear()
+        if self._fd is not None:
+            return self._read_events() or changed
+        signature = self._stat_signature()
+        if signature != self._signature:
+            self._signature = signature
+            return True
+        return changed
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
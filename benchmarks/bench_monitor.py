@@ -0,0 +1,183 @@
+"""
+Benchmark of the AutoNode monitor cycle & validator setup against local mock Harmony RPC endpoints.
+
+Reports the time, RPC count and bytes transferred per monitor cycle, the time to index
+the node logs (full & incremental) and the time & RPC count of the (non-interactive) validator setup
+of an existing validator, as done after a hard reset. Nothing touches the real node, AutoNode state
+is kept in a temporary HOME.
+
+Usage: python3 benchmarks/bench_monitor.py [--cycles N] [--setup-runs N] [--latency SEC] [--jitter SEC] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+_repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="== Benchmark the AutoNode monitor cycle ==")
+    parser.add_argument("--cycles", type=int, default=20, help="Number of timed monitor cycles. Default: 20.")
+    parser.add_argument("--setup-runs", type=int, default=5, help="Number of timed validator setups. Default: 5.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Base latency (seconds) of each RPC.")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Max random extra latency (seconds) of each RPC.")
+    parser.add_argument("--validators", type=int, default=2000, help="Number of validators on the mock chain.")
+    parser.add_argument("--log-lines", type=int, default=200000, help="Lines in the fake node log.")
+    parser.add_argument("--append-lines", type=int, default=100, help="Lines appended to the log per cycle.")
+    parser.add_argument("--no-auto-reset", action="store_true", help="Benchmark without the hard-reset checks.")
+    parser.add_argument("--node-port", type=int, default=9610, help="Port of the mock (local) node.")
+    parser.add_argument("--beacon-port", type=int, default=9620, help="Port of the mock beacon/shard endpoint.")
+    parser.add_argument("--json", action="store_true", help="Output the report as JSON.")
+    return parser.parse_args()
+
+
+def _setup_home():
+    """
+    Use a temporary HOME so that no real AutoNode state is read or written.
+    The CLI binary is linked from the real HOME (if it exists) to avoid a download.
+    """
+    real_cli_dir = f"{os.environ['HOME']}/.hmy/bin"
+    home = tempfile.mkdtemp(prefix="autonode-bench-")
+    os.makedirs(f"{home}/.hmy", exist_ok=True)
+    if os.path.isdir(real_cli_dir):
+        os.symlink(real_cli_dir, f"{home}/.hmy/bin")
+    os.environ['HOME'] = home
+    return home
+
+
+def _summarize(values):
+    ordered = sorted(values)
+    return {
+        "mean": statistics.mean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)],
+        "max": ordered[-1],
+    }
+
+
+def _total(stats, key):
+    return sum(s[key] for s in stats.values())
+
+
+def main():
+    args = _parse_args()
+    home = _setup_home()
+    sys.path.insert(0, _repo_dir)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from fake_log import write_log
+    from mock_rpc import MockChain, MockRPCServer, bls_key, validator_addr
+
+    import asyncio
+    from AutoNode import common, monitor, node, validator
+    from AutoNode.logs import ConsensusIndex
+
+    beacon_url = f"http://localhost:{args.beacon_port}/"
+    structure = [{"current": True, "shardID": 0, "http": beacon_url, "ws": ""}]
+    beacon = MockRPCServer(MockChain(num_validators=args.validators, sharding_structure=structure),
+                           args.beacon_port, latency=args.latency, jitter=args.jitter).start()
+    local = MockRPCServer(MockChain(num_validators=args.validators, sharding_structure=structure),
+                          args.node_port, latency=args.latency, jitter=args.jitter).start()
+    monitor.local_endpoint = local.url
+
+    common.node_config.update({
+        "endpoint": beacon_url,
+        "network": "testnet",
+        "auto-reset": not args.no_auto_reset,
+        "auto-active": False,
+        "no-validator": False,
+        "public-bls-keys": [],
+    })
+    common.validator_config['validator-addr'] = validator_addr
+
+    log_dir = f"{common.node_dir}/latest"
+    os.makedirs(log_dir, exist_ok=True)
+    log_file = f"{log_dir}/zerolog-validator-127.0.0.1-9000-2020-06-01T00-00-00.000.log"
+    log_bytes = write_log(log_file, args.log_lines)
+    index_start = time.monotonic()
+    node._consensus_index = ConsensusIndex(log_dir, f"{common.harmony_dir}/consensus_index.json")
+    node._consensus_index.update()
+    full_index_time = time.monotonic() - index_start
+
+    loop = asyncio.new_event_loop()
+    monitor._run_cycle(loop, beacon_url)  # Warm up caches & connections.
+    cycle_times, rpc_counts, bytes_in, bytes_out, failures, incremental_index_times = [], [], [], [], 0, []
+    appended = args.log_lines
+    for i in range(args.cycles):
+        write_log(log_file, args.append_lines, append=True, start_block=100000 + appended // 20, seed=i + 1)
+        appended += args.append_lines
+        beacon.reset_stats()
+        local.reset_stats()
+        start = time.monotonic()
+        results = monitor._run_cycle(loop, beacon_url)
+        cycle_times.append(time.monotonic() - start)
+        incremental_index_times.append(results['consensus'].duration)
+        failures += sum(1 for r in results.values() if r.error is not None)
+        stats = [beacon.stats(), local.stats()]
+        rpc_counts.append(sum(_total(s, 'requests') for s in stats))
+        bytes_in.append(sum(_total(s, 'bytes-in') for s in stats))
+        bytes_out.append(sum(_total(s, 'bytes-out') for s in stats))
+    loop.close()
+
+    # Setup of an existing validator with all BLS keys on chain & a synced node, as done after a hard reset.
+    validator.local_endpoint = local.url
+    common.node_config['public-bls-keys'] = [bls_key]
+    setup_log, setup_failures, setup_times, setup_rpc_counts = [], 0, [], []
+    validator.log = lambda *a: setup_log.append(" ".join(str(x) for x in a))  # Setup output is not the report.
+    for _ in range(args.setup_runs):
+        beacon.reset_stats()
+        local.reset_stats()
+        del setup_log[:]
+        start = time.monotonic()
+        validator.setup(hard_reset_recovery=True)  # Errors are only logged in hard reset recovery.
+        setup_times.append(time.monotonic() - start)
+        setup_failures += int(any("Validator creation error" in line for line in setup_log))
+        setup_rpc_counts.append(sum(_total(s, 'requests') for s in [beacon.stats(), local.stats()]))
+    beacon.stop()
+    local.stop()
+
+    report = {
+        "cycles": args.cycles,
+        "rpc-latency": args.latency,
+        "rpc-jitter": args.jitter,
+        "cycle-seconds": _summarize(cycle_times),
+        "rpcs-per-cycle": _summarize(rpc_counts),
+        "request-bytes-per-cycle": _summarize(bytes_in),
+        "response-bytes-per-cycle": _summarize(bytes_out),
+        "failed-queries": failures,
+        "log-bytes": log_bytes,
+        "full-log-index-seconds": full_index_time,
+        "incremental-log-index-seconds": _summarize(incremental_index_times),
+        "setup-runs": args.setup_runs,
+        "setup-seconds": _summarize(setup_times) if setup_times else None,
+        "rpcs-per-setup": _summarize(setup_rpc_counts) if setup_rpc_counts else None,
+        "failed-setups": setup_failures,
+        "home": home,
+    }
+    if args.json:
+        print(json.dumps(report, indent=4))
+        return
+    print(f"Monitor cycle benchmark ({args.cycles} cycles, RPC latency {args.latency}s + <={args.jitter}s jitter)")
+    for key in ("cycle-seconds", "rpcs-per-cycle", "request-bytes-per-cycle", "response-bytes-per-cycle",
+                "incremental-log-index-seconds"):
+        summary = report[key]
+        print(f"  {key:<32} mean {summary['mean']:>12.4f}  p50 {summary['p50']:>12.4f}  "
+              f"p95 {summary['p95']:>12.4f}  max {summary['max']:>12.4f}")
+    print(f"  {'failed-queries':<32} {failures}")
+    print(f"  {'full-log-index-seconds':<32} {full_index_time:.4f} ({log_bytes} bytes of log)")
+    if setup_times:
+        print(f"Validator setup benchmark ({args.setup_runs} runs)")
+        for key in ("setup-seconds", "rpcs-per-setup"):
+            summary = report[key]
+            print(f"  {key:<32} mean {summary['mean']:>12.4f}  p50 {summary['p50']:>12.4f}  "
+                  f"p95 {summary['p95']:>12.4f}  max {summary['max']:>12.4f}")
+        print(f"  {'failed-setups':<32} {setup_failures}")
+
+
+if __name__ == "__main__":
+    main()
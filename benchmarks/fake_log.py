@@ -0,0 +1,53 @@
+"""
+Generator of fake harmony node (zerolog JSON) logs, used by the AutoNode benchmarks.
+
+The logs have the same markers that AutoNode looks for (signing, view changes, sync, errors)
+at configurable rates, mixed with a bulk of unrelated lines.
+"""
+
+import json
+import random
+import time
+
+
+def _log_time(timestamp):
+    micro = int((timestamp % 1) * 1e6)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(timestamp)) + f".{micro:06d}Z"
+
+
+def generate_lines(count, start_block=100000, lines_per_block=20, start_time=None,
+                   view_change_rate=0.01, error_rate=0.005, sync_rate=0.01, seed=0):
+    """
+    Generator of `count` fake log lines (bytes, without the newline).
+    Each block has `lines_per_block` lines and ends with a signing (HOORAY) line.
+    """
+    rand = random.Random(seed)
+    start_time = time.time() - count if start_time is None else start_time
+    for i in range(count):
+        block = start_block + i // lines_per_block
+        entry = {"level": "info", "port": "9000", "ip": "127.0.0.1", "blockNum": block}
+        roll = rand.random()
+        if i % lines_per_block == lines_per_block - 1:
+            entry.update({"message": "HOORAY!!!!!!! CONSENSUS REACHED!!!!!!!", "numOfSignatures": 200})
+        elif roll < view_change_rate:
+            entry.update({"message": "[startViewChange] start view change timer", "viewChangingID": block})
+        elif roll < view_change_rate + error_rate:
+            entry.update({"level": "error", "message": "[ConsensusMainLoop] Failed to verify the block"})
+        elif roll < view_change_rate + error_rate + sync_rate:
+            entry.update({"message": "[SYNC] Node is now IN SYNC!", "myBlock": block})
+        else:
+            entry.update({"message": "[OnPrepare] Received Prepare Message", "MsgViewID": block,
+                          "validatorPubKey": f"{rand.getrandbits(384):096x}"})
+        entry["time"] = _log_time(start_time + i)
+        yield json.dumps(entry, separators=(',', ':')).encode()
+
+
+def write_log(path, count, append=False, **kwargs):
+    """
+    Write (or append) `count` fake log lines to `path`. Returns the number of bytes written.
+    """
+    written = 0
+    with open(path, 'ab' if append else 'wb') as f:
+        for line in generate_lines(count, **kwargs):
+            written += f.write(line + b'\n')
+    return written
@@ -0,0 +1,235 @@
+"""
+Local stand-in for a Harmony JSON-RPC endpoint, used by the AutoNode benchmarks.
+
+Serves the `hmy_*` & `hmyv2_*` methods used by AutoNode with a configurable
+latency & jitter, and counts the requests & bytes transferred per method.
+The chain advances by 1 block every `block_time` seconds from when the server starts.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer
+)
+
+validator_addr = "one1pdv9lrdwl0rg5vglh4xtyrv3wjk3wsqket7zxy"
+bls_key = "0x" + "ab" * 48
+
+
+class MockChain:
+    """
+    Deterministic chain data served by the mock RPC server.
+    """
+
+    def __init__(self, shard_id=0, num_validators=500, blocks_per_epoch=16384, block_time=8.0,
+                 start_block=100000, network="testnet", sharding_structure=None):
+        self.shard_id = shard_id
+        self.num_validators = num_validators
+        self.blocks_per_epoch = blocks_per_epoch
+        self.block_time = block_time
+        self.start_block = start_block
+        self.network = network
+        self.sharding_structure = sharding_structure or []
+        self.start_time = time.time()
+        self.validators = [validator_addr] + [f"one1{i:038d}" for i in range(num_validators - 1)]
+        self.staking_transactions = []  # Raw (hex) staking transactions sent to the chain
+        self.resets = 0  # Number of (simulated) hard resets, part of every block hash
+        self._lock = threading.Lock()
+
+    def hard_reset(self):
+        """
+        Simulate a hard reset of the chain, so that all blocks (including block 1) get a new hash.
+        """
+        self.resets += 1
+
+    def block_hash(self, number):
+        return f"0x{self.resets:016x}{number:048x}"
+
+    def block_number(self):
+        return self.start_block + int((time.time() - self.start_time) / self.block_time)
+
+    def epoch(self):
+        return self.block_number() // self.blocks_per_epoch
+
+    def header(self, shard_id):
+        block = self.block_number()
+        return {
+            "blockHash": self.block_hash(block),
+            "blockNumber": block,
+            "epoch": self.epoch(),
+            "shardID": shard_id,
+            "viewID": block,
+            "timestamp": int(time.time()),
+        }
+
+    def handle(self, method, params):
+        """
+        Returns the result of the RPC `method` with `params`.
+        Raises KeyError if the method is not supported.
+        """
+        v2 = method.startswith("hmyv2_")
+        name = method.split("_", 1)[1]
+        if name == "blockNumber":
+            return self.block_number() if v2 else hex(self.block_number())
+        if name == "getEpoch":
+            return self.epoch() if v2 else hex(self.epoch())
+        if name == "getNodeMetadata":
+            return {
+                "blskey": [bls_key],
+                "version": "Harmony (C) 2020. harmony, version v6000-mock",
+                "network": self.network,
+                "chain-config": {"chain-id": 2},
+                "is-leader": False,
+                "shard-id": self.shard_id,
+                "current-epoch": self.epoch(),
+                "blocks-per-epoch": self.blocks_per_epoch,
+                "role": "Validator",
+                "dns-zone": "mock.hmny.io",
+                "is-archival": False,
+                "node-unix-start-time": int(self.start_time),
+                "p2p-connectivity": {"total-known-peers": 64, "connected": 32, "not-connected": 32},
+            }
+        if name == "getLatestChainHeaders":
+            return {
+                "beacon-chain-header": self.header(0),
+                "shard-chain-header": self.header(self.shard_id),
+            }
+        if name == "latestHeader":
+            return self.header(self.shard_id)
+        if name == "getShardingStructure":
+            return self.sharding_structure
+        if name == "getBlockByNumber":
+            number = params[0] if v2 else int(params[0], 16)
+            if number > self.block_number():
+                return None
+            return {"number": number if v2 else hex(number), "hash": self.block_hash(number), "transactions": [],
+                    "stakingTransactions": [], "epoch": number // self.blocks_per_epoch}
+        if name == "getAllValidatorAddresses":
+            return self.validators
+        if name == "getValidatorInformation":
+            if params[0] not in self.validators:
+                raise ValueError("not found")
+            return {
+                "validator": {"address": params[0], "bls-public-keys": [bls_key], "name": "mock"},
+                "epos-status": "currently elected",
+                "active-status": "active",
+                "booted-status": None,
+                "current-epoch-performance": {
+                    "current-epoch-signing-percent": {
+                        "current-epoch-signed": 100,
+                        "current-epoch-to-sign": 100,
+                        "current-epoch-signing-percentage": "1.000000000000000000"
+                    }
+                },
+            }
+        if name == "getTransactionCount":
+            with self._lock:
+                nonce = len(self.staking_transactions)
+            return nonce if v2 else hex(nonce)
+        if name == "sendRawStakingTransaction":
+            raw_tx = bytes.fromhex(params[0].replace("0x", ""))
+            with self._lock:
+                self.staking_transactions.append(params[0])
+            return "0x" + hashlib.sha256(raw_tx).hexdigest()  # Not the chain's tx hash, only unique per tx.
+        if name == "getTransactionReceipt":
+            sent = {"0x" + hashlib.sha256(bytes.fromhex(tx.replace("0x", ""))).hexdigest()
+                    for tx in self.staking_transactions}
+            if params[0] not in sent:
+                return None
+            block = self.block_number()
+            return {"transactionHash": params[0], "blockNumber": block if v2 else hex(block),
+                    "status": 1 if v2 else "0x1"}
+        if name == "getCurrentStakingErrorSink":
+            return []
+        raise KeyError(method)
+
+
+class MockRPCServer:
+    """
+    Threaded mock RPC server for a `chain`, bound to `host`:`port`.
+
+    Each request is delayed by `latency` seconds plus a uniform random jitter of up to `jitter` seconds.
+    """
+
+    def __init__(self, chain, port, host="127.0.0.1", latency=0.0, jitter=0.0):
+        self.chain = chain
+        self.latency = latency
+        self.jitter = jitter
+        self.url = f"http://{'localhost' if host == '127.0.0.1' else host}:{port}/"
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, same as a real endpoint.
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                method, body = server.respond(raw)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server.record(method, len(raw), len(body))
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def respond(self, raw):
+        """
+        Returns the RPC method and the (bytes) JSON-RPC response to the `raw` request.
+        """
+        time.sleep(max(self.latency + random.uniform(0, self.jitter), 0))
+        try:
+            request = json.loads(raw)
+            method, params = request['method'], request.get('params', [])
+        except (ValueError, KeyError):
+            return None, json.dumps({"jsonrpc": "2.0", "id": None,
+                                     "error": {"code": -32700, "message": "parse error"}}).encode()
+        response = {"jsonrpc": "2.0", "id": request.get('id', None)}
+        try:
+            response['result'] = self.chain.handle(method, params)
+        except KeyError:
+            response['error'] = {"code": -32601, "message": f"the method {method} does not exist/is not available"}
+        except (ValueError, IndexError) as e:
+            response['error'] = {"code": -32000, "message": str(e)}
+        return method, json.dumps(response).encode()
+
+    def record(self, method, bytes_in, bytes_out):
+        with self._stats_lock:
+            stats = self._stats.setdefault(method, {"requests": 0, "bytes-in": 0, "bytes-out": 0})
+            stats['requests'] += 1
+            stats['bytes-in'] += bytes_in
+            stats['bytes-out'] += bytes_out
+
+    def stats(self):
+        """
+        Returns a dict of method to its count of 'requests', 'bytes-in' and 'bytes-out' since the last reset.
+        """
+        with self._stats_lock:
+            return {k: dict(v) for k, v in self._stats.items()}
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name=f"mock-rpc-{self.url}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -144,6 +144,10 @@ case "${1}" in
   harmony_dir=$(python3 -c "from AutoNode import common; print(common.harmony_dir)")
   python3 -u "$harmony_dir"/cleanse-bls.py "${@:2}"
   ;;
+"fleet-monitor")
+  harmony_dir=$(python3 -c "from AutoNode import common; print(common.harmony_dir)")
+  python3 -u "$harmony_dir"/fleet-monitor.py "${@:2}"
+  ;;
 "remove-bls")
   python3 -u -c "from AutoNode import validator; validator.remove_bls_key(\"$2\")"
   ;;
@@ -227,6 +231,7 @@ case "${1}" in
       cleanse-bls <opts>    Remove BLS keys from validator that are not earning. Use '-h' param to view help msg
       remove-bls <pub-key>  Remove a given public BLS key from validator
       monitor <cmd>         View/Command Harmony Node Monitor. Use '-h' param to view help msg
+      fleet-monitor <opts>  Monitor many nodes (and their validators) from 1 process. Use '-h' param to view help msg
       node <cmd>            View/Command Harmony Node. Use '-h' params to view help msg
       tui <cmd>             Start the text-based user interface to monitor your node and validator.
                              Use '-h' param to view help msg
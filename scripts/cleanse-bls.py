@@ -1,16 +1,15 @@
 #!/usr/bin/env python3
 import argparse
-import time
 import json
 from argparse import RawTextHelpFormatter
 
 from pyhmy import (
     blockchain,
-    cli,
-    json_load,
     Typgpy
 )
 from AutoNode import (
+    blocks,
+    cache,
     common,
     util,
     node,
@@ -60,11 +59,9 @@ def shard_cleanse(yes=False):
     """
     # WARNING: Assumption that chain BLS keys are not 0x strings
     keys_on_chain = validator.get_validator_information()['validator']['bls-public-keys']
-    shard = json_load(cli.single_call(['hmy', 'utility', 'shard-for-bls', list(bls_keys)[0],
-                                       '--node', endpoint]))['shard-id']
+    shard = util.shard_for_bls(list(bls_keys)[0])
     for key in keys_on_chain:
-        key_shard = json_load(cli.single_call(['hmy', 'utility', 'shard-for-bls', key,
-                                               '--node', endpoint]))['shard-id']
+        key_shard = util.shard_for_bls(key)
         if key_shard != shard and key not in bls_keys:
             prompt = f"{Typgpy.HEADER}Remove BLS key not for shard {shard}: " \
                      f"{Typgpy.OKGREEN}{key}{Typgpy.HEADER}?{Typgpy.ENDC} [Y]/n\n> "
@@ -83,15 +80,14 @@ def reward_cleanse(yes=False):
         common.log(f"{Typgpy.WARNING}Can not get current BLS key performance, "
                    f"validator ({validator_addr}) is not elected.{Typgpy.ENDC}")
         if args.yes or util.input_with_print(f"Wait for election? [Y]/n\n> ").lower() in {'y', 'yes'}:
-            while val_metrics is None:
-                time.sleep(8)
-                val_metrics = validator.get_validator_information()['metrics']
+            val_metrics = blocks.wait_until(lambda: validator.get_validator_information()['metrics'],
+                                            lambda m: m is not None, endpoint)
         else:
             exit()
-    block_per_epoch = blockchain.get_node_metadata(endpoint=endpoint)['blocks-per-epoch']
+    block_per_epoch = cache.get_blocks_per_epoch(endpoint=endpoint)
     # WARNING: Assumption that epochs are greater than 6 blocks
-    while 0 <= blockchain.get_latest_header()['blockNumber'] % block_per_epoch <= 5:
-        pass
+    blocks.wait_until(lambda: blockchain.get_latest_header()['blockNumber'],
+                      lambda block_number: block_number % block_per_epoch > 5, "http://localhost:9500/")
     bls_metrics = validator.get_validator_information()['metrics']['by-bls-key']
     common.log(f"{Typgpy.OKBLUE}BLS key metrics: {Typgpy.OKGREEN}{json.dumps(bls_metrics, indent=2)}{Typgpy.ENDC}")
     keys_on_chain = validator.get_validator_information()['validator']['bls-public-keys']
@@ -109,7 +105,7 @@ def reward_cleanse(yes=False):
 
 if __name__ == "__main__":
     args = parse_args()
-    all_val = json_load(cli.single_call(['hmy', 'blockchain', 'validator', 'all', '--node', endpoint]))['result']
+    all_val = cache.get_all_validator_addresses(endpoint=endpoint)
     old_logging_handlers = common.logging.getLogger('AutoNode').handlers.copy()
     common.logging.getLogger('AutoNode').addHandler(util.get_simple_rotating_log_handler(node.log_path))
     if validator_addr not in all_val:
@@ -14,6 +14,7 @@ harmony_dir=$(python3 -c "from AutoNode import common; print(common.harmony_dir)
 echo "== COPYING OVER/REPLACING DEV AUTONODE SCRIPTS =="
 cp -v "$DIR"/../scripts/run.py "$harmony_dir"
 cp -v "$DIR"/../scripts/cleanse-bls.py "$harmony_dir"
+cp -v "$DIR"/../scripts/fleet-monitor.py "$harmony_dir"
 cp -v "$DIR"/../scripts/tui.sh "$harmony_dir"
 cp -v "$DIR"/../scripts/monitor.sh "$harmony_dir"
 cp -v "$DIR"/../scripts/node.sh "$harmony_dir"
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+import argparse
+import json
+from argparse import RawTextHelpFormatter
+
+from AutoNode import (
+    common,
+    monitor
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="== Monitor a fleet of Harmony nodes from 1 process ==",
+                                     usage="auto-node fleet-monitor [OPTIONS]",
+                                     formatter_class=RawTextHelpFormatter, add_help=False)
+    parser.add_argument('-h', '--help', action='help', default=argparse.SUPPRESS,
+                        help='Show this help message and exit')
+    parser.add_argument("--node", dest="nodes", action="append", default=[],
+                        help="Node to monitor, as '<node RPC endpoint>' or '<node RPC endpoint>,<validator address>'.\n  "
+                             "Can be given multiple times.")
+    parser.add_argument("--nodes-file", type=str, default=None,
+                        help="JSON file with a list of nodes to monitor, each as:\n  "
+                             "{\"endpoint\": <node RPC endpoint>, \"validator-addr\": <validator address or null>}")
+    parser.add_argument("--beacon-endpoint", dest="endpoint", type=str, default=None,
+                        help="Beacon chain (shard 0) endpoint. Default is the one of the AutoNode config.")
+    parser.add_argument("--duration", type=float, default=float('inf'),
+                        help="Seconds to monitor for. Default is forever.")
+    parser.add_argument("--metrics-port", default=9911, type=int,
+                        help="Port of the fleet monitor's Prometheus metrics endpoint (`/metrics`).\n  "
+                             "Use 0 to disable. Default: 9911 (the monitor daemon uses 9910).")
+    parser.add_argument("--expose-metrics", action="store_true",
+                        help="Serve the metrics on all interfaces, otherwise only on localhost.")
+    return parser.parse_args()
+
+
+def _get_nodes(args):
+    nodes = []
+    for node in args.nodes:
+        endpoint, _, validator_addr = node.partition(',')
+        nodes.append((endpoint.strip(), validator_addr.strip() or None))
+    if args.nodes_file is not None:
+        with open(args.nodes_file, 'r', encoding='utf8') as f:
+            for node in json.load(f):
+                nodes.append((node['endpoint'], node.get('validator-addr', None)))
+    return nodes
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    nodes = _get_nodes(args)
+    if not nodes:
+        raise SystemExit("No nodes to monitor, use '--node' or '--nodes-file'.")
+    if args.endpoint is not None:
+        common.node_config['endpoint'] = args.endpoint
+    common.node_config['metrics-port'] = args.metrics_port if args.metrics_port > 0 else None
+    common.node_config['expose-metrics'] = args.expose_metrics
+    monitor.start_fleet(nodes, duration=args.duration)
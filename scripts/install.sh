@@ -173,7 +173,7 @@ WantedBy=multi-user.target
   echo "[AutoNode] Installing AutoNode wrapper script"
   curl -s -o "$HOME/bin/auto-node" "https://raw.githubusercontent.com/harmony-one/auto-node/$release_branch/scripts/auto-node.sh"
   chmod +x "$HOME/bin/auto-node"
-  for auto_node_script in "run.py" "cleanse-bls.py" "tui.sh" "monitor.sh" "node.sh" "tune.py"; do
+  for auto_node_script in "run.py" "cleanse-bls.py" "fleet-monitor.py" "tui.sh" "monitor.sh" "node.sh" "tune.py"; do
     curl -s -o "$harmony_dir/$auto_node_script" "https://raw.githubusercontent.com/harmony-one/auto-node/$release_branch/scripts/$auto_node_script"
   done
   export PATH=$PATH:~/bin
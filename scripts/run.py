@@ -105,6 +105,16 @@ def _parse_args():
     parser.add_argument("--clean", action="store_true", help="Clean shared node directory before starting node.")
     parser.add_argument("--fast-sync", action="store_true", help="Rclone existing db snapshot(s)")
     parser.add_argument("--expose-rpc", action="store_true", help="Expose RPC ports for endpoint utility.")
+    parser.add_argument("--metrics-port", default=9910, type=int,
+                        help="Port of the monitor's Prometheus metrics endpoint (`/metrics`).\n  "
+                             "Use 0 to disable. Default: 9910.")
+    parser.add_argument("--expose-metrics", action="store_true",
+                        help="Serve the metrics on all interfaces, otherwise only on localhost.")
+    parser.add_argument("--compact-monitor-log", action="store_true",
+                        help="Log each monitor cycle as 1 JSON line of the fields that changed.")
+    parser.add_argument("--log-compression", default="gzip", choices=['gzip', 'bz2', 'xz', 'none'],
+                        help="Compression codec of rotated AutoNode logs.\n  "
+                             "Default: 'gzip'.")
     parser.add_argument("--shard", default=None,
                         help="Specify shard of generated bls key.\n  "
                              "Only used if no BLS keys are not provided.", type=int)
@@ -114,6 +124,9 @@ def _parse_args():
     parser.add_argument("--beacon-endpoint", dest="endpoint", type=str, default="https://api.s0.t.hmny.io/",
                         help=f"Beacon chain (shard 0) endpoint for staking transactions.\n  "
                              f"Default is https://api.s0.t.hmny.io/")
+    parser.add_argument("--backup-beacon-endpoint", dest="backup_endpoints", action="append", default=[],
+                        help="Backup beacon chain (shard 0) endpoint, used when the beacon endpoint is slow or down.\n  "
+                             "Can be given multiple times.")
     return parser.parse_args()
 
 
@@ -127,6 +140,7 @@ if __name__ == "__main__":
             raise SystemExit(f"Cannot use --auto-reset with 'mainnet' network")
     common.node_config.update({
         "endpoint": args.endpoint,
+        "backup-endpoints": args.backup_endpoints,
         "network": args.network,
         "clean": args.clean,
         "shard": args.shard,
@@ -137,6 +151,10 @@ if __name__ == "__main__":
         "fast-sync": args.fast_sync,
         "archival": args.archival,
         "expose-rpc": args.expose_rpc,
+        "metrics-port": args.metrics_port if args.metrics_port > 0 else None,
+        "expose-metrics": args.expose_metrics,
+        "log-compression": args.log_compression,
+        "compact-monitor-log": args.compact_monitor_log,
         "_is_recovering": False  # Never recovering from a hard reset on a run
     })
     common.save_node_config()
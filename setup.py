@@ -13,6 +13,10 @@ setup(
         'requests==2.23.0',
         'pexpect==4.8.0',
         'cryptography==2.9.2',
+        'bech32==1.2.0',
         'pyhmy==20.5.20',
-    ]
+    ],
+    extras_require={
+        'ws': ['websocket-client==0.57.0'],  # New block subscriptions, otherwise blocks are polled.
+    }
 )
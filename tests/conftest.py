@@ -0,0 +1,21 @@
+"""
+Shared setup of the AutoNode tests.
+
+AutoNode keeps its state under HOME and installs the CLI on import, so the tests run in a
+temporary HOME with a placeholder CLI binary. The mock RPC server of the benchmarks stands in
+for the node & network endpoints.
+"""
+
+import os
+import sys
+import tempfile
+
+_repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_home = tempfile.mkdtemp(prefix="autonode-test-")
+os.makedirs(f"{_home}/.hmy/bin")
+with open(f"{_home}/.hmy/bin/hmy", 'w') as f:
+    f.write("#!/bin/sh\necho '{}'\n")
+os.chmod(f"{_home}/.hmy/bin/hmy", 0o755)
+os.environ['HOME'] = _home
+
+sys.path[:0] = [_repo_dir, f"{_repo_dir}/benchmarks"]
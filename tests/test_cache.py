@@ -0,0 +1,69 @@
+import itertools
+import json
+
+import pytest
+from mock_rpc import (
+    MockChain,
+    MockRPCServer
+)
+from pyhmy.rpc.exceptions import (
+    RequestsError,
+    RequestsTimeoutError
+)
+
+from AutoNode import (
+    cache,
+    common
+)
+
+_ports = itertools.count(19851)  # New ports for each test, RPC connections are kept alive across tests.
+
+
+def _structure(num_shards):
+    return [{"shardID": i, "http": f"http://s{i}.example:9500"} for i in range(num_shards)]
+
+
+@pytest.fixture
+def network(tmp_path, monkeypatch):
+    """
+    A network with 4 shards, where an earlier process saved a structure of 2 shards.
+    """
+    server = MockRPCServer(MockChain(num_validators=1, sharding_structure=_structure(4)), next(_ports)).start()
+    cache_path = tmp_path / "network_cache.json"
+    cache_path.write_text(json.dumps({"testnet": {"sharding-structure": _structure(2)}}))
+    monkeypatch.setattr(cache, 'network_cache_path', str(cache_path))
+    monkeypatch.setattr(cache, '_network_cache', None)
+    monkeypatch.setattr(cache, '_network_fetches', {})
+    monkeypatch.setitem(common.node_config, 'network', 'testnet')
+    monkeypatch.setitem(common.node_config, 'endpoint', server.url)
+    yield server, cache_path
+    server.stop()
+
+
+def test_structure_fetched_once_per_process(network):
+    server, cache_path = network
+    assert len(cache.get_sharding_structure()) == 4
+    assert len(cache.get_sharding_structure()) == 4
+    assert server.stats()['hmy_getShardingStructure']['requests'] == 1
+    assert len(json.loads(cache_path.read_text())["testnet"]["sharding-structure"]) == 4
+
+
+def test_structure_refetched_after_invalidation(network):
+    server, _ = network
+    cache.get_sharding_structure()
+    server.chain.sharding_structure = _structure(3)  # Network reset with a new shard count.
+    cache.invalidate_network_cache()
+    assert len(cache.get_sharding_structure()) == 3
+
+
+def test_saved_structure_used_if_unreachable(network, monkeypatch):
+    server, _ = network
+
+    def unreachable(endpoint):
+        raise RequestsError(endpoint)
+
+    monkeypatch.setattr(cache.blockchain, 'get_sharding_structure', unreachable)
+    assert len(cache.get_sharding_structure()) == 2
+    monkeypatch.setattr(cache, '_network_cache', {})
+    with pytest.raises((RequestsError, RequestsTimeoutError)):
+        cache.get_sharding_structure()
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+
+import bech32
+import pytest
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers import (
+    Cipher,
+    algorithms,
+    modes
+)
+from pyhmy import cli
+
+from AutoNode import (
+    keystore,
+    transaction
+)
+
+_private_key = (1).to_bytes(32, 'big')
+_address_bytes = bytes.fromhex("7e5f4552091a69125d5dfcb7b8c2659029395bdf")
+_address = bech32.bech32_encode('one', bech32.convertbits(_address_bytes, 8, 5))
+
+
+def _write_keystore(path, passphrase, file_address):
+    """
+    Write a (fast pbkdf2) v3 keystore of `_private_key` to `path` with the `file_address` field.
+    """
+    salt, iv = os.urandom(32), os.urandom(16)
+    derived_key = hashlib.pbkdf2_hmac('sha256', passphrase.encode(), salt, 2, 32)
+    encryptor = Cipher(algorithms.AES(derived_key[:16]), modes.CTR(iv), backend=default_backend()).encryptor()
+    ciphertext = encryptor.update(_private_key) + encryptor.finalize()
+    crypto = {
+        "cipher": "aes-128-ctr",
+        "cipherparams": {"iv": iv.hex()},
+        "ciphertext": ciphertext.hex(),
+        "kdf": "pbkdf2",
+        "kdfparams": {"c": 2, "dklen": 32, "prf": "hmac-sha256", "salt": salt.hex()},
+        "mac": keystore.keccak256(derived_key[16:32] + ciphertext).hex(),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({"address": file_address, "crypto": crypto, "version": 3}, f)
+
+
+@pytest.fixture
+def keystore_dir(tmp_path, monkeypatch):
+    """
+    A CLI keystore directory with an unrelated account, the CLI must not be called.
+    """
+    monkeypatch.setattr(cli, '_account_keystore_path', str(tmp_path))
+
+    def no_cli(*args, **kwargs):
+        raise AssertionError(f"CLI called: {args}")
+
+    monkeypatch.setattr(cli, 'single_call', no_cli)
+    monkeypatch.setattr(cli, 'expect_call', no_cli)
+    keystore.forget_verified_passphrases()
+    _write_keystore(f"{tmp_path}/other/UTC--2020-01-01T00-00-00.0Z--{'11' * 20}", "pass", '11' * 20)
+    yield tmp_path
+    keystore.forget_verified_passphrases()
+
+
+def test_keystore_found_by_file_name(keystore_dir):
+    path = f"{keystore_dir}/validator/UTC--2020-01-01T00-00-00.0Z--{_address_bytes.hex()}"
+    _write_keystore(path, "pass", "")
+    assert keystore.get_keystore_files(_address) == [path]
+
+
+def test_keystore_found_by_address_field(keystore_dir):
+    path = f"{keystore_dir}/validator/key.json"
+    _write_keystore(path, "pass", _address_bytes.hex())
+    assert keystore.get_keystore_files(_address) == [path]
+    assert transaction.get_address_bytes(keystore.load_private_key(_address, "pass")) == _address_bytes
+
+
+def test_verified_passphrase_is_not_looked_up_again(keystore_dir, monkeypatch):
+    _write_keystore(f"{keystore_dir}/validator/key.json", "pass", _address_bytes.hex())
+    assert keystore.check_passphrase(_address, "pass")
+    assert not keystore.check_passphrase(_address, "wrong")
+
+    def no_lookup(address):
+        raise AssertionError("Keystore looked up for a verified passphrase")
+
+    monkeypatch.setattr(keystore, 'get_keystore_files', no_lookup)
+    assert keystore.check_passphrase(_address, "pass")
+
+
+def test_no_keystore(keystore_dir):
+    with pytest.raises(keystore.KeystoreError):
+        keystore.check_passphrase(_address, "pass")
@@ -0,0 +1,67 @@
+import asyncio
+import itertools
+
+import pytest
+from mock_rpc import (
+    MockChain,
+    MockRPCServer
+)
+
+from AutoNode import (
+    common,
+    monitor
+)
+from AutoNode.exceptions import (
+    ResetNode
+)
+
+
+_ports = itertools.count(19801)  # New ports for each test, RPC connections are kept alive across tests.
+
+
+@pytest.fixture
+def endpoints(monkeypatch):
+    """
+    Mock (network, node) RPC servers of the same chain & a monitor with auto-reset enabled.
+    """
+    network = MockRPCServer(MockChain(num_validators=10), next(_ports)).start()
+    node = MockRPCServer(MockChain(num_validators=10), next(_ports)).start()
+    monkeypatch.setattr(monitor, 'local_endpoint', node.url)
+    monkeypatch.setattr(monitor, 'block_one_check_interval', 3)
+    monkeypatch.setitem(common.node_config, 'endpoint', network.url)
+    monkeypatch.setitem(common.node_config, 'network', 'testnet')
+    monkeypatch.setitem(common.node_config, 'auto-reset', True)
+    monkeypatch.setitem(common.validator_config, 'validator-addr', None)
+    monitor._epoch_progress_check.clear()
+    monitor._block_one_check.clear()
+    loop = asyncio.new_event_loop()
+    yield network, node, loop
+    loop.close()
+    network.stop()
+    node.stop()
+
+
+def test_block_one_hashes_checked_on_interval(endpoints):
+    network, node, loop = endpoints
+    for _ in range(2 * monitor.block_one_check_interval):
+        monitor._run_cycle(loop, network.url)
+    assert network.stats()['hmy_getBlockByNumber']['requests'] == 2
+    assert node.stats()['hmy_getBlockByNumber']['requests'] == 2
+
+
+def test_network_reset_triggers_node_reset(endpoints):
+    network, node, loop = endpoints
+    monitor._run_cycle(loop, network.url)  # Hashes match & are seen before the reset.
+    network.chain.hard_reset()
+    with pytest.raises(ResetNode):
+        for _ in range(monitor.block_one_check_interval):
+            monitor._run_cycle(loop, network.url)
+
+
+def test_node_reset_triggers_node_reset(endpoints):
+    network, node, loop = endpoints
+    monitor._run_cycle(loop, network.url)
+    node.chain.hard_reset()
+    with pytest.raises(ResetNode):
+        for _ in range(monitor.block_one_check_interval):
+            monitor._run_cycle(loop, network.url)
@@ -0,0 +1,186 @@
+import bech32
+import pytest
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import (
+    ec,
+    utils
+)
+from pyhmy.rpc.exceptions import (
+    RequestsError,
+    RequestsTimeoutError
+)
+
+from AutoNode import transaction
+from AutoNode.keystore import (
+    keccak256
+)
+
+# EIP-155 example transaction: nonce 9, gas price 20 gwei, gas 21000, 1 ether to 0x3535...35, chain ID 1.
+_eip155_key = bytes.fromhex("46" * 32)
+_eip155_unsigned = [9, 20 * 10 ** 9, 21000, bytes.fromhex("35" * 20), 10 ** 18, b'']
+_eip155_signing_data = "ec098504a817c800825208943535353535353535353535353535353535353535880de0b6b3a764000080018080"
+_eip155_signing_hash = "daf5a779ae972f972197303d7b574746c7ef83eadac0f2791ad23db92e4c8e53"
+_eip155_r = 0x28ef61340bd939bc2195fe537567866003e1a15d3c71ff63e1590620aa636276
+_eip155_s = 0x67cbe9d8997f761aecb703304b3800ccf555c9f3dc64214b297fb1966a3b6d83
+_eip155_signed = ("f86c098504a817c800825208943535353535353535353535353535353535353535880de0b6b3a7640000"
+                  "8025a028ef61340bd939bc2195fe537567866003e1a15d3c71ff63e1590620aa636276"
+                  "a067cbe9d8997f761aecb703304b3800ccf555c9f3dc64214b297fb1966a3b6d83")
+_validator_addr = "one1pdv9lrdwl0rg5vglh4xtyrv3wjk3wsqket7zxy"
+
+
+def _rlp_decode(data):
+    """
+    Decode RLP `data` into (nested lists of) bytes, only to check the encoded transactions.
+    """
+    def decode(offset):
+        prefix = data[offset]
+        if prefix < 0x80:
+            return data[offset:offset + 1], offset + 1
+        is_list = prefix >= 0xc0
+        short = prefix - (0xc0 if is_list else 0x80)
+        if short < 56:
+            start, length = offset + 1, short
+        else:
+            start = offset + 1 + short - 55
+            length = int.from_bytes(data[offset + 1:start], 'big')
+        end = start + length
+        if not is_list:
+            return data[start:end], end
+        items = []
+        while start < end:
+            item, start = decode(start)
+            items.append(item)
+        return items, end
+
+    item, end = decode(0)
+    assert end == len(data)
+    return item
+
+
+@pytest.mark.parametrize("item, encoded", [
+    ("dog", "83646f67"),
+    (["cat", "dog"], "c88363617483646f67"),
+    ("", "80"),
+    ([], "c0"),
+    (0, "80"),
+    (15, "0f"),
+    (1024, "820400"),
+    ([[], [[]], [[], [[]]]], "c7c0c1c0c3c0c1c0"),
+    ("Lorem ipsum dolor sit amet, consectetur adipisicing elit",
+     "b8384c6f72656d20697073756d20646f6c6f722073697420616d65742c20636f6e7365637465747572206164697069736963696e6720656c6974"),
+])
+def test_rlp_encode(item, encoded):
+    assert transaction.rlp_encode(item).hex() == encoded
+
+
+def test_eip155_vectors():
+    signing_data = transaction.rlp_encode(_eip155_unsigned + [1, 0, 0])
+    assert signing_data.hex() == _eip155_signing_data
+    assert keccak256(signing_data).hex() == _eip155_signing_hash
+    assert transaction.rlp_encode(_eip155_unsigned + [37, _eip155_r, _eip155_s]).hex() == _eip155_signed
+    signer = transaction.recover_address(bytes.fromhex(_eip155_signing_hash), 0, _eip155_r, _eip155_s)
+    assert signer == transaction.get_address_bytes(_eip155_key)
+
+
+def test_address_of_key():
+    address = transaction.get_address_bytes((1).to_bytes(32, 'big'))
+    assert address.hex() == "7e5f4552091a69125d5dfcb7b8c2659029395bdf"
+
+
+def test_sign_hash():
+    msg_hash = bytes.fromhex(_eip155_signing_hash)
+    recovery_id, r, s = transaction.sign_hash(msg_hash, _eip155_key)
+    assert s <= transaction._n // 2
+    assert transaction.recover_address(msg_hash, recovery_id, r, s) == transaction.get_address_bytes(_eip155_key)
+    public_key = ec.derive_private_key(int.from_bytes(_eip155_key, 'big'), ec.SECP256K1(),
+                                       default_backend()).public_key()
+    public_key.verify(utils.encode_dss_signature(r, s), msg_hash, ec.ECDSA(utils.Prehashed(hashes.SHA256())))
+
+
+def test_sign_staking_transaction():
+    message = transaction.collect_rewards_message(_validator_addr)
+    raw_tx = transaction.sign_staking_transaction(transaction.collect_rewards_directive, message, 3, 10 ** 9,
+                                                  transaction.get_gas_limit(message), 2, _eip155_key)
+    directive, decoded_message, nonce, gas_price, gas_limit, v, r, s = _rlp_decode(raw_tx)
+    assert (directive, decoded_message, nonce, gas_price) == (b'\x04', message, b'\x03', b'\x3b\x9a\xca\x00')
+    assert int.from_bytes(gas_limit, 'big') == transaction.get_gas_limit(message)
+    unsigned = [transaction.collect_rewards_directive, message, 3, 10 ** 9, transaction.get_gas_limit(message)]
+    msg_hash = keccak256(transaction.rlp_encode(unsigned + [2, 0, 0]))
+    recovery_id = int.from_bytes(v, 'big') - (2 * 2 + 35)
+    assert recovery_id in (0, 1)
+    signer = transaction.recover_address(msg_hash, recovery_id, int.from_bytes(r, 'big'), int.from_bytes(s, 'big'))
+    assert signer == transaction.get_address_bytes(_eip155_key)
+
+
+def test_address_round_trip():
+    address_bytes = transaction.decode_address(_validator_addr)
+    assert len(address_bytes) == 20
+    assert bech32.bech32_encode('one', bech32.convertbits(address_bytes, 8, 5)) == _validator_addr
+
+
+@pytest.mark.parametrize("address", [
+    "one1pdv9lrdwl0rg5vglh4xtyrv3wjk3wsqket7zxz",  # Bad checksum
+    bech32.bech32_encode('bc', bech32.convertbits(bytes(20), 8, 5)),  # Not a ONE address
+])
+def test_decode_invalid_address(address):
+    with pytest.raises(ValueError):
+        transaction.decode_address(address)
+
+
+@pytest.fixture
+def send(monkeypatch):
+    """
+    Send a collect-rewards transaction of the `_eip155_key` to a fake endpoint, where `replies` maps an RPC method
+    to its result (or the exception it raises). Returns the tx hash and the raw transactions that were sent.
+    """
+    address = bech32.bech32_encode('one', bech32.convertbits(transaction.get_address_bytes(_eip155_key), 8, 5))
+    monkeypatch.setattr(transaction, 'load_private_key', lambda addr, passphrase: _eip155_key)
+    monkeypatch.setattr(transaction, 'get_chain_id', lambda endpoint, network=None: 2)
+
+    def send_tx(replies):
+        sent = []
+
+        def rpc_request(method, params=None, endpoint=None, timeout=None):
+            if method == 'hmyv2_sendRawStakingTransaction':
+                sent.append(params[0])
+            reply = replies[method]
+            if callable(reply):
+                reply = reply()
+            if isinstance(reply, Exception):
+                raise reply
+            return {'result': reply}
+
+        monkeypatch.setattr(transaction, 'rpc_request', rpc_request)
+        tx_hash = transaction.send_staking_transaction(transaction.collect_rewards_directive,
+                                                       transaction.collect_rewards_message(address),
+                                                       address, "pass", "http://fake:9500/")
+        return tx_hash, sent
+
+    return send_tx
+
+
+def test_send_timeout_of_received_transaction(send):
+    nonces = iter(["0x3", "0x4"])  # Pending nonce before & after the send.
+    tx_hash, sent = send({'hmy_getTransactionCount': lambda: next(nonces),
+                          'hmyv2_sendRawStakingTransaction': RequestsTimeoutError("http://fake:9500/")})
+    assert tx_hash == f"0x{keccak256(bytes.fromhex(sent[0][2:])).hex()}"
+
+
+def test_send_timeout_of_lost_transaction(send):
+    with pytest.raises(transaction.TransactionNotSentError):
+        send({'hmy_getTransactionCount': "0x3",
+              'hmyv2_sendRawStakingTransaction': RequestsError("http://fake:9500/")})
+
+
+def test_send_timeout_of_unknown_transaction(send):
+    nonces = iter(["0x3", RequestsError("http://fake:9500/")])
+    with pytest.raises(TimeoutError):
+        send({'hmy_getTransactionCount': lambda: next(nonces),
+              'hmyv2_sendRawStakingTransaction': RequestsTimeoutError("http://fake:9500/")})
+
+
+def test_nonce_error_is_not_sent(send):
+    with pytest.raises(transaction.TransactionNotSentError):
+        send({'hmy_getTransactionCount': RequestsError("http://fake:9500/"),
+              'hmyv2_sendRawStakingTransaction': "0x1"})
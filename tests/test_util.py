@@ -0,0 +1,60 @@
+import logging
+import lzma
+
+import pytest
+
+from AutoNode import util
+
+
+def test_rotated_logs_are_not_lost_while_compressing(tmp_path):
+    log_path = tmp_path / "a.log"
+    handler = util.get_simple_rotating_log_handler(str(log_path), max_size=300_000, codec='xz', level=9)
+    logger = logging.getLogger("test-rotation")
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    try:
+        for i in range(6):  # Each record rotates the log, faster than it is compressed.
+            logger.info(str(i) * 320_000)
+    finally:
+        logger.removeHandler(handler)
+        _, listener = util._log_handlers.pop(str(log_path))
+        listener.stop()
+        listener.handlers[0].rotator.wait()
+    assert str(5) * 320_000 in log_path.read_text()
+    for backup in range(1, 6):
+        with lzma.open(f"{log_path}.{backup}.xz") as f:
+            assert str(5 - backup) * 320_000 in f.read().decode()
+
+
+_bls_key = "0x" + "ab" * 48
+
+
+@pytest.fixture
+def cli_shards(monkeypatch):
+    """
+    A network of 4 shards with a CLI that reports the `shard` of the dict, returns the dict of the CLI calls.
+    """
+    cli = {"shard": None, "calls": 0}
+
+    def cli_shard_for_bls(public_bls_key):
+        cli["calls"] += 1
+        return cli["shard"]
+
+    monkeypatch.setattr(util, 'get_sharding_structure', lambda: [{}] * 4)
+    monkeypatch.setattr(util, '_cli_shard_for_bls', cli_shard_for_bls)
+    monkeypatch.setattr(util, '_shard_check', None)
+    return cli
+
+
+def test_shard_checked_once_against_cli(cli_shards):
+    cli_shards["shard"] = int(_bls_key[2:], 16) % 4
+    assert util.shard_for_bls(_bls_key) == cli_shards["shard"]
+    assert util.shard_for_bls(_bls_key) == cli_shards["shard"]
+    assert cli_shards["calls"] == 1
+
+
+def test_cli_shard_used_if_different(cli_shards):
+    cli_shards["shard"] = (int(_bls_key[2:], 16) + 1) % 4
+    assert util.shard_for_bls(_bls_key) == cli_shards["shard"]
+    assert util.shard_for_bls(_bls_key) == cli_shards["shard"]
+    assert cli_shards["calls"] == 2